@@ -0,0 +1,304 @@
+# ============================================================
+# Benchmark — timing harness for the tracker and the game
+# Features: scripted I/O (console.ScriptedIO) for the interactive functions,
+# throughput + latency percentiles + peak memory per scenario,
+# JSON baselines and regression checks between runs.
+# ============================================================
+#
+# Scenarios (each run at every size in --sizes, default 10 / 10k / 1M):
+#
+#   collect_entries    add N entries through the [A]dd prompt flow
+#   delete_entry       delete entry #1 from a habit holding N entries
+#   evaluate_habit     evaluate a habit holding N entries
+#   show_summary       full daily summary with N entries logged
+#   clear_all_entries  reset a state holding N entries
+#   handle_room        scripted escape_room playthroughs (size = runs)
+#
+# Usage:
+#     python benchmark.py                              # print results
+#     python benchmark.py --sizes 10,10000 --save baseline.json
+#     python benchmark.py --compare baseline.json      # exit 1 on regression
+
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from itertools import chain, repeat
+
+import escape_room
+import healthyhabittracker as tracker
+from console import ScriptedIO
+
+DEFAULT_SIZES = (10, 10_000, 1_000_000)
+
+# Operations that are timed one call at a time are capped at this
+# many samples, so a 1M-entry scenario doesn't take forever
+MAX_SAMPLES = 1_000
+
+# Scenarios whose every call touches all N entries (listing them,
+# refilling them) get roughly this many entries' worth of work in total
+WORK_BUDGET = 2_000_000
+
+# A winning playthrough: kitchen (apple), forest (key), door (escape)
+ESCAPE_SCRIPT = ("2", "a", "n", "1", "a", "n", "3", "a")
+
+
+# ------------------------------------------------------------
+# SCRIPTED I/O
+# ------------------------------------------------------------
+
+class _NullStream:
+    """Swallows output so the terminal isn't part of the measurement."""
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+class TimedIO(ScriptedIO):
+    """
+    A ScriptedIO that drops its output and records when each `mark`
+    prompt was shown (for per-op latency).
+    """
+
+    def __init__(self, answers, mark: str | None = None) -> None:
+        super().__init__(answers, record=False)
+        self._mark = mark
+        self.marks: list[float] = []
+
+    def input(self, prompt: str = "") -> str:
+        if prompt == self._mark:
+            self.marks.append(time.perf_counter())
+        return super().input(prompt)
+
+
+@contextmanager
+def scripted(answers, mark: str | None = None):
+    """
+    Yields a TimedIO to pass to the interactive functions. stdout is
+    silenced too, for the display-only ones that write straight to it.
+    """
+    with redirect_stdout(_NullStream()):
+        yield TimedIO(answers, mark)
+
+
+def _filled_state(entries: int) -> tracker.HabitState:
+    """A HabitState (no journal, no history) with `entries` entries spread over the habits."""
+    state = tracker.HabitState()
+    names = list(state.habits)
+    per_habit, extra = divmod(entries, len(names))
+    now = time.time()
+    for i, name in enumerate(names):
+        count = per_habit + (1 if i < extra else 0)
+        slots = (list(range(len(tracker.TIME_SLOTS))) * (count // len(tracker.TIME_SLOTS) + 1))[:count]
+        state.habits[name]["entries"].extend([1.0] * count, slots, [now] * count)
+    return state
+
+
+def _samples(size: int) -> int:
+    """How many times to repeat a call that costs O(size)."""
+    return max(1, min(MAX_SAMPLES, WORK_BUDGET // max(size, 1)))
+
+
+# ------------------------------------------------------------
+# SCENARIOS — each returns (operations, [latency seconds, ...])
+# ------------------------------------------------------------
+
+def bench_collect_entries(size: int):
+    state = tracker.HabitState()
+    config = state.habits["Water Intake"]
+    answers = chain(chain.from_iterable(repeat(("a", "1", "morning"), size)), ("q",))
+    with scripted(answers, mark="  Choice: ") as io:
+        tracker.collect_entries("Water Intake", config["unit"], config["max_value"], state, io)
+    return size, [b - a for a, b in zip(io.marks, io.marks[1:])]
+
+
+def bench_delete_entry(size: int):
+    entries = _filled_state(size * 3).habits["Water Intake"]["entries"]
+    # Each call lists every entry before asking which one to delete
+    samples = min(size, _samples(size))
+    latencies = []
+    with scripted(repeat("1")) as io:
+        for _ in range(samples):
+            start = time.perf_counter()
+            tracker.delete_entry(entries, "cups", io)
+            latencies.append(time.perf_counter() - start)
+    return samples, latencies
+
+
+def bench_evaluate_habit(size: int):
+    entries = _filled_state(size * 3).habits["Sleep"]["entries"]
+    latencies = []
+    with scripted(()):
+        for _ in range(MAX_SAMPLES):
+            start = time.perf_counter()
+            tracker.evaluate_habit("Sleep", entries, 7, "hours")
+            latencies.append(time.perf_counter() - start)
+    return MAX_SAMPLES, latencies
+
+
+def bench_show_summary(size: int):
+    state = _filled_state(size)
+    latencies = []
+    with scripted(()):
+        for _ in range(MAX_SAMPLES):
+            start = time.perf_counter()
+            tracker.show_summary(state)
+            latencies.append(time.perf_counter() - start)
+    return MAX_SAMPLES, latencies
+
+
+def bench_clear_all_entries(size: int):
+    samples = _samples(size)
+    latencies = []
+    with scripted(()) as io:
+        for _ in range(samples):
+            state = _filled_state(size)
+            start = time.perf_counter()
+            tracker.clear_all_entries(state, io)
+            latencies.append(time.perf_counter() - start)
+    return samples, latencies
+
+
+def bench_handle_room(size: int):
+    runs = min(size, 100_000)
+    latencies = []
+    with scripted(chain.from_iterable(repeat(ESCAPE_SCRIPT, runs))) as io:
+        for _ in range(runs):
+            start = time.perf_counter()
+            escape_room.main(io=io)
+            latencies.append(time.perf_counter() - start)
+    return runs, latencies
+
+
+SCENARIOS = {
+    "collect_entries":   bench_collect_entries,
+    "delete_entry":      bench_delete_entry,
+    "evaluate_habit":    bench_evaluate_habit,
+    "show_summary":      bench_show_summary,
+    "clear_all_entries": bench_clear_all_entries,
+    "handle_room":       bench_handle_room,
+}
+
+
+# ------------------------------------------------------------
+# MEASUREMENT
+# ------------------------------------------------------------
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def measure(name: str, size: int) -> dict:
+    """
+    Runs one scenario twice: once for timing, once under tracemalloc
+    for peak memory (tracemalloc slows everything down, so the two
+    are kept apart). Throughput counts only the timed calls, not the
+    setup around them.
+    """
+    scenario = SCENARIOS[name]
+
+    operations, latencies = scenario(size)
+    elapsed = math.fsum(latencies)
+
+    tracemalloc.start()
+    scenario(size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "operations":     operations,
+        "seconds":        elapsed,
+        "ops_per_sec":    operations / elapsed if elapsed > 0 else 0.0,
+        "mean_us":        statistics.fmean(latencies) * 1e6 if latencies else 0.0,
+        "p50_us":         _percentile(latencies, 50) * 1e6,
+        "p95_us":         _percentile(latencies, 95) * 1e6,
+        "p99_us":         _percentile(latencies, 99) * 1e6,
+        "peak_kib":       peak / 1024,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Lists regressions: throughput down, p50 latency or peak memory up
+    by more than `tolerance` (0.2 = 20%) against the baseline.
+    """
+    problems = []
+    for name, sizes in current.items():
+        for size, now in sizes.items():
+            before = baseline.get(name, {}).get(size)
+            if before is None:
+                continue
+            if now["ops_per_sec"] < before["ops_per_sec"] * (1 - tolerance):
+                problems.append(f"{name}[{size}]: throughput {before['ops_per_sec']:,.0f} -> {now['ops_per_sec']:,.0f} ops/s")
+            if now["p50_us"] > before["p50_us"] * (1 + tolerance):
+                problems.append(f"{name}[{size}]: p50 {before['p50_us']:.1f} -> {now['p50_us']:.1f} µs")
+            if now["peak_kib"] > before["peak_kib"] * (1 + tolerance):
+                problems.append(f"{name}[{size}]: peak memory {before['peak_kib']:,.0f} -> {now['peak_kib']:,.0f} KiB")
+    return problems
+
+
+def show_results(results: dict) -> None:
+    print(f"  {'Scenario':<18} {'Size':>9} {'ops/s':>12} {'p50 µs':>9} {'p95 µs':>9} {'p99 µs':>9} {'peak KiB':>10}")
+    print(f"  {'-'*18} {'-'*9} {'-'*12} {'-'*9} {'-'*9} {'-'*9} {'-'*10}")
+    for name, sizes in results.items():
+        for size, r in sizes.items():
+            print(f"  {name:<18} {size:>9} {r['ops_per_sec']:>12,.0f} {r['p50_us']:>9.1f}"
+                  f" {r['p95_us']:>9.1f} {r['p99_us']:>9.1f} {r['peak_kib']:>10,.0f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the tracker and game hot paths.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated entry counts (default 10,10000,1000000)")
+    parser.add_argument("--only", help="comma-separated scenario names to run")
+    parser.add_argument("--save", help="write results to this JSON file (a new baseline)")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown before flagging a regression (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    names = args.only.split(",") if args.only else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    results: dict[str, dict[str, dict]] = {}
+    for name in names:
+        for size in sizes:
+            print(f"  running {name} @ {size} ...", file=sys.stderr)
+            results.setdefault(name, {})[str(size)] = measure(name, size)
+
+    show_results(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n  Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = compare(results, baseline, args.tolerance)
+        if problems:
+            print("\n  ⚠  Regressions:")
+            for problem in problems:
+                print(f"    {problem}")
+            return 1
+        print("\n  ✅ No regressions against baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
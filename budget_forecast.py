@@ -0,0 +1,256 @@
+# ============================================================
+# Budget Forecast — where will this month's savings end up?
+# Features: projects month-end net savings from a transaction
+# history (rolling mean + weekday pattern), and the chance of
+# reaching daily_saving_goal for the month, by Monte Carlo over
+# the history's own day-to-day surprises.
+# ============================================================
+#
+# The model for one day's net savings:
+#
+#   net = level + weekday effect + residual
+#
+#   level           mean net savings over the last `window` days
+#   weekday effect  how far that weekday usually sits above / below
+#                   the trailing mean (salary Fridays, weekend spends)
+#   residual        whatever is left — the day's surprise
+#
+# Days with no transactions count as 0 net savings, so a history's
+# quiet days pull the level down just as they do the real balance.
+#
+# Every past day's residual is kept. A simulation of the rest of the
+# month draws one residual per remaining day from that list (with
+# replacement), adds it to the day's level + weekday effect, and sums.
+# Thousands of simulations give the spread of month-end savings and
+# the share of them that reach goal x days-in-month.
+#
+# All the sampling is one random.choices() call and the sums run in
+# C through map(sum, ...), so 5,000 simulations of a 20-day remainder
+# take about 10 ms. Amounts stay in integer paise throughout, as in
+# personalbudgettracker; only the expected value is a mean.
+#
+# Usage:
+#     python budget_forecast.py ledger.csv --goal 500
+#     python budget_forecast.py 2025.csv 2026.csv --goal 500 --as-of 2026-10-17 --sims 20000
+#     python budget_forecast.py ledger.csv --goal 500 --json --seed 7
+
+import argparse
+import calendar
+import random
+import sys
+import time
+from bisect import bisect_left
+from datetime import date, timedelta
+from itertools import accumulate, chain, takewhile
+from typing import NamedTuple
+
+from console import screen, write_json
+from personalbudgettracker import (DaySummary, Ledger, ReadReport, parse_paise,
+                                   read_transactions, rupees)
+
+DEFAULT_WINDOW = 28
+DEFAULT_SIMS = 5000
+MIN_HISTORY = 14        # days; fewer gives too few residuals to resample
+
+
+class Forecast(NamedTuple):
+    as_of: date
+    month: str                  # "2026-10"
+    days_left: int              # days after as_of still to come this month
+    month_to_date: int          # paise saved from the 1st to as_of
+    expected: float             # mean month-end savings over the simulations, in paise
+    low: int                    # 10th percentile
+    median: int
+    high: int                   # 90th percentile
+    target: int                 # goal x days in the month
+    probability: float          # share of simulations that reach the target
+    expected_days_missed: float # of the days left, how many are likely to miss the daily goal
+    simulations: int
+    seconds: float
+
+    def data(self) -> dict:
+        """As a plain dict for JSON mode; amounts as "x.xx" strings."""
+        data = self._asdict()
+        for name in ("month_to_date", "low", "median", "high", "target"):
+            data[name] = rupees(data[name])
+        data["expected"] = rupees(round(self.expected))
+        data["expected_days_missed"] = round(self.expected_days_missed, 2)
+        data["seconds"] = round(self.seconds, 4)
+        return data
+
+
+# ------------------------------------------------------------
+# HISTORY — one net-savings figure per calendar day
+# ------------------------------------------------------------
+
+def daily_nets(transactions, goal: int = 0, as_of: date | None = None,
+               report: ReadReport | None = None) -> tuple[date, list[int]]:
+    """
+    (first day, [net paise for every calendar day from it]), with days
+    that have no transactions filled in as 0. Stops after `as_of`.
+    """
+    days: list[DaySummary] = []
+    if as_of is not None:
+        transactions = takewhile(lambda t: t.day <= as_of, transactions)
+    ledger = Ledger(goal, on_day=days.append)
+    ledger.feed(transactions, report)
+    ledger.close()
+    if not days:
+        return as_of or date.today(), []
+
+    first = days[0].day
+    last = max(as_of or days[-1].day, days[-1].day)
+    nets = [0] * ((last - first).days + 1)
+    for day in days:
+        nets[(day.day - first).days] = day.net
+    return first, nets
+
+
+# ------------------------------------------------------------
+# THE MODEL
+# ------------------------------------------------------------
+
+def weekday_model(first: date, nets: list[int], window: int = DEFAULT_WINDOW
+                  ) -> tuple[float, list[float], list[int]]:
+    """
+    Fits the model to a history. Returns (level, weekday effects
+    Mon..Sun, residuals in paise).
+
+    Each day is compared with the mean of the `window` days before it
+    (fewer at the very start), so the weekday effects and residuals
+    describe surprises relative to a moving level, not to the
+    all-time average.
+    """
+    prefix = list(accumulate(nets, initial=0))
+    trailing = [0.0] * len(nets)
+    for i in range(1, len(nets)):
+        low = max(0, i - window)
+        trailing[i] = (prefix[i] - prefix[low]) / (i - low)
+
+    start = first.weekday()
+    deviations: list[list[float]] = [[] for _ in range(7)]
+    for i in range(1, len(nets)):
+        deviations[(start + i) % 7].append(nets[i] - trailing[i])
+    effects = [sum(values) / len(values) if values else 0.0 for values in deviations]
+
+    residuals = [round(nets[i] - trailing[i] - effects[(start + i) % 7])
+                 for i in range(1, len(nets))]
+    recent = nets[-window:]
+    level = sum(recent) / len(recent)
+    return level, effects, residuals
+
+
+def _percentile(ordered: list[int], fraction: float) -> int:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def forecast(transactions, goal: int, as_of: date | None = None,
+             simulations: int = DEFAULT_SIMS, window: int = DEFAULT_WINDOW,
+             seed: int | None = None, report: ReadReport | None = None) -> Forecast:
+    """
+    Projects net savings at the end of as_of's month (default: the
+    last day in the history). Raises ValueError if there are fewer
+    than MIN_HISTORY days to learn from.
+    """
+    started = time.perf_counter()
+    first, nets = daily_nets(transactions, goal, as_of, report)
+    if len(nets) < MIN_HISTORY:
+        raise ValueError(f"need at least {MIN_HISTORY} days of history, got {len(nets)}")
+    as_of = first + timedelta(days=len(nets) - 1)
+
+    level, effects, residuals = weekday_model(first, nets, window)
+    month_days = calendar.monthrange(as_of.year, as_of.month)[1]
+    days_left = month_days - as_of.day
+    month_to_date = sum(nets[-as_of.day:]) if as_of.day <= len(nets) else sum(nets)
+    target = goal * month_days
+
+    # The part every simulation shares: month to date + level + weekday
+    # effect for each remaining day. Only the residuals differ.
+    drifts = [level + effects[(as_of.weekday() + ahead) % 7] for ahead in range(1, days_left + 1)]
+    base = month_to_date + round(sum(drifts))
+
+    if days_left:
+        rng = random.Random(seed)
+        draws = rng.choices(residuals, k=simulations * days_left)
+        # zip(*[iter(draws)] * n) cuts the draws into rows of n without a Python loop
+        totals = sorted(map(sum, zip(*[iter(draws)] * days_left)))
+        totals = [base + total for total in totals]
+    else:
+        totals = [base] * simulations
+
+    reached = len(totals) - bisect_left(totals, target)
+    # P(a day misses) = share of residuals that would take it below the goal
+    ordered = sorted(residuals)
+    missed = sum(bisect_left(ordered, goal - drift) for drift in drifts) / len(ordered)
+
+    return Forecast(
+        as_of=as_of,
+        month=f"{as_of.year:04d}-{as_of.month:02d}",
+        days_left=days_left,
+        month_to_date=month_to_date,
+        expected=sum(totals) / len(totals),
+        low=_percentile(totals, 0.1),
+        median=_percentile(totals, 0.5),
+        high=_percentile(totals, 0.9),
+        target=target,
+        probability=reached / len(totals),
+        expected_days_missed=missed,
+        simulations=simulations,
+        seconds=time.perf_counter() - started,
+    )
+
+
+# ------------------------------------------------------------
+# REPORT
+# ------------------------------------------------------------
+
+def show_forecast(result: Forecast, goal: int, stream=None) -> None:
+    with screen(stream=stream) as out:
+        out.line("\n" + "=" * 50)
+        out.line(f"           🔮 Savings Forecast — {result.month}")
+        out.line("=" * 50)
+        out.line(f"  As of {result.as_of:%a %d %b %Y}: saved ₹{rupees(result.month_to_date)} so far,"
+                 f" {result.days_left} days to go")
+        out.line(f"  Month-end savings: ₹{rupees(result.median)} likely"
+                 f" (₹{rupees(result.low)} – ₹{rupees(result.high)}, 80% range)")
+        out.line(f"\n  Goal: ₹{rupees(goal)} a day = ₹{rupees(result.target)} this month")
+        out.line(f"  Chance of reaching it: {result.probability:.0%}")
+        if result.days_left:
+            out.line(f"  Days likely to miss the daily goal: {result.expected_days_missed:.1f}"
+                     f" of {result.days_left}")
+        out.line(f"\n  {result.simulations:,} simulations in {result.seconds * 1000:.0f} ms")
+        out.line("=" * 50)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Forecast month-end savings against a daily saving goal.")
+    parser.add_argument("files", nargs="+", help=".csv or .jsonl transaction files, in date order")
+    parser.add_argument("--goal", type=parse_paise, default=0, metavar="RUPEES",
+                        help="daily saving goal in ₹, e.g. 500 (default 0)")
+    parser.add_argument("--as-of", type=date.fromisoformat, metavar="DATE",
+                        help="forecast from this day (default: the last day in the files)")
+    parser.add_argument("--sims", type=int, default=DEFAULT_SIMS, help="Monte Carlo simulations")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="days in the rolling mean")
+    parser.add_argument("--seed", type=int, help="random seed, for repeatable runs")
+    parser.add_argument("--json", action="store_true", help="one JSON line instead of a report")
+    args = parser.parse_args(argv)
+    if args.sims < 1 or args.window < 1:
+        parser.error("--sims and --window must be at least 1")
+
+    report = ReadReport()
+    try:
+        result = forecast(chain.from_iterable(read_transactions(path, report) for path in args.files),
+                          args.goal, args.as_of, args.sims, args.window, args.seed, report)
+    except (OSError, ValueError) as error:
+        print(f"  ⚠  {error}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        write_json({"forecast": result.data(), "rejected": report.rejected})
+    else:
+        show_forecast(result, args.goal)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+# ============================================================
+# Budget Reports — month-end savings reports for many users
+# Features: one ledger file per user, fanned out over a process
+# pool, one JSON line per user-month streamed to disk, and
+# progress on stderr.
+# ============================================================
+#
+# Each user's transactions live in their own .csv / .jsonl file (the
+# format personalbudgettracker reads); the file name without its
+# extension is the user id:
+#
+#   ledgers/u00001.csv   ->  user "u00001"
+#
+# Every file is streamed through a personalbudgettracker.Ledger, so a
+# user costs the same small amount of memory however long their
+# history is. For each month the report has:
+#
+#   - income / expenses / rent / net savings, and a total per category
+#   - the days that exceeded / met / missed the daily saving goal
+#   - exceeded_by / missed_by: how far above / below the goal those days
+#     were in total — the same amounts the daily summary prints
+#   - the month against goal x days: "exceeded", "met" or "missed"
+#
+# Output is JSON lines, written as soon as each user is done:
+#
+#   {"user": "u00001", "report": {"month": "2026-09", "days": 30, ...}}
+#   {"user": "u00002", "skipped": {"rows": 2, "reasons": {"invalid date": 2}}}
+#   {"user": "u00003", "error": "CSV header is missing column(s): amount"}
+#
+# Users are spread across worker processes in chunks of CHUNK, so the
+# pickling round-trip is small next to the work. The output is written
+# to FILE.tmp and renamed to FILE at the end, so a crashed run never
+# leaves a half-written report behind.
+#
+# Usage:
+#     python budget_reports.py ledgers/ --goal 500 -o reports.jsonl
+#     python budget_reports.py ledgers/ --goal 500 --month 2026-09 -o sep.jsonl --workers 8
+#     python budget_reports.py alice.csv bob.jsonl --goal 250 -o - --workers 0
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import dropwhile, takewhile
+from typing import NamedTuple
+
+from personalbudgettracker import (EXCEEDED, MISSED, OUTCOME_NAMES, DaySummary, Ledger,
+                                   MonthSummary, ReadReport, goal_outcome, parse_paise,
+                                   read_transactions, rupees)
+
+EXTENSIONS = (".csv", ".jsonl", ".ndjson")
+
+# Users handed to a worker process at a time
+CHUNK = 64
+
+# Seconds between progress lines on stderr
+PROGRESS_EVERY = 1.0
+
+
+class UserResult(NamedTuple):
+    user: str
+    reports: list[dict]     # one per month, ready for JSON
+    rows: int
+    rejected: int
+    reasons: dict[str, int]
+    error: str | None       # the file couldn't be read (or reporting on it failed)
+
+
+# ------------------------------------------------------------
+# ONE USER
+# ------------------------------------------------------------
+
+class _MonthTally:
+    """
+    What the Ledger doesn't keep per month: category totals and the
+    exceeded_by / missed_by amounts. Fed every transaction the Ledger
+    accepts, and emptied into a report each time a month closes.
+    """
+
+    def __init__(self, goal: int) -> None:
+        self.goal = goal
+        self.reports: list[dict] = []
+        self._categories: dict[tuple[int, int], dict[str, int]] = {}
+        self._exceeded_by = 0
+        self._missed_by = 0
+
+    def on_transaction(self, transaction) -> None:
+        """Adds an accepted transaction to its month's category totals."""
+        day = transaction.day
+        totals = self._categories.get((day.year, day.month))
+        if totals is None:
+            totals = self._categories[(day.year, day.month)] = {}
+        totals[transaction.category] = totals.get(transaction.category, 0) + transaction.amount
+
+    def on_day(self, day: DaySummary) -> None:
+        if day.outcome == EXCEEDED:
+            self._exceeded_by += day.net - self.goal
+        elif day.outcome == MISSED:
+            self._missed_by += self.goal - day.net
+
+    def on_month(self, month: MonthSummary) -> None:
+        categories = self._categories.pop((int(month.month[:4]), int(month.month[5:])), {})
+        missed, met, exceeded = month.outcomes
+        self.reports.append({
+            "month": month.month,
+            "days": month.days,
+            "income": rupees(month.income),
+            "expenses": rupees(month.expenses),
+            "rent": rupees(month.rent),
+            "net": rupees(month.net),
+            "goal": rupees(self.goal),
+            "days_exceeded": exceeded,
+            "days_met": met,
+            "days_missed": missed,
+            "exceeded_by": rupees(self._exceeded_by),
+            "missed_by": rupees(self._missed_by),
+            "outcome": OUTCOME_NAMES[goal_outcome(month.net, self.goal * month.days)],
+            "categories": {name: rupees(total) for name, total in sorted(categories.items())},
+        })
+        self._exceeded_by = self._missed_by = 0
+
+
+def month_bounds(month: str) -> tuple[date, date]:
+    """"2026-09" -> (2026-09-01, 2026-10-01)."""
+    first = date.fromisoformat(month + "-01")
+    following = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+    return first, following
+
+
+def report_user(path: str, goal: int, month: str | None = None) -> UserResult:
+    """
+    Streams one user's file through a Ledger and returns a report per
+    month — or only `month` ("2026-09"), in which case reading stops at
+    the first row after it.
+    """
+    user = os.path.splitext(os.path.basename(path))[0]
+    read = ReadReport()
+    tally = _MonthTally(goal)
+    ledger = Ledger(goal, on_day=tally.on_day, on_month=tally.on_month,
+                    on_transaction=tally.on_transaction)
+    try:
+        transactions = read_transactions(path, read)
+        if month is not None:
+            first, following = month_bounds(month)
+            transactions = takewhile(lambda t: t.day < following,
+                                     dropwhile(lambda t: t.day < first, transactions))
+        ledger.feed(transactions, read)
+        ledger.close()
+    except (OSError, UnicodeDecodeError, ValueError) as error:
+        return UserResult(user, [], read.rows, read.rejected, read.reasons, str(error))
+    except Exception as error:
+        # Anything else is a bug, but it's this user's bug: report it on
+        # their line rather than let it end the whole run in a worker
+        return UserResult(user, [], read.rows, read.rejected, read.reasons,
+                          f"internal error: {type(error).__name__}: {error}")
+    return UserResult(user, tally.reports, read.rows, read.rejected, read.reasons, None)
+
+
+# ------------------------------------------------------------
+# MANY USERS
+# ------------------------------------------------------------
+
+def find_ledgers(paths: list[str]) -> list[str]:
+    """The ledger files among `paths`; a directory contributes every ledger file in it, sorted."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            with os.scandir(path) as entries:
+                found.extend(sorted(entry.path for entry in entries
+                                    if entry.is_file() and entry.name.endswith(EXTENSIONS)))
+        else:
+            found.append(path)
+    return found
+
+
+# Set once per worker process by _init_worker, so each task only ships a path
+_WORKER_ARGS: tuple[int, str | None] = (0, None)
+
+
+def _init_worker(goal: int, month: str | None) -> None:
+    global _WORKER_ARGS
+    _WORKER_ARGS = (goal, month)
+
+
+def _report_in_worker(path: str) -> UserResult:
+    return report_user(path, *_WORKER_ARGS)
+
+
+def report_all(paths: list[str], goal: int, month: str | None = None, workers: int = 0):
+    """
+    Yields a UserResult per file, in the order given. With workers > 0
+    the files are spread over that many processes; results still come
+    back in order, as soon as each chunk is done.
+    """
+    if workers <= 0:
+        for path in paths:
+            yield report_user(path, goal, month)
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(goal, month)) as pool:
+        yield from pool.map(_report_in_worker, paths, chunksize=CHUNK)
+
+
+class Totals(NamedTuple):
+    users: int
+    user_months: int
+    months: tuple[int, int, int]        # user-months missed / met / exceeded goal x days
+    rows: int
+    rejected: int
+    failed: int
+
+
+def write_reports(results, out, total: int, progress=None) -> Totals:
+    """
+    Writes every result to `out` as JSON lines and returns the totals.
+    Every PROGRESS_EVERY seconds, a progress line goes to `progress`.
+    """
+    users = user_months = rows = rejected = failed = 0
+    months = [0, 0, 0]
+    outcome_index = {name: index for index, name in enumerate(OUTCOME_NAMES)}
+    started = last = time.perf_counter()
+
+    for result in results:
+        users += 1
+        rows += result.rows
+        rejected += result.rejected
+        if result.error is not None:
+            failed += 1
+            out.write(json.dumps({"user": result.user, "error": result.error}, ensure_ascii=False) + "\n")
+        for report in result.reports:
+            user_months += 1
+            months[outcome_index[report["outcome"]]] += 1
+            out.write(json.dumps({"user": result.user, "report": report}, ensure_ascii=False) + "\n")
+        if result.rejected:
+            skipped = {"rows": result.rejected, "reasons": result.reasons}
+            out.write(json.dumps({"user": result.user, "skipped": skipped}, ensure_ascii=False) + "\n")
+
+        now = time.perf_counter()
+        if progress is not None and now - last >= PROGRESS_EVERY:
+            last = now
+            print(f"  {users:,} / {total:,} users   {user_months:,} user-months"
+                  f"   {users / (now - started):,.0f} users/s", file=progress, flush=True)
+
+    return Totals(users, user_months, tuple(months), rows, rejected, failed)
+
+
+def _write_to(path: str):
+    """The output stream for -o: stdout for "-", else FILE.tmp (renamed when done)."""
+    if path == "-":
+        return sys.stdout
+    return open(path + ".tmp", "w", encoding="utf-8")
+
+
+# ------------------------------------------------------------
+# COMMAND LINE
+# ------------------------------------------------------------
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Month-end savings reports for many users' ledgers.")
+    parser.add_argument("paths", nargs="+", metavar="PATH",
+                        help="ledger files, or directories of them (one user per file)")
+    parser.add_argument("-o", "--output", required=True, metavar="FILE",
+                        help="where to write the JSON-lines reports (- for stdout)")
+    parser.add_argument("--goal", type=parse_paise, default=0, metavar="RUPEES",
+                        help="daily saving goal in ₹, e.g. 500 or 499.50 (default 0)")
+    parser.add_argument("--month", metavar="YYYY-MM", help="report this month only, e.g. 2026-09")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: one per CPU; 0 = this process)")
+    args = parser.parse_args(argv)
+    if args.month is not None:
+        try:
+            month_bounds(args.month)
+        except ValueError:
+            parser.error(f"--month: expected YYYY-MM, got {args.month!r}")
+
+    paths = find_ledgers(args.paths)
+    print(f"  {len(paths):,} ledgers, {max(args.workers, 1)} process(es)", file=sys.stderr)
+
+    start = time.perf_counter()
+    out = _write_to(args.output)
+    try:
+        totals = write_reports(report_all(paths, args.goal, args.month, args.workers),
+                               out, len(paths), sys.stderr)
+    except BaseException:
+        if out is not sys.stdout:
+            out.close()
+            os.remove(args.output + ".tmp")
+        raise
+    if out is not sys.stdout:
+        out.close()
+        os.replace(args.output + ".tmp", args.output)
+    seconds = time.perf_counter() - start
+
+    missed, met, exceeded = totals.months
+    print(f"  Reported {totals.user_months:,} user-months for {totals.users:,} users in {seconds:.2f}s"
+          f" ({totals.users / max(seconds, 1e-9):,.0f} users/s)", file=sys.stderr)
+    print(f"  Months vs goal:  🎉 exceeded {exceeded:,}   ✅ met {met:,}   ⚠️ missed {missed:,}",
+          file=sys.stderr)
+    print(f"  Rows: {totals.rows:,}   skipped: {totals.rejected:,}   unreadable files: {totals.failed:,}",
+          file=sys.stderr)
+    return 1 if totals.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
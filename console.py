@@ -0,0 +1,145 @@
+# ============================================================
+# Console — shared rendering layer for the tracker and the game
+# Features: build a whole screen in one buffer and write it with
+# a single call, plus a JSON helper for machine-readable output.
+# ============================================================
+#
+# Calling print() thirty times for one summary means thirty writes,
+# which is slow through a pipe or over a remote terminal. Instead:
+#
+#     with screen() as out:
+#         out.line("=" * 50)
+#         out.line("  📊 Daily Summary")
+#         ...
+#     # <- everything is written here, in one go
+#
+# Functions that draw part of a screen accept an optional `out`
+# argument; screen(out) then reuses the caller's buffer, so a summary
+# made of several helpers still goes out as one write.
+#
+# Interactive functions take an optional `io` instead of calling
+# input() / print() directly. It defaults to CONSOLE (the terminal);
+# a ScriptedIO answers from a list and keeps the output in memory, so
+# a whole session can run headless without patching builtins:
+#
+#     io = ScriptedIO(["2", "a", "n", "1", "a", "n", "3", "a"])
+#     escape_room.main(io=io)
+#     io.transcript()       # everything the player would have seen
+
+import json
+import sys
+from contextlib import contextmanager
+
+
+class Screen:
+    """A buffer of output lines that is written all at once by flush()."""
+
+    __slots__ = ("_parts",)
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+
+    def line(self, text: str = "") -> None:
+        """Adds one line (the newline is added for you)."""
+        self._parts.append(text)
+        self._parts.append("\n")
+
+    def write(self, text: str) -> None:
+        """Adds raw text, e.g. a cached block that already ends in a newline."""
+        self._parts.append(text)
+
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def flush(self, stream=None) -> None:
+        """Writes everything buffered so far with a single write() call."""
+        if not self._parts:
+            return
+        stream = stream or sys.stdout
+        stream.write("".join(self._parts))
+        stream.flush()
+        self._parts.clear()
+
+
+@contextmanager
+def screen(out: Screen | None = None, stream=None):
+    """
+    Yields a Screen to draw into. If the caller passed their own
+    `out`, it is reused and left for them to flush; otherwise a new one
+    is created and flushed (to `stream`, default stdout) when the
+    with-block ends.
+    """
+    if out is not None:
+        yield out
+        return
+
+    out = Screen()
+    yield out
+    out.flush(stream)
+
+
+def write_json(data, stream=None) -> None:
+    """Writes data as one line of JSON (the machine-readable output mode)."""
+    stream = stream or sys.stdout
+    stream.write(json.dumps(data, ensure_ascii=False, default=str) + "\n")
+    stream.flush()
+
+
+# ------------------------------------------------------------
+# PLUGGABLE I/O
+# ------------------------------------------------------------
+
+class ConsoleIO:
+    """
+    The terminal: input() for questions, stdout for everything else.
+    Also a stream (write / flush), so a Screen can flush straight to it.
+    """
+
+    def input(self, prompt: str = "") -> str:
+        return input(prompt)
+
+    def print(self, *values, sep: str = " ", end: str = "\n") -> None:
+        self.write(sep.join(map(str, values)) + end)
+
+    def write(self, text: str) -> None:
+        sys.stdout.write(text)
+
+    def flush(self) -> None:
+        sys.stdout.flush()
+
+
+class ScriptedIO(ConsoleIO):
+    """
+    Answers questions from a recorded list of inputs and keeps the
+    output in memory (or drops it, with record=False). Running out of
+    answers raises EOFError — the same thing input() does at the end
+    of piped input.
+    """
+
+    def __init__(self, answers, record: bool = True) -> None:
+        self._answers = iter(answers)
+        self._record = record
+        self._parts: list[str] = []
+        self.asked = 0
+
+    def input(self, prompt: str = "") -> str:
+        self.write(prompt)
+        self.asked += 1
+        try:
+            return next(self._answers)
+        except StopIteration:
+            raise EOFError("script ran out of input") from None
+
+    def write(self, text: str) -> None:
+        if self._record:
+            self._parts.append(text)
+
+    def flush(self) -> None:
+        pass
+
+    def transcript(self) -> str:
+        """Everything written so far, prompts included, as the player would see it."""
+        return "".join(self._parts)
+
+
+CONSOLE = ConsoleIO()
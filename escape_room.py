@@ -5,17 +5,50 @@ Architecture: Single-script, data-driven design.
 Game state is managed in a PlayerState dataclass.
 Rooms/choices are defined as a nested dict — making it easy to extend
 without touching game-loop logic (Open/Closed Principle).
+
+At import the WORLD dict is compiled into an integer-indexed graph
+(see compile_world): every room and choice becomes a small immutable
+tuple, every item becomes one bit, and the player's inventory is a
+single int. Moving around is list indexing and bit tests — no nested
+dict lookups — so worlds with tens of thousands of rooms stay fast.
 """
 
-from dataclasses import dataclass, field
+import argparse
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import NamedTuple
+
+from console import CONSOLE, ConsoleIO, Screen, screen
+from metrics import METRICS
 
 # ---------------------------------------------------------------------------
 # Player State — single source of truth for runtime state
 # ---------------------------------------------------------------------------
+# Binary form: escaped flag, room index, inventory byte count, inventory bytes
+_STATE = struct.Struct("<BiH")
+
+
 @dataclass
 class PlayerState:
-    inventory: set = field(default_factory=set)
+    inventory: int = 0          # bitmask: bit i set = holding world.items[i]
     escaped: bool = False
+    room: int = -1              # room index the player is in, -1 = main hall
+
+    def to_bytes(self) -> bytes:
+        """A few bytes that read_state() turns back into this state."""
+        mask = self.inventory.to_bytes((self.inventory.bit_length() + 7) // 8, "little")
+        return _STATE.pack(self.escaped, self.room, len(mask)) + mask
+
+
+def read_state(data, offset: int = 0) -> tuple[PlayerState, int]:
+    """Decodes a PlayerState.to_bytes() record at `offset`. Returns (state, offset after it)."""
+    escaped, room, mask_len = _STATE.unpack_from(data, offset)
+    start = offset + _STATE.size
+    inventory = int.from_bytes(data[start:start + mask_len], "little")
+    return PlayerState(inventory, bool(escaped), room), start + mask_len
 
 
 # ---------------------------------------------------------------------------
@@ -23,6 +56,9 @@ class PlayerState:
 # Each top-level key is a main room.
 # Each choice inside has: 'desc', optional 'item' to pick up,
 # optional 'requires' (item needed), optional 'escape' flag.
+# Optional extras: a choice with 'goto': "<room key>" walks straight
+# into that room, and a room with 'hidden': True is left off the main
+# hall menu (it can only be reached through a 'goto').
 # ---------------------------------------------------------------------------
 WORLD = {
     "1": {
@@ -80,103 +116,471 @@ WORLD = {
 }
 
 
+# ---------------------------------------------------------------------------
+# Compiled World — WORLD turned into an integer-indexed graph
+# ---------------------------------------------------------------------------
+class Choice(NamedTuple):
+    key: str
+    desc: str
+    requires: int = 0       # bitmask of the items needed (0 = none)
+    item: int = 0           # bit of the item picked up (0 = none)
+    goto: int = -1          # index of the room this leads to (-1 = stay)
+    back: bool = False
+    escape: bool = False
+
+
+class Room(NamedTuple):
+    key: str
+    name: str
+    keys: tuple[str, ...]           # choice keys, in menu order
+    choices: tuple[Choice, ...]     # same order as keys
+
+
+class CompiledWorld:
+    """
+    Read-only world graph. Rooms are addressed by index; the room keys
+    and item names are only needed to talk to the player.
+    """
+
+    __slots__ = ("rooms", "hall", "items", "_index")
+
+    def __init__(self, rooms: list[Room], hall: tuple[int, ...],
+                 items: tuple[str, ...]) -> None:
+        self.rooms = rooms
+        self.hall = hall            # room indexes shown on the main menu
+        self.items = items          # item name of each inventory bit
+        self._index = {room.key: i for i, room in enumerate(rooms)}
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+    def room(self, index: int) -> Room:
+        return self.rooms[index]
+
+    def label(self, index: int) -> tuple[str, str]:
+        """(key, name) of a room — all the main menu needs."""
+        room = self.rooms[index]
+        return room.key, room.name
+
+    def index_of(self, key: str) -> int:
+        """Room index for a room key. Raises KeyError if there is none."""
+        return self._index[key]
+
+    def item_names(self, mask: int) -> list[str]:
+        """Names of the items whose bits are set in `mask`."""
+        return [name for bit, name in enumerate(self.items) if mask >> bit & 1]
+
+    def signature(self) -> int:
+        """
+        Checksum of the room count and item order. Saved games store room
+        indexes and item bits, so they only fit a world with the same one.
+        """
+        return zlib.crc32(f"{len(self)}|{'|'.join(self.items)}".encode("utf-8"))
+
+
+def _item_list(value, where: str, field: str) -> list[str]:
+    """'requires' may name one item or list several. Raises ValueError for anything else."""
+    if value is None or value == "" or value == []:
+        return []
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list) and all(isinstance(name, str) for name in value):
+        return value
+    raise ValueError(f"{where}: {field!r} must be an item name or a list of item names")
+
+
+def compile_world(world: dict) -> CompiledWorld:
+    """
+    Compiles a WORLD-style dict. Raises ValueError for a room without
+    a 'name' or 'choices', a choice without a 'desc', a 'goto' to a
+    room that doesn't exist, or a field of the wrong type (names, descs,
+    gotos and items are strings; 'requires' / 'item' may be a list).
+    """
+    index = {key: i for i, key in enumerate(world)}
+    bits: dict[str, int] = {}
+
+    def mask_of(names: list[str]) -> int:
+        mask = 0
+        for name in names:
+            mask |= 1 << bits.setdefault(name, len(bits))
+        return mask
+
+    rooms = []
+    for room_key, room in world.items():
+        if not isinstance(room, dict) or "name" not in room or not isinstance(room.get("choices"), dict):
+            raise ValueError(f"room {room_key!r}: needs a 'name' and a 'choices' table")
+        if not isinstance(room["name"], str):
+            raise ValueError(f"room {room_key!r}: 'name' must be a string")
+        keys, choices = [], []
+        for choice_key, choice in room["choices"].items():
+            where = f"room {room_key!r}, choice {choice_key!r}"
+            if not isinstance(choice, dict):
+                raise ValueError(f"{where}: must be a table with a 'desc'")
+            if "desc" not in choice:
+                raise ValueError(f"{where}: missing 'desc'")
+            if not isinstance(choice["desc"], str):
+                raise ValueError(f"{where}: 'desc' must be a string")
+            goto = choice.get("goto")
+            if goto is not None and not isinstance(goto, str):
+                raise ValueError(f"{where}: 'goto' must be a room key")
+            if goto is not None and goto not in index:
+                raise ValueError(f"{where}: 'goto' to unknown room {goto!r}")
+            keys.append(choice_key)
+            choices.append(Choice(
+                key=choice_key,
+                desc=choice["desc"],
+                requires=mask_of(_item_list(choice.get("requires"), where, "requires")),
+                item=mask_of(_item_list(choice.get("item"), where, "item")),
+                goto=-1 if goto is None else index[goto],
+                back=bool(choice.get("back")),
+                escape=bool(choice.get("escape")),
+            ))
+        rooms.append(Room(room_key, room["name"], tuple(keys), tuple(choices)))
+
+    hall = tuple(i for i, room in enumerate(world.values()) if not room.get("hidden"))
+    return CompiledWorld(rooms, hall, tuple(bits))
+
+
+def validate_world(world: CompiledWorld) -> list[str]:
+    """
+    Lists problems a player would run into: rooms no path leads to,
+    items something requires but nothing in a reachable room gives,
+    and worlds with no reachable way out. Empty list = all good.
+    """
+    reachable = set(world.hall)
+    todo = list(world.hall)
+    while todo:
+        for choice in world.room(todo.pop()).choices:
+            if choice.goto >= 0 and choice.goto not in reachable:
+                reachable.add(choice.goto)
+                todo.append(choice.goto)
+
+    problems = [f"room {world.room(i).key!r} ({world.room(i).name}) is unreachable"
+                for i in range(len(world)) if i not in reachable]
+
+    given = required = 0
+    can_escape = False
+    for i in reachable:
+        for choice in world.room(i).choices:
+            given |= choice.item
+            required |= choice.requires
+            can_escape = can_escape or choice.escape
+    for name in world.item_names(required & ~given):
+        problems.append(f"item {name!r} is required but no reachable choice gives it")
+    if not can_escape:
+        problems.append("no reachable choice escapes")
+    return problems
+
+
+GAME = compile_world(WORLD)
+
+
+# ---------------------------------------------------------------------------
+# Game Rules — one step of play, shared by every front end
+# ---------------------------------------------------------------------------
+# What resolve_choice() decided
+INVALID, BACK, LOCKED, ACTED, MOVED, ESCAPED = range(6)
+OUTCOME_NAMES = ("invalid", "back", "locked", "acted", "moved", "escaped")
+
+
+class Outcome(NamedTuple):
+    kind: int
+    choice: Choice | None = None
+    gained: int = 0         # bit of an item newly picked up (0 = none)
+
+
+def resolve_choice(world: CompiledWorld, room_index: int, choice_key: str,
+                   state: PlayerState) -> Outcome:
+    """
+    Applies one choice in one room to the player's state and says what
+    happened. No printing — the caller decides how to show it.
+    """
+    room = world.room(room_index)
+    try:
+        choice = room.choices[room.keys.index(choice_key)]
+    except ValueError:
+        return Outcome(INVALID)
+
+    if choice.back:
+        return Outcome(BACK, choice)
+
+    # Check if an item is required (e.g., key to open door)
+    if choice.requires & ~state.inventory:
+        return Outcome(LOCKED, choice)
+
+    # Pick up item if present and not already in inventory
+    gained = choice.item & ~state.inventory
+    state.inventory |= choice.item
+
+    if choice.escape:
+        state.escaped = True
+        return Outcome(ESCAPED, choice, gained)
+    if choice.goto >= 0:
+        return Outcome(MOVED, choice, gained)
+    return Outcome(ACTED, choice, gained)
+
+
 # ---------------------------------------------------------------------------
 # Display Helpers
 # ---------------------------------------------------------------------------
-def show_main_menu():
-    print("\n" + "=" * 45)
-    print("  YOU WAKE UP IN A STRANGE MANSION.")
-    print("  Where do you go?")
-    print("=" * 45)
-    for key, room in WORLD.items():
-        print(f"  [{key}] {room['name']}")
-    print("  [0] Quit")
-    print("-" * 45)
+# The world doesn't change while the game runs, so each menu's text is
+# built once and cached (bounded, so a huge world can't fill memory).
+@lru_cache(maxsize=8)
+def _main_menu_text(world: CompiledWorld) -> str:
+    lines = ["", "=" * 45, "  YOU WAKE UP IN A STRANGE MANSION.", "  Where do you go?", "=" * 45]
+    lines += ["  [%s] %s" % world.label(i) for i in world.hall]
+    lines += ["  [save] Save game   [load] Load game", "  [0] Quit", "-" * 45, ""]
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=1024)
+def _room_choices_text(world: CompiledWorld, room_index: int) -> str:
+    room = world.room(room_index)
+    lines = ["  What do you do?"]
+    lines += [f"  [{choice.key}] {choice.desc}" for choice in room.choices]
+    lines += ["-" * 35, ""]
+    return "\n".join(lines)
+
+
+def _inventory_text(world: CompiledWorld, state: PlayerState) -> str:
+    return ', '.join(world.item_names(state.inventory)) or 'empty'
+
+
+# Every helper takes an optional `out`: pass a Screen to collect the text
+# (the multi-player server does) instead of writing it to the terminal.
+def show_main_menu(world: CompiledWorld = GAME, out: Screen | None = None):
+    with screen(out) as out:
+        out.write(_main_menu_text(world))
+
+
+def show_room_menu(room_index: int, state: PlayerState, world: CompiledWorld = GAME,
+                   out: Screen | None = None):
+    with screen(out) as out:
+        out.line(f"\n--- {world.room(room_index).name} ---")
+        out.line(f"  Inventory: {_inventory_text(world, state)}")
+        out.write(_room_choices_text(world, room_index))
+
+
+def narrate(outcome: Outcome, state: PlayerState, world: CompiledWorld = GAME,
+            out: Screen | None = None):
+    """Tells the player what a resolve_choice() outcome did (nothing for BACK)."""
+    with screen(out) as out:
+        if outcome.kind == INVALID:
+            out.line("  Invalid choice, try again.")
+        elif outcome.kind == LOCKED:
+            needed = world.item_names(outcome.choice.requires & ~state.inventory)
+            out.line(f"  [!] You need a {', '.join(needed)} to do that.")
+        elif outcome.kind != BACK:
+            out.line(f"\n  >> {outcome.choice.desc}")
+            for item in world.item_names(outcome.gained):
+                out.line(f"  [+] {item.upper()} added to inventory.")
+
+
+def show_escape(state: PlayerState, world: CompiledWorld = GAME, out: Screen | None = None):
+    with screen(out) as out:
+        out.line("\n" + "=" * 45)
+        out.line("  🎉 CONGRATULATIONS! You escaped the mansion!")
+        inv = ', '.join(world.item_names(state.inventory))
+        out.line(f"  Items collected: {inv}")
+        out.line("=" * 45 + "\n")
+
+
+# ---------------------------------------------------------------------------
+# Saved Games — "save" / "load" at any prompt that asks for a choice
+# ---------------------------------------------------------------------------
+SAVE_PATH = os.environ.get("ESCAPE_SAVE", "escape_save.bin")
 
+_SAVE_MAGIC  = b"ESCSAVE1"
+_SAVE_HEADER = struct.Struct("<8sI")       # magic, world signature
 
-def show_room_menu(room: dict, state: PlayerState):
-    print(f"\n--- {room['name']} ---")
-    print(f"  Inventory: {', '.join(state.inventory) if state.inventory else 'empty'}")
-    print("  What do you do?")
-    for key, choice in room["choices"].items():
-        print(f"  [{key}] {choice['desc']}")
-    print("-" * 35)
+
+def save_game(state: PlayerState, world: CompiledWorld = GAME, path: str = SAVE_PATH) -> None:
+    """Writes one player's state (temp file + rename, so a crash keeps the old save)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_SAVE_HEADER.pack(_SAVE_MAGIC, world.signature()) + state.to_bytes())
+    os.replace(tmp_path, path)
+
+
+def load_game(world: CompiledWorld = GAME, path: str = SAVE_PATH) -> PlayerState:
+    """Reads a save_game() file. Raises ValueError if it belongs to another world."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _SAVE_HEADER.size:
+        raise ValueError("not a saved game")
+    magic, signature = _SAVE_HEADER.unpack_from(data)
+    if magic != _SAVE_MAGIC:
+        raise ValueError("not a saved game")
+    if signature != world.signature():
+        raise ValueError("that save is from a different world")
+    return read_state(data, _SAVE_HEADER.size)[0]
+
+
+def save_or_load(command: str, state: PlayerState, world: CompiledWorld = GAME,
+                 io: ConsoleIO = CONSOLE) -> bool:
+    """
+    Handles a "save" or "load" typed at a prompt. Loading overwrites
+    `state` in place. Returns False if the command was neither.
+    """
+    if command == "save":
+        try:
+            save_game(state, world)
+            io.print(f"  [✓] Game saved to {SAVE_PATH}.")
+        except OSError as error:
+            io.print(f"  [!] Could not save: {error}")
+        return True
+
+    if command == "load":
+        try:
+            loaded = load_game(world)
+        except (OSError, ValueError, struct.error) as error:
+            io.print(f"  [!] Could not load: {error}")
+            return True
+        state.inventory, state.escaped, state.room = loaded.inventory, loaded.escaped, loaded.room
+        io.print("  [✓] Game loaded.")
+        return True
+
+    return False
 
 
 # ---------------------------------------------------------------------------
 # Room Interaction — handles item pickup, escape, and requirement checks
 # ---------------------------------------------------------------------------
-def handle_room(room_key: str, state: PlayerState):
-    room = WORLD[room_key]
+METRICS.describe("escape_hall_seconds", "Main-hall choice handling time", "choice")
+METRICS.describe("escape_room_seconds", "In-room choice handling time, by outcome", "outcome")
+METRICS.describe("escape_games_total", "Games finished", "result")
+
+
+def handle_room(room_key: str, state: PlayerState, world: CompiledWorld = GAME,
+                io: ConsoleIO = CONSOLE):
+    state.room = room_index = world.index_of(room_key)
 
     while True:
-        show_room_menu(room, state)
-        choice_key = input("  Your choice: ").strip().lower()
+        with screen(stream=io) as out:
+            show_room_menu(room_index, state, world, out)
+        choice_key = io.input("  Your choice: ").strip().lower()
+        started = METRICS.start()
 
-        if choice_key not in room["choices"]:
-            print("  Invalid choice, try again.")
+        if save_or_load(choice_key, state, world, io):
+            METRICS.stop("escape_room_seconds", started, choice_key)
+            if state.room < 0 or state.escaped:
+                return
+            room_index = state.room
             continue
 
-        choice = room["choices"][choice_key]
+        outcome = resolve_choice(world, room_index, choice_key, state)
 
         # Back to main hall
-        if choice.get("back"):
+        if outcome.kind == BACK:
+            state.room = -1
+            METRICS.stop("escape_room_seconds", started, "back")
             return
 
-        # Check if an item is required (e.g., key to open door)
-        required = choice.get("requires")
-        if required and required not in state.inventory:
-            print(f"  [!] You need a {required} to do that.")
+        # Narrate the outcome (or why it didn't happen)
+        with screen(stream=io) as out:
+            narrate(outcome, state, world, out)
+        METRICS.stop("escape_room_seconds", started, OUTCOME_NAMES[outcome.kind])
+        if outcome.kind in (INVALID, LOCKED):
             continue
 
-        # Narrate the outcome
-        print(f"\n  >> {choice['desc']}")
-
-        # Pick up item if present and not already in inventory
-        item = choice.get("item")
-        if item and item not in state.inventory:
-            state.inventory.add(item)
-            print(f"  [+] {item.upper()} added to inventory.")
-
         # Escape condition
-        if choice.get("escape"):
-            state.escaped = True
+        if outcome.kind == ESCAPED:
             return
 
+        # Walked through to another room
+        if outcome.kind == MOVED:
+            state.room = room_index = outcome.choice.goto
+            continue
+
         # After an action (non-back), ask if they want to stay or leave
-        again = input("\n  Stay in this room? (y/n): ").strip().lower()
+        again = io.input("\n  Stay in this room? (y/n): ").strip().lower()
         if again != "y":
+            state.room = -1
             return
 
 
 # ---------------------------------------------------------------------------
 # Main Game Loop
 # ---------------------------------------------------------------------------
-def main():
-    print("\n*** WELCOME TO THE MANSION ESCAPE ***")
+@lru_cache(maxsize=8)
+def _hall_set(world: CompiledWorld) -> frozenset[int]:
+    return frozenset(world.hall)
+
+
+def hall_room(world: CompiledWorld, choice: str) -> int | None:
+    """Room index for a main-menu choice, or None if it isn't one."""
+    try:
+        index = world.index_of(choice)
+    except KeyError:
+        return None
+    return index if index in _hall_set(world) else None
+
+
+def main(world: CompiledWorld = GAME, io: ConsoleIO = CONSOLE) -> PlayerState:
+    """
+    Plays one game against `io` — the terminal unless a ScriptedIO (or
+    any other ConsoleIO) is passed — and returns the final state.
+    """
+    io = METRICS.wrap_io(io)
+    io.print("\n*** WELCOME TO THE MANSION ESCAPE ***")
     state = PlayerState()
 
     while not state.escaped:
-        show_main_menu()
-        choice = input("  Your choice: ").strip()
+        with screen(stream=io) as out:
+            show_main_menu(world, out)
+        choice = io.input("  Your choice: ").strip()
+        started = METRICS.start()
 
         if choice == "0":
-            print("\n  You chose to quit. Goodbye!\n")
+            io.print("\n  You chose to quit. Goodbye!\n")
+            METRICS.stop("escape_hall_seconds", started, "quit")
+            METRICS.count("escape_games_total", "quit")
             break
 
-        if choice not in WORLD:
-            print("  Invalid option, try again.")
+        if save_or_load(choice.lower(), state, world, io):
+            METRICS.stop("escape_hall_seconds", started, choice.lower())
+            if state.room < 0 or state.escaped:
+                continue
+            # The save was made inside a room — go straight back there
+            choice = world.label(state.room)[0]
+        elif hall_room(world, choice) is None:
+            io.print("  Invalid option, try again.")
+            METRICS.stop("escape_hall_seconds", started, "invalid")
             continue
+        else:
+            METRICS.stop("escape_hall_seconds", started, "room")
 
-        handle_room(choice, state)
+        handle_room(choice, state, world, io)
 
         if state.escaped:
-            print("\n" + "=" * 45)
-            print("  🎉 CONGRATULATIONS! You escaped the mansion!")
-            inv = ', '.join(state.inventory)
-            print(f"  Items collected: {inv}")
-            print("=" * 45 + "\n")
+            with screen(stream=io) as out:
+                show_escape(state, world, out)
+            METRICS.count("escape_games_total", "escaped")
+
+    return state
+
+
+def run(argv: list[str] | None = None) -> None:
+    """Command line: play the built-in mansion or a world file."""
+    parser = argparse.ArgumentParser(description="Escape room text adventure.")
+    parser.add_argument("--world", help="play a .json / .toml world file instead of the mansion")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="time each choice and write FILE on exit (.json or Prometheus text)")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        METRICS.enable()
+    try:
+        if args.world is None:
+            main()
+        else:
+            # Imported here: escape_world builds on the classes above
+            from escape_world import load_world
+            main(load_world(args.world))
+    finally:
+        if args.metrics:
+            METRICS.write(args.metrics)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run()
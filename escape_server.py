@@ -0,0 +1,338 @@
+"""
+Escape Room Server
+==================
+Hosts many escape_room players at once in a single process.
+
+Every TCP connection gets its own GameSession — a PlayerState (which
+includes the room they are in) plus which question they were last
+asked — while all sessions share one read-only CompiledWorld. The game
+text is the same as in the terminal version; a session is only ever
+waiting for the player's next line, so it costs a few small objects,
+not a thread.
+
+    session = GameSession(world)
+    text = session.start()              # welcome + main menu + prompt
+    text = session.feed("2")            # one line of input -> reply text
+    ...                                 # until session.done
+
+With --save-file, players give a name when they connect, and every
+player's state is written to one snapshot file every few seconds (and
+on shutdown) with a single write. After a restart the snapshot is read
+back in one go, and each player resumes where they were.
+
+Usage:
+    python escape_server.py --port 9000
+    python escape_server.py --port 9000 --world big_world.json --save-file players.bin
+    nc localhost 9000
+"""
+
+import argparse
+import asyncio
+import os
+import struct
+
+import escape_room as game
+from console import Screen
+from escape_world import load_world
+
+# Where a session is: which question its next line answers
+HALL, ROOM, STAY, OVER = range(4)
+
+_CHOICE_PROMPT = "  Your choice: "
+_STAY_PROMPT   = "\n  Stay in this room? (y/n): "
+
+# Per-connection limits: longest accepted input line, and how long a
+# player may sit idle before the session is closed
+MAX_LINE     = 256
+IDLE_TIMEOUT = 600.0
+
+# How often live players are snapshotted, and the longest player name
+SNAPSHOT_INTERVAL = 5.0
+MAX_NAME          = 32
+
+
+class GameSession:
+    """The terminal game's main() and handle_room() loops, turned inside out."""
+
+    __slots__ = ("world", "state", "phase", "saved")
+
+    def __init__(self, world: game.CompiledWorld = game.GAME,
+                 state: game.PlayerState | None = None, saved: bool = False) -> None:
+        self.world = world
+        self.state = state or game.PlayerState()
+        # Whether the server keeps this player's progress (--save-file)
+        self.saved = saved
+        # A restored player picks up in the room they were in
+        self.phase = HALL if self.state.room < 0 else ROOM
+
+    @property
+    def done(self) -> bool:
+        return self.phase == OVER
+
+    def start(self) -> str:
+        out = Screen()
+        out.line("\n*** WELCOME TO THE MANSION ESCAPE ***")
+        return self._ask(out)
+
+    def _ask(self, out: Screen) -> str:
+        """Adds the menu and prompt for the current phase and returns the text."""
+        if self.phase == HALL:
+            game.show_main_menu(self.world, out)
+            out.write(_CHOICE_PROMPT)
+        elif self.phase == ROOM:
+            game.show_room_menu(self.state.room, self.state, self.world, out)
+            out.write(_CHOICE_PROMPT)
+        elif self.phase == STAY:
+            out.write(_STAY_PROMPT)
+        return out.text()
+
+    def feed(self, line: str) -> str:
+        """Handles one line from the player and returns everything to show next."""
+        out = Screen()
+        command = line.strip().lower()
+        if self.phase in (HALL, ROOM) and command in ("save", "load"):
+            if self.saved:
+                out.line("  [✓] Progress is saved automatically on this server.")
+            else:
+                out.line("  ⚠  This server doesn't keep progress — finish in one sitting!")
+        elif self.phase == HALL:
+            self._in_hall(line.strip(), out)
+        elif self.phase == ROOM:
+            self._in_room(command, out)
+        elif self.phase == STAY:
+            self._leave_room(command != "y")
+        return self._ask(out)
+
+    def _leave_room(self, leave: bool = True) -> None:
+        if leave:
+            self.state.room = -1
+            self.phase = HALL
+        else:
+            self.phase = ROOM
+
+    def _in_hall(self, choice: str, out: Screen) -> None:
+        if choice == "0":
+            out.line("\n  You chose to quit. Goodbye!\n")
+            self.phase = OVER
+            return
+        room = game.hall_room(self.world, choice)
+        if room is None:
+            out.line("  Invalid option, try again.")
+            return
+        self.state.room = room
+        self.phase = ROOM
+
+    def _in_room(self, choice_key: str, out: Screen) -> None:
+        outcome = game.resolve_choice(self.world, self.state.room, choice_key, self.state)
+        if outcome.kind == game.BACK:
+            self._leave_room()
+            return
+
+        game.narrate(outcome, self.state, self.world, out)
+        if outcome.kind == game.ESCAPED:
+            game.show_escape(self.state, self.world, out)
+            self.phase = OVER
+        elif outcome.kind == game.MOVED:
+            self.state.room = outcome.choice.goto
+        elif outcome.kind == game.ACTED:
+            self.phase = STAY
+
+
+# ---------------------------------------------------------------------------
+# Snapshots — every player's state in one file
+# ---------------------------------------------------------------------------
+_SNAP_MAGIC  = b"ESCSNAP1"
+_SNAP_HEADER = struct.Struct("<8sII")      # magic, world signature, player count
+_NAME        = struct.Struct("<B")         # name length (utf-8 bytes)
+
+
+class SnapshotStore:
+    """
+    Saves and restores a whole {name: PlayerState} dict at once.
+
+    save() encodes every player into one buffer and writes it with a
+    single write to a temp file that then replaces the old snapshot,
+    so a crash mid-save leaves the previous snapshot intact.
+    """
+
+    def __init__(self, path: str, world: game.CompiledWorld) -> None:
+        self.path = path
+        self.signature = world.signature()
+
+    def save(self, players: dict[str, game.PlayerState]) -> None:
+        parts = [_SNAP_HEADER.pack(_SNAP_MAGIC, self.signature, len(players))]
+        for name, state in players.items():
+            encoded = name.encode("utf-8")
+            parts.append(_NAME.pack(len(encoded)) + encoded + state.to_bytes())
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(parts))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> dict[str, game.PlayerState]:
+        """Every saved player, or {} if there is no snapshot yet."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return {}
+
+        magic, signature, count = _SNAP_HEADER.unpack_from(data)
+        if magic != _SNAP_MAGIC:
+            raise ValueError(f"{self.path} is not a player snapshot")
+        if signature != self.signature:
+            raise ValueError(f"{self.path} was saved for a different world")
+
+        players = {}
+        offset = _SNAP_HEADER.size
+        for _ in range(count):
+            (length,) = _NAME.unpack_from(data, offset)
+            offset += _NAME.size
+            name = data[offset:offset + length].decode("utf-8")
+            players[name], offset = game.read_state(data, offset + length)
+        return players
+
+
+# ---------------------------------------------------------------------------
+# TCP front end
+# ---------------------------------------------------------------------------
+class SessionServer:
+    """
+    Accepts connections and runs one GameSession per connection. With
+    a SnapshotStore, players are known by name and their states are
+    kept (and snapshotted) across disconnects and restarts.
+    """
+
+    def __init__(self, world: game.CompiledWorld, max_sessions: int = 10_000,
+                 idle_timeout: float = IDLE_TIMEOUT, store: SnapshotStore | None = None,
+                 snapshot_interval: float = SNAPSHOT_INTERVAL) -> None:
+        self.world = world
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.store = store
+        self.snapshot_interval = snapshot_interval
+        self.players: dict[str, game.PlayerState] = store.load() if store else {}
+        self.playing: set[str] = set()
+        self.active = 0
+        self.served = 0
+        self._dirty = False
+
+    async def _read_line(self, reader: asyncio.StreamReader) -> str | None:
+        """Next line from the player, or None on disconnect / timeout / overlong line."""
+        try:
+            line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+        except (asyncio.TimeoutError, ValueError):
+            # ValueError: line longer than MAX_LINE — drop the player rather than buffer it
+            return None
+        return line.decode("utf-8", "replace") if line else None
+
+    async def _sign_in(self, reader, writer) -> str | None:
+        """Asks for a player name; returns it, or None if the player can't join."""
+        writer.write(b"  Your name (to resume later): ")
+        await writer.drain()
+        line = await self._read_line(reader)
+        name = line.strip() if line else ""
+        if not 0 < len(name) <= MAX_NAME:
+            writer.write(f"  Names are 1-{MAX_NAME} characters.\n".encode("utf-8"))
+            return None
+        if name in self.playing:
+            writer.write(b"  That player is already connected.\n")
+            return None
+        return name
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if self.active >= self.max_sessions:
+            writer.write(b"  Server is full, try again later.\n")
+            await writer.drain()
+            writer.close()
+            return
+
+        self.active += 1
+        name = None
+        try:
+            state = None
+            if self.store is not None:
+                name = await self._sign_in(reader, writer)
+                if name is None:
+                    return
+                self.playing.add(name)
+                state = self.players.get(name)
+                if state is None or state.escaped:
+                    # New player, or last game was won — start fresh
+                    state = self.players[name] = game.PlayerState()
+
+            session = GameSession(self.world, state, saved=self.store is not None)
+            writer.write(session.start().encode("utf-8"))
+            await writer.drain()
+            while not session.done:
+                line = await self._read_line(reader)
+                if line is None:
+                    break
+                writer.write(session.feed(line).encode("utf-8"))
+                self._dirty = True
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.playing.discard(name)
+            self.active -= 1
+            self.served += 1
+            writer.close()
+
+    def snapshot(self) -> None:
+        """Writes every known player's state now (one write)."""
+        if self.store is not None:
+            self.store.save(self.players)
+            self._dirty = False
+
+    async def _snapshot_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            if self._dirty:
+                self.snapshot()
+
+    async def serve(self, host: str, port: int) -> None:
+        # A deep accept backlog so a burst of players connecting at once isn't refused
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE,
+                                            backlog=min(self.max_sessions, 4096))
+        print(f"  🏚  Escape room server on {host}:{port} ({len(self.world)} rooms, "
+              f"{len(self.players)} saved players)")
+        snapshots = asyncio.create_task(self._snapshot_loop()) if self.store else None
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if snapshots is not None:
+                snapshots.cancel()
+                self.snapshot()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Multi-player escape room server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--world", help=".json / .toml world file (default: the built-in mansion)")
+    parser.add_argument("--max-sessions", type=int, default=10_000,
+                        help="connections beyond this are turned away")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT,
+                        help="seconds a player may stay idle before being disconnected")
+    parser.add_argument("--save-file", help="snapshot file that keeps players' progress across restarts")
+    parser.add_argument("--snapshot-interval", type=float, default=SNAPSHOT_INTERVAL,
+                        help=f"seconds between snapshots (default {SNAPSHOT_INTERVAL:g})")
+    args = parser.parse_args(argv)
+
+    world = load_world(args.world) if args.world else game.GAME
+    store = SnapshotStore(args.save_file, world) if args.save_file else None
+
+    server = SessionServer(world, args.max_sessions, args.idle_timeout, store, args.snapshot_interval)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print(f"\n  Server stopped after {server.served} sessions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Escape Room Solver
+==================
+Answers "can this world be won, and how?" without anyone playing it.
+
+A player's situation is a (room, inventory) pair: the room index (or
+HALL for the main menu) and the inventory bitmask. solve() runs a
+breadth-first search over those pairs, using the same rules as
+resolve_choice(), so the first escape it reaches is a shortest win.
+
+Only item bits that some choice *requires* are kept in the search
+state: picking up an item nothing needs can't open a new path, so two
+inventories that differ only in such items are the same state. That
+keeps a world with thousands of rooms and dozens of items down to a
+few hundred thousand states in the usual case, where items unlock
+things in a mostly fixed order.
+
+After the search, a backwards pass from every state that can escape
+finds the dead ends: states the player can reach but never win from.
+
+    solution = solve(world)
+    solution.inputs        # ["2", "a", "n", "1", "a", "n", "3", "a"]
+    solution.dead_ends     # [(room index, inventory), ...]
+
+replay() feeds a list of inputs through a GameSession — the real game
+logic, minus the terminal — which makes it a fast headless driver for
+checking a path or scripting a playthrough.
+
+Usage:
+    python escape_solver.py                       # the built-in mansion
+    python escape_solver.py --world big.json      # a world file
+"""
+
+import argparse
+import sys
+import time
+from collections import deque
+from typing import NamedTuple
+
+import escape_room as game
+from escape_server import GameSession
+from escape_world import load_world
+
+HALL = -1
+
+# A step's label: ("enter", room) from the hall, or (room, choice key,
+# answer to the stay question — "y", "n" or None if it isn't asked)
+ENTER = "enter"
+
+
+class Solution(NamedTuple):
+    inputs: list[str] | None            # keystrokes of a shortest win, None if unwinnable
+    steps: list[str]                    # the same path, as readable lines
+    explored: int                       # distinct states visited
+    dead_ends: list[tuple[int, int]]    # reachable (room, inventory) states with no way out
+    seconds: float
+
+
+def _relevant_items(world: game.CompiledWorld) -> int:
+    """Bitmask of every item some choice requires."""
+    relevant = 0
+    for i in range(len(world)):
+        for choice in world.room(i).choices:
+            relevant |= choice.requires
+    return relevant
+
+
+def _successors(world: game.CompiledWorld, room: int, mask: int, relevant: int):
+    """
+    Yields (next state or None for an escape, step label) for every
+    move from (room, mask) — mirroring resolve_choice() and the
+    stay-in-this-room question.
+    """
+    if room == HALL:
+        for target in world.hall:
+            yield (target, mask), (ENTER, target)
+        return
+
+    for choice in world.room(room).choices:
+        if choice.back:
+            yield (HALL, mask), (room, choice.key, None)
+            continue
+        if choice.requires & ~mask:
+            continue
+        after = (mask | choice.item) & relevant
+        if choice.escape:
+            yield None, (room, choice.key, None)
+        elif choice.goto >= 0:
+            yield (choice.goto, after), (room, choice.key, None)
+        else:
+            if after != mask:
+                # Staying only matters if the pick-up changed something
+                yield (room, after), (room, choice.key, "y")
+            yield (HALL, after), (room, choice.key, "n")
+
+
+def solve(world: game.CompiledWorld = game.GAME,
+          start: game.PlayerState | None = None) -> Solution:
+    """Finds a shortest winning path and every dead end reachable from `start`."""
+    started = time.perf_counter()
+    relevant = _relevant_items(world)
+    start = start or game.PlayerState()
+    origin = (start.room, start.inventory & relevant)
+
+    parent: dict[tuple[int, int], tuple | None] = {origin: None}
+    predecessors: dict[tuple[int, int], list] = {}
+    winning: list[tuple[int, int]] = []
+    win = None          # (state the escape was made from, its label)
+    queue = deque([origin])
+
+    while queue:
+        state = queue.popleft()
+        for following, label in _successors(world, state[0], state[1], relevant):
+            if following is None:
+                winning.append(state)
+                if win is None:
+                    win = (state, label)
+                continue
+            predecessors.setdefault(following, []).append(state)
+            if following not in parent:
+                parent[following] = (state, label)
+                queue.append(following)
+
+    # Backwards from every state that has an escape move
+    can_win = set(winning)
+    todo = list(winning)
+    while todo:
+        for previous in predecessors.get(todo.pop(), ()):
+            if previous not in can_win:
+                can_win.add(previous)
+                todo.append(previous)
+    dead_ends = [state for state in parent if state not in can_win]
+
+    inputs = steps = None
+    if win is not None:
+        labels = [win[1]]
+        state = win[0]
+        while parent[state] is not None:
+            state, label = parent[state]
+            labels.append(label)
+        labels.reverse()
+        inputs, steps = _describe(world, labels)
+
+    return Solution(inputs, steps or [], len(parent), dead_ends, time.perf_counter() - started)
+
+
+def _describe(world: game.CompiledWorld, labels: list[tuple]) -> tuple[list[str], list[str]]:
+    """Turns step labels into keystrokes and readable lines."""
+    inputs, steps = [], []
+    for label in labels:
+        if label[0] == ENTER:
+            key, name = world.label(label[1])
+            inputs.append(key)
+            steps.append(f"Go to the {name} [{key}]")
+            continue
+        room, choice_key, answer = label
+        choice = world.room(room).choices[world.room(room).keys.index(choice_key)]
+        inputs.append(choice_key)
+        steps.append(f"  [{choice_key}] {choice.desc}")
+        if answer is not None:
+            inputs.append(answer)
+    return inputs, steps
+
+
+def replay(world: game.CompiledWorld, inputs: list[str],
+           state: game.PlayerState | None = None) -> GameSession:
+    """Plays `inputs` through the game logic without a terminal. Returns the session."""
+    session = GameSession(world, state)
+    session.start()
+    for line in inputs:
+        if session.done:
+            break
+        session.feed(line)
+    return session
+
+
+def show_solution(world: game.CompiledWorld, solution: Solution, limit: int = 20) -> None:
+    print("\n" + "=" * 50)
+    print("           🧭 Escape Room Solver")
+    print("=" * 50)
+    print(f"  Rooms: {len(world)}   Items: {len(world.items)}")
+    print(f"  States explored: {solution.explored:,} in {solution.seconds:.2f}s")
+
+    if solution.inputs is None:
+        print("  ❌ No way out — this world can't be won.")
+    else:
+        print(f"  ✅ Shortest win: {len(solution.steps)} steps")
+        for step in solution.steps[:limit]:
+            print(f"    {step}")
+        if len(solution.steps) > limit:
+            print(f"    ... {len(solution.steps) - limit} more")
+        print(f"  Keystrokes: {' '.join(solution.inputs)}")
+
+    print(f"  Dead ends: {len(solution.dead_ends)}")
+    for room, mask in solution.dead_ends[:limit]:
+        where = "main hall" if room == HALL else world.room(room).name
+        items = ", ".join(world.item_names(mask)) or "no key items"
+        print(f"    {where} with {items}")
+    print("=" * 50)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Find the shortest way out of an escape room world.")
+    parser.add_argument("--world", help=".json / .toml world file (default: the built-in mansion)")
+    parser.add_argument("--limit", type=int, default=20, help="most steps / dead ends to list")
+    args = parser.parse_args(argv)
+
+    world = load_world(args.world) if args.world else game.GAME
+    solution = solve(world)
+    show_solution(world, solution, args.limit)
+
+    if solution.inputs is None:
+        return 1
+    # Double-check the path against the real game logic
+    if not replay(world, solution.inputs).state.escaped:
+        print("  ⚠  Replaying the path did not escape!", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
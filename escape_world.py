@@ -0,0 +1,333 @@
+"""
+Escape Room Worlds
+==================
+Loads escape_room worlds from data files instead of the WORLD literal.
+
+A world file has the same shape as WORLD — room key -> room:
+
+    world.json                          world.toml
+    {                                   ["1"]
+      "1": {                            name = "Dark Forest"
+        "name": "Dark Forest",          [1.choices.a]
+        "choices": {                    desc = "You find a KEY."
+          "a": {"desc": "You find a     item = "key"
+                 KEY.", "item": "key"}
+        }
+      }
+    }
+
+The first load parses the file, compiles it and writes a binary copy
+next to it (world.json.cache). Every later start maps that cache and
+reads only its header and item names, so start-up takes the same time
+for a 4-room world as for a 50k-room one. Rooms are decoded from the
+mapped file the first time the player walks into them.
+
+Cache layout (little-endian, sections padded to 8 bytes):
+
+    header    — magic, source size + mtime (to spot a stale cache),
+                room / hall / item counts, bytes per item bitmask,
+                offset of each section below
+    items     — item names, one per inventory bit
+    hall      — u32 room index per main-menu room
+    by_key    — u32 room indexes sorted by room key (binary search)
+    offsets   — u64 file offset of each room record
+    records   — one variable-length record per room:
+                key, name, then per choice: key, desc, flags,
+                goto (i32), requires mask, item mask
+
+Usage:
+    python escape_world.py check mansion.json     # validate a world
+    python escape_world.py build mansion.json     # (re)build its cache
+    python escape_room.py --world mansion.json    # play it
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tomllib
+
+from escape_room import Choice, CompiledWorld, Room, compile_world, validate_world
+
+_MAGIC   = b"ESCWLD01"
+_HEADER  = struct.Struct("<8sQqIIHH5Q")
+# magic, source size, source mtime (ns), rooms, hall rooms, items,
+# mask bytes, offsets of: items, hall, by_key, offsets, records
+
+_TEXT    = struct.Struct("<I")       # length prefix of a utf-8 string
+_CHOICES = struct.Struct("<H")       # choice count
+_CHOICE  = struct.Struct("<Bi")      # flags, goto
+
+_BACK   = 1
+_ESCAPE = 2
+
+
+# ---------------------------------------------------------------------------
+# Reading world files
+# ---------------------------------------------------------------------------
+def read_world_file(path: str) -> dict:
+    """Parses a .json or .toml world file into a WORLD-style dict."""
+    if path.endswith(".toml"):
+        with open(path, "rb") as f:
+            world = tomllib.load(f)
+    else:
+        with open(path, encoding="utf-8") as f:
+            world = json.load(f)
+    if not isinstance(world, dict) or not world:
+        raise ValueError(f"{path}: a world must map room keys to rooms")
+    return world
+
+
+# ---------------------------------------------------------------------------
+# Writing the cache
+# ---------------------------------------------------------------------------
+def _text(value: str) -> bytes:
+    encoded = value.encode("utf-8")
+    return _TEXT.pack(len(encoded)) + encoded
+
+
+def _pad(parts: list[bytes], size: int) -> int:
+    """Pads the buffer to a multiple of 8 and returns the new size."""
+    padding = -size % 8
+    parts.append(b"\0" * padding)
+    return size + padding
+
+
+def write_cache(world: CompiledWorld, path: str, source_size: int = 0,
+                source_mtime: int = 0) -> None:
+    """Writes a compiled world in the cache layout (temp file + rename)."""
+    mask_bytes = (len(world.items) + 7) // 8 or 1
+    room_count = len(world)
+    items = b"".join(_text(name) for name in world.items)
+
+    records, offsets = [], []
+    for i in range(room_count):
+        room = world.room(i)
+        parts = [_text(room.key), _text(room.name), _CHOICES.pack(len(room.choices))]
+        for choice in room.choices:
+            flags = (_BACK if choice.back else 0) | (_ESCAPE if choice.escape else 0)
+            parts += [_text(choice.key), _text(choice.desc), _CHOICE.pack(flags, choice.goto),
+                      choice.requires.to_bytes(mask_bytes, "little"),
+                      choice.item.to_bytes(mask_bytes, "little")]
+        records.append(b"".join(parts))
+
+    by_key = sorted(range(room_count), key=lambda i: world.room(i).key)
+
+    parts = [b""]    # header goes here once the offsets are known
+    size = _HEADER.size
+    size = _pad(parts, size)
+    items_at = size
+    parts.append(items); size = _pad(parts, size + len(items))
+    hall_at = size
+    hall = struct.pack(f"<{len(world.hall)}I", *world.hall)
+    parts.append(hall); size = _pad(parts, size + len(hall))
+    by_key_at = size
+    index = struct.pack(f"<{room_count}I", *by_key)
+    parts.append(index); size = _pad(parts, size + len(index))
+    offsets_at = size
+    records_at = size + 8 * room_count
+    position = records_at
+    for record in records:
+        offsets.append(position)
+        position += len(record)
+    parts.append(struct.pack(f"<{room_count}Q", *offsets))
+    parts.extend(records)
+
+    parts[0] = _HEADER.pack(_MAGIC, source_size, source_mtime, room_count, len(world.hall),
+                            len(world.items), mask_bytes,
+                            items_at, hall_at, by_key_at, offsets_at, records_at)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"".join(parts))
+    os.replace(tmp_path, path)
+
+
+# ---------------------------------------------------------------------------
+# Reading the cache — rooms decoded on first visit
+# ---------------------------------------------------------------------------
+class LazyWorld(CompiledWorld):
+    """
+    A CompiledWorld backed by a memory-mapped cache file. Only the
+    header and item names are read up front; room(i) decodes room i
+    from the map on first use and keeps it, and index_of() binary
+    searches the sorted key table instead of building a dict.
+    """
+
+    __slots__ = ("_file", "_map", "_count", "_mask_bytes", "_by_key", "_offsets", "_loaded")
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, _size, _mtime, rooms, hall_count, item_count, mask_bytes,
+         items_at, hall_at, by_key_at, offsets_at, _records_at) = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an escape room world cache")
+
+        view = memoryview(self._map)
+        items = []
+        offset = items_at
+        for _ in range(item_count):
+            name, offset = self._read_text(offset)
+            items.append(name)
+
+        self.rooms = None
+        self.hall = view[hall_at:hall_at + 4 * hall_count].cast("I")
+        self.items = tuple(items)
+        self._index = None
+        self._count = rooms
+        self._mask_bytes = mask_bytes
+        self._by_key = view[by_key_at:by_key_at + 4 * rooms].cast("I")
+        self._offsets = view[offsets_at:offsets_at + 8 * rooms].cast("Q")
+        self._loaded: dict[int, Room] = {}
+
+    def _read_text(self, offset: int) -> tuple[str, int]:
+        (length,) = _TEXT.unpack_from(self._map, offset)
+        start = offset + _TEXT.size
+        return self._map[start:start + length].decode("utf-8"), start + length
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _key_at(self, index: int) -> str:
+        return self._read_text(self._offsets[index])[0]
+
+    def label(self, index: int) -> tuple[str, str]:
+        loaded = self._loaded.get(index)
+        if loaded is not None:
+            return loaded.key, loaded.name
+        key, offset = self._read_text(self._offsets[index])
+        return key, self._read_text(offset)[0]
+
+    def room(self, index: int) -> Room:
+        room = self._loaded.get(index)
+        if room is None:
+            room = self._loaded[index] = self._decode(index)
+        return room
+
+    def _decode(self, index: int) -> Room:
+        key, offset = self._read_text(self._offsets[index])
+        name, offset = self._read_text(offset)
+        (count,) = _CHOICES.unpack_from(self._map, offset)
+        offset += _CHOICES.size
+        mask_bytes = self._mask_bytes
+
+        keys, choices = [], []
+        for _ in range(count):
+            choice_key, offset = self._read_text(offset)
+            desc, offset = self._read_text(offset)
+            flags, goto = _CHOICE.unpack_from(self._map, offset)
+            offset += _CHOICE.size
+            requires = int.from_bytes(self._map[offset:offset + mask_bytes], "little")
+            offset += mask_bytes
+            item = int.from_bytes(self._map[offset:offset + mask_bytes], "little")
+            offset += mask_bytes
+            keys.append(choice_key)
+            choices.append(Choice(choice_key, desc, requires, item, goto,
+                                  bool(flags & _BACK), bool(flags & _ESCAPE)))
+        return Room(key, name, tuple(keys), tuple(choices))
+
+    def index_of(self, key: str) -> int:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(self._by_key[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._key_at(self._by_key[low]) == key:
+            return self._by_key[low]
+        raise KeyError(key)
+
+    def close(self) -> None:
+        """Releases the mapped file (rooms already decoded stay usable)."""
+        for name in ("hall", "_by_key", "_offsets"):
+            view = getattr(self, name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+def cache_path(path: str) -> str:
+    return path + ".cache"
+
+
+def _cache_is_fresh(path: str, cache: str) -> bool:
+    """True if the cache was built from the world file as it is now."""
+    try:
+        with open(cache, "rb") as f:
+            head = f.read(_HEADER.size)
+    except FileNotFoundError:
+        return False
+    if len(head) < _HEADER.size:
+        return False
+    magic, size, mtime, *_ = _HEADER.unpack(head)
+    info = os.stat(path)
+    return magic == _MAGIC and size == info.st_size and mtime == info.st_mtime_ns
+
+
+def build_cache(path: str) -> CompiledWorld:
+    """Parses and compiles a world file and (re)writes its cache. Returns the compiled world."""
+    info = os.stat(path)
+    world = compile_world(read_world_file(path))
+    write_cache(world, cache_path(path), info.st_size, info.st_mtime_ns)
+    return world
+
+
+def load_world(path: str) -> CompiledWorld:
+    """
+    Loads a world file. With a fresh cache this maps it and returns a
+    LazyWorld; otherwise the file is compiled, the cache is rebuilt
+    for next time, and the (already fully built) world is returned.
+    A cache file can also be passed directly.
+    """
+    if path.endswith(".cache"):
+        return LazyWorld(path)
+    cache = cache_path(path)
+    if _cache_is_fresh(path, cache):
+        return LazyWorld(cache)
+    try:
+        return build_cache(path)
+    except OSError:
+        # Read-only location — play without a cache
+        return compile_world(read_world_file(path))
+
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Check escape room world files and build their caches.")
+    parser.add_argument("action", choices=("check", "build"))
+    parser.add_argument("path", help=".json or .toml world file")
+    args = parser.parse_args(argv)
+
+    try:
+        world = build_cache(args.path) if args.action == "build" else load_world(args.path)
+    except (OSError, ValueError, tomllib.TOMLDecodeError) as error:
+        print(f"  ⚠  {args.path}: {error}", file=sys.stderr)
+        return 1
+
+    print(f"  {len(world)} rooms, {len(world.hall)} on the main menu, {len(world.items)} items")
+    if args.action == "build":
+        print(f"  Cache written to {cache_path(args.path)}")
+        return 0
+
+    problems = validate_world(world)
+    for problem in problems:
+        print(f"  ⚠  {problem}")
+    if not problems:
+        print("  ✅ World is playable.")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
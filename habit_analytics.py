@@ -0,0 +1,159 @@
+# ============================================================
+# Habit Analytics — whole-history statistics for every habit
+# Features: current / longest streaks, rolling 7 & 30-day
+# means, per-time-slot distribution and goal-hit percentage.
+# ============================================================
+#
+# Works on the day records in habit_history, not on individual
+# entries: a million entries spread over three years is only
+# ~1,100 records per habit. Each habit is read in ONE pass over
+# its memory-mapped records (struct.iter_unpack runs in C). The
+# current streak and the 7 / 30-day means are taken as of today,
+# over calendar days, exactly as [H] shows them.
+#
+# Library use:
+#     from habit_analytics import analyze_all
+#     stats = analyze_all(HISTORY, HABITS, TIME_SLOTS)
+#     stats["Sleep"].longest_streak
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from console import screen
+from habit_history import RECORD, HabitHistory, HistoryStore
+
+
+@dataclass
+class HabitStats:
+    habit: str
+    first_day: date | None = None
+    last_day: date | None = None
+    days: int = 0                   # calendar days covered (first..last)
+    logged_days: int = 0            # days with at least one entry
+    entries: int = 0
+    current_streak: int = 0         # goal-met days ending today (yesterday if today isn't archived)
+    longest_streak: int = 0
+    goal_hit_rate: float = 0.0      # % of covered days that met threshold
+    mean_7: float = 0.0             # mean daily total, the 7 calendar days ending today
+    mean_30: float = 0.0            # mean daily total, the 30 calendar days ending today
+    slot_share: dict[str, float] = field(default_factory=dict)   # % of total per time slot
+    daily_totals: list[float] = field(default_factory=list, repr=False)
+
+
+def _window_mean(totals: list[float], first: date, until: date, days: int) -> float:
+    """
+    Mean daily total over the `days` calendar days ending at `until`,
+    where totals[0] is `first`. Days without a record count as 0 and
+    the divisor is always `days` — the same as HabitHistory.rolling_average.
+    """
+    stop = (until - first).days + 1
+    return sum(totals[max(0, stop - days):max(0, stop)]) / days
+
+
+def analyze_habit(habit_name: str, history: HabitHistory, threshold: float,
+                  slot_names: tuple[str, ...],
+                  start: date | None = None, end: date | None = None) -> HabitStats:
+    """
+    Computes HabitStats for one habit in a single pass over its records.
+    The current streak and the 7 / 30-day means are as of `end`
+    (default today), so they match [H]'s.
+    """
+    stats = HabitStats(habit_name)
+    as_of = end or date.today()
+    start = start or history.first_day()
+    end = end or history.last_day()
+    if start is None or end is None:
+        return stats
+
+    found = history.raw_range(start, end)
+    if found is None:
+        return stats
+    first, view = found
+
+    totals: list[float] = []
+    slot_sums = [0.0] * len(slot_names)
+    hits = run = longest = logged = entries = last_count = 0
+
+    for count, _pad, total, _min, _max, *slots in RECORD.iter_unpack(view):
+        totals.append(total)
+        last_count = count
+        if count:
+            logged += 1
+            entries += count
+            for i, value in enumerate(slots):
+                slot_sums[i] += value
+        if total >= threshold:
+            hits += 1
+            run += 1
+            longest = max(longest, run)
+        else:
+            run = 0
+    view.release()
+
+    grand_total = sum(slot_sums)
+    stats.first_day = first
+    stats.last_day = date.fromordinal(first.toordinal() + len(totals) - 1)
+    stats.days = len(totals)
+    stats.logged_days = logged
+    stats.entries = entries
+    # As in [H]: a streak can still be alive if today just isn't archived yet
+    streak_end = as_of if stats.last_day == as_of and last_count else as_of - timedelta(days=1)
+    index = (streak_end - first).days
+    streak = 0
+    while 0 <= index < len(totals) and totals[index] >= threshold:
+        streak += 1
+        index -= 1
+    stats.current_streak = streak
+    stats.longest_streak = longest
+    stats.goal_hit_rate = 100.0 * hits / len(totals)
+    stats.mean_7 = _window_mean(totals, first, as_of, 7)
+    stats.mean_30 = _window_mean(totals, first, as_of, 30)
+    stats.slot_share = {
+        name: (100.0 * value / grand_total if grand_total else 0.0)
+        for name, value in zip(slot_names, slot_sums)
+    }
+    stats.daily_totals = totals
+    return stats
+
+
+def analyze_all(store: HistoryStore, habits: dict[str, dict], slot_names: tuple[str, ...],
+                start: date | None = None, end: date | None = None) -> dict[str, HabitStats]:
+    """HabitStats for every habit in the HABITS config, keyed by habit name."""
+    return {
+        habit_name: analyze_habit(habit_name, store.habit(habit_name),
+                                  config["threshold"], slot_names, start, end)
+        for habit_name, config in habits.items()
+    }
+
+
+def show_analytics(stats: dict[str, HabitStats], habits: dict[str, dict], stream=None) -> None:
+    """
+    Prints a report for the output of analyze_all() (to `stream`, default stdout).
+
+    Example output:
+        Sleep (hours) — 412 days, 398 logged, 1204 entries
+          Streak: 12 current / 45 longest   Goal hit: 81.3%
+          Mean/day: 7.2 (7d)  6.9 (30d)
+          Morning 4%  Afternoon 1%  Evening 95%
+    """
+    with screen(stream=stream) as out:
+        out.line("\n" + "=" * 50)
+        out.line("           📈 Habit Analytics")
+        out.line("=" * 50)
+
+        for habit_name, habit_stats in stats.items():
+            unit = habits[habit_name]["unit"]
+            out.line(f"\n  {habit_name} ({unit}) — {habit_stats.days} days, "
+                     f"{habit_stats.logged_days} logged, {habit_stats.entries} entries")
+
+            if not habit_stats.days:
+                out.line("    (nothing archived yet)")
+                continue
+
+            out.line(f"    Streak: {habit_stats.current_streak} current / {habit_stats.longest_streak} longest"
+                     f"   Goal hit: {habit_stats.goal_hit_rate:.1f}%")
+            out.line(f"    Mean/day: {habit_stats.mean_7:.1f} (7d)  {habit_stats.mean_30:.1f} (30d)")
+            out.line("    " + "  ".join(f"{name.capitalize()} {share:.0f}%"
+                                      for name, share in habit_stats.slot_share.items()))
+
+        out.line("\n" + "=" * 50)
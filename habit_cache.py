@@ -0,0 +1,300 @@
+# ============================================================
+# Habit Cache — many users' HabitStates in a fixed amount of RAM
+# Features: least-recently-used users kept in memory up to a byte
+# budget, idle users spilled to disk in the journal's snapshot
+# format and faulted back in on their next request, hit / miss /
+# eviction counters for sizing the budget.
+# ============================================================
+#
+#   cache.get("alice")  ──▶ in memory?  yes ─▶ hit, moved to the back of the LRU order
+#                                       no  ─▶ spilled?  yes ─▶ fault: read + decode, then evict
+#                                                        no  ─▶ miss: None (a new user)
+#
+# The cache only holds what a habit_service shard needs per user —
+# the habit entries and the time zone. States with a history or a
+# journal attached (the single-user app) are not meant to live here.
+#
+# Each spilled user is one small file under the cache's directory:
+#
+#   spill/3f/3fa2c0...e1.bin    (sha1 of the user id, fanned out by its first byte)
+#
+#   [magic "HABSPIL1"][user length u16][user][tz length u16][tz]
+#   [habit_journal snapshot: every habit's entry columns]
+#
+# so the only per-user thing kept in RAM is the resident users
+# themselves — a cold user costs a file on disk and nothing in memory.
+# The spill directory is scratch space, emptied when the cache starts:
+# it is not a substitute for the journal.
+#
+# A state's size is an estimate: what an empty state measures (once,
+# with sys.getsizeof) plus a fixed number of bytes per entry column
+# slot, dead entries included until compacted. It is taken when a user
+# comes in and again after each command (settle()), and users are
+# evicted from the cold end of the LRU order until the total is back
+# under budget.
+#
+#     cache = HabitCache("habit_data/service/spill/shard0", memory_budget=64 * 2**20)
+#     state = cache.get("alice") or cache.add("alice", HabitState())
+#     ...change state...
+#     cache.settle("alice")
+#     cache.peek("bob")  # like get(), but not counted: for the rollover
+#     cache.stats()     # {"hits": ..., "misses": ..., "faults": ..., "evictions": ...}
+
+import hashlib
+import os
+import shutil
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+
+import healthyhabittracker as tracker
+from habit_journal import decode_snapshot, encode_snapshot
+
+_SPILL_MAGIC = b"HABSPIL1"
+_TEXT_LENGTH = struct.Struct("<H")
+
+DEFAULT_BUDGET = 64 * 2 ** 20     # bytes
+
+
+def _measure(state: tracker.HabitState) -> int:
+    """Bytes of a state's objects and buffers, walked with sys.getsizeof (slow — done once)."""
+    getsize = sys.getsizeof
+    size = getsize(state) + getsize(state.__dict__) + getsize(state.habits)
+    for config in state.habits.values():
+        store = config["entries"]
+        size += getsize(config) + getsize(store)
+        size += (getsize(store.values) + getsize(store.slots) + getsize(store.stamps)
+                 + getsize(store.ids) + getsize(store.live)
+                 + getsize(store.slot_totals) + getsize(store.slot_counts)
+                 + getsize(store.slot_ids) + sum(map(getsize, store.slot_ids)))
+    return size
+
+
+# A state with no entries, and what each entry adds: value f64 + slot u8
+# + stamp f64 + id u64 + live flag + its id again in slot_ids
+_EMPTY_STATE_BYTES = _measure(tracker.HabitState())
+_ENTRY_BYTES = 8 + 1 + 8 + 8 + 1 + 8
+_TREE_BYTES = array("l").itemsize
+
+
+def state_size(state: tracker.HabitState) -> int:
+    """Estimated bytes held by one state — cheap enough to call after every command."""
+    size = _EMPTY_STATE_BYTES
+    for config in state.habits.values():
+        store = config["entries"]
+        size += _ENTRY_BYTES * len(store.values)
+        if store._tree is not None:
+            size += _TREE_BYTES * len(store._tree)
+    return size
+
+
+class HabitCache:
+    """
+    A dict-like {user: HabitState} that keeps at most `memory_budget`
+    bytes of states in memory, least recently used first out.
+
+    on_evict(user, state) is called just before a user is spilled and
+    on_load(user, state) just after one is faulted back in — the shard
+    worker uses them to keep its rollover schedule in step.
+    """
+
+    def __init__(self, directory: str, memory_budget: int = DEFAULT_BUDGET,
+                 on_evict=None, on_load=None) -> None:
+        self.directory = directory
+        self.memory_budget = memory_budget
+        self.on_evict = on_evict
+        self.on_load = on_load
+
+        self._states: OrderedDict[str, tracker.HabitState] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self.resident_bytes = 0
+        self.peak_bytes = 0
+        self.spilled = 0            # users on disk right now
+
+        self.hits = 0
+        self.misses = 0             # not in memory: faults + new users
+        self.faults = 0             # ... of which were read back from disk
+        self.evictions = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, user: str) -> bool:
+        return user in self._states or os.path.exists(self._path(user))
+
+    # --------------------------------------------------------
+    # LOOKUPS
+    # --------------------------------------------------------
+
+    def get(self, user: str, default=None):
+        """The user's state — from memory, or faulted in from disk — else `default`."""
+        state = self._states.get(user)
+        if state is not None:
+            self.hits += 1
+            self._states.move_to_end(user)
+            return state
+
+        self.misses += 1
+        state = self._load(user)
+        if state is None:
+            return default
+        self.faults += 1
+        self._admit(user, state)
+        if self.on_load is not None:
+            self.on_load(user, state)
+        return state
+
+    def peek(self, user: str, default=None):
+        """
+        Like get(), for housekeeping such as the midnight rollover: not
+        counted in the hit / miss stats, and not made recently used. A
+        user read back from disk goes in at the cold end of the LRU
+        order, first in line to be spilled again.
+        """
+        state = self._states.get(user)
+        if state is not None:
+            return state
+        state = self._load(user)
+        if state is None:
+            return default
+        self._admit(user, state)
+        self._states.move_to_end(user, last=False)
+        if self.on_load is not None:
+            self.on_load(user, state)
+        return state
+
+    def add(self, user: str, state: tracker.HabitState) -> tracker.HabitState:
+        """Puts a (new) user's state in memory, evicting others if needed. Returns it."""
+        if user in self._states:
+            self.resident_bytes -= self._sizes[user]
+        self._admit(user, state)
+        return state
+
+    __setitem__ = add
+
+    def settle(self, user: str | None = None) -> None:
+        """
+        Re-measures `user` after a change, then evicts cold users until
+        the resident total is back under budget.
+        """
+        if user is not None and user in self._states:
+            size = state_size(self._states[user])
+            self.resident_bytes += size - self._sizes[user]
+            self._sizes[user] = size
+            self.peak_bytes = max(self.peak_bytes, self.resident_bytes)
+        self._evict(keep=user)
+
+    def _admit(self, user: str, state: tracker.HabitState) -> None:
+        size = state_size(state)
+        self._states[user] = state
+        self._states.move_to_end(user)
+        self._sizes[user] = size
+        self.resident_bytes += size
+        self.peak_bytes = max(self.peak_bytes, self.resident_bytes)
+        self._evict(keep=user)
+
+    def _evict(self, keep: str | None = None) -> None:
+        """Spills least recently used users until under budget (never `keep`)."""
+        states = self._states
+        while self.resident_bytes > self.memory_budget and states:
+            user = next(iter(states))
+            if user == keep:
+                if len(states) == 1:
+                    return
+                states.move_to_end(user)
+                continue
+            state = states.pop(user)
+            self.resident_bytes -= self._sizes.pop(user)
+            if self.on_evict is not None:
+                self.on_evict(user, state)
+            self._spill(user, state)
+            self.evictions += 1
+
+    # --------------------------------------------------------
+    # ON DISK
+    # --------------------------------------------------------
+
+    def _path(self, user: str) -> str:
+        digest = hashlib.sha1(user.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + ".bin")
+
+    def _spill(self, user: str, state: tracker.HabitState) -> None:
+        encoded_user = user.encode("utf-8")
+        encoded_zone = (state.timezone or "").encode("utf-8")
+        blob = b"".join((
+            _SPILL_MAGIC,
+            _TEXT_LENGTH.pack(len(encoded_user)), encoded_user,
+            _TEXT_LENGTH.pack(len(encoded_zone)), encoded_zone,
+            encode_snapshot(state.habits),
+        ))
+        path = self._path(user)
+        try:
+            f = open(path, "wb")
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            f = open(path, "wb")
+        with f:
+            f.write(blob)
+        self.spilled += 1
+        self.bytes_written += len(blob)
+
+    def _load(self, user: str) -> tracker.HabitState | None:
+        """Reads a spilled user back (and removes the file), or None if there isn't one."""
+        path = self._path(user)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        os.remove(path)
+        self.spilled -= 1
+        self.bytes_read += len(data)
+
+        if not data.startswith(_SPILL_MAGIC):
+            raise ValueError(f"{path} is not a spilled habit state")
+        offset = len(_SPILL_MAGIC)
+        texts = []
+        for _ in range(2):
+            (length,) = _TEXT_LENGTH.unpack_from(data, offset)
+            offset += _TEXT_LENGTH.size
+            texts.append(data[offset:offset + length].decode("utf-8"))
+            offset += length
+        stored_user, zone = texts
+        if stored_user != user:
+            raise ValueError(f"{path} holds {stored_user!r}, not {user!r}")
+
+        state = tracker.HabitState(timezone=zone or None)
+        decode_snapshot(memoryview(data)[offset:], state.habits)
+        return state
+
+    # --------------------------------------------------------
+    # STATS
+    # --------------------------------------------------------
+
+    def stats(self) -> dict:
+        """
+        Counters for sizing the budget (hit rate near 1 and few faults =
+        big enough). Hits, misses and faults count requests only (get());
+        evictions and bytes include the rollover's peek()s too.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "resident_users": len(self._states),
+            "spilled_users": self.spilled,
+            "resident_bytes": self.resident_bytes,
+            "peak_bytes": self.peak_bytes,
+            "memory_budget": self.memory_budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "faults": self.faults,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes_written": self.bytes_written,
+            "bytes_read": self.bytes_read,
+        }
@@ -0,0 +1,402 @@
+# ============================================================
+# Habit History — multi-day storage for healthyhabittracker
+# Features: one memory-mapped fixed-record file per habit,
+# direct day indexing, range queries, streaks and rolling
+# averages that only touch the pages they need.
+# ============================================================
+#
+# File layout (little-endian):
+#
+#   header  — magic "HABHIST1", base day u32, day count u32
+#   records — one fixed-size record per calendar day, starting at
+#             base day; record i describes date.fromordinal(base + i)
+#
+# Because every day has a slot, the "day index" is just arithmetic:
+#
+#   offset = HEADER_SIZE + (day.toordinal() - base_day) * RECORD_SIZE
+#
+# so looking up the last 90 days is one slice of the mapped file —
+# the OS only reads those pages. Days nobody logged have count == 0.
+
+import mmap
+import os
+import struct
+from datetime import date, timedelta
+from typing import NamedTuple
+
+# Matches len(TIME_SLOTS) in healthyhabittracker (morning/afternoon/evening)
+SLOT_COUNT = 3
+
+_MAGIC   = b"HABHIST1"
+_HEADER  = struct.Struct("<8sII")              # magic, base day, day count
+RECORD   = struct.Struct("<II" + "d" * (3 + SLOT_COUNT))
+# count, (padding), total, min, max, slot totals...
+
+HEADER_SIZE = _HEADER.size
+RECORD_SIZE = RECORD.size
+
+# Grow the file this many days at a time so a bulk import of old days
+# doesn't remap once per day
+_GROW_DAYS = 366
+
+
+class DayTotals(NamedTuple):
+    """One habit's frozen aggregates for one calendar day."""
+    day: date
+    count: int
+    total: float
+    minimum: float
+    maximum: float
+    slot_totals: tuple[float, ...]
+
+
+def _unpack(day: date, fields: tuple) -> DayTotals:
+    count, _pad, total, minimum, maximum, *slots = fields
+    return DayTotals(day, count, total, minimum, maximum, tuple(slots))
+
+
+# ------------------------------------------------------------
+# ONE HABIT
+# ------------------------------------------------------------
+
+class HabitHistory:
+    """
+    Day-indexed history file for a single habit.
+
+    The whole file is memory-mapped; reads slice the map directly
+    and writes update one record in place.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = None
+        self._map = None
+        self.base_day = 0
+        self.day_count = 0
+        self._open()
+
+    def _open(self) -> None:
+        exists = os.path.exists(self.path)
+        self._file = open(self.path, "r+b" if exists else "w+b")
+
+        if not exists or os.path.getsize(self.path) < HEADER_SIZE:
+            self._file.truncate(HEADER_SIZE)
+            self._map = mmap.mmap(self._file.fileno(), 0)
+            self._write_header()
+            return
+
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, self.base_day, self.day_count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{self.path} is not a habit history file")
+
+    def _write_header(self) -> None:
+        _HEADER.pack_into(self._map, 0, _MAGIC, self.base_day, self.day_count)
+
+    def _capacity(self) -> int:
+        return (len(self._map) - HEADER_SIZE) // RECORD_SIZE
+
+    def _remap(self, size: int) -> None:
+        self._map.close()
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _ensure_day(self, ordinal: int) -> int:
+        """Makes room for the given day and returns its record index."""
+        if self.day_count == 0:
+            self.base_day = ordinal
+            self.day_count = 1
+            if self._capacity() < 1:
+                self._remap(HEADER_SIZE + _GROW_DAYS * RECORD_SIZE)
+            self._write_header()
+            return 0
+
+        if ordinal < self.base_day:
+            # Older than anything stored — shift existing records right.
+            # Rare (back-filling an import), so an O(n) move is fine.
+            shift = self.base_day - ordinal
+            used = self.day_count * RECORD_SIZE
+            needed = self.day_count + shift
+            if self._capacity() < needed:
+                self._remap(HEADER_SIZE + (needed + _GROW_DAYS) * RECORD_SIZE)
+            self._map.move(HEADER_SIZE + shift * RECORD_SIZE, HEADER_SIZE, used)
+            self._map[HEADER_SIZE:HEADER_SIZE + shift * RECORD_SIZE] = bytes(shift * RECORD_SIZE)
+            self.base_day = ordinal
+            self.day_count = needed
+            self._write_header()
+            return 0
+
+        index = ordinal - self.base_day
+        if index >= self.day_count:
+            if index >= self._capacity():
+                self._remap(HEADER_SIZE + (index + _GROW_DAYS) * RECORD_SIZE)
+            self.day_count = index + 1
+            self._write_header()
+        return index
+
+    # --------------------------------------------------------
+    # WRITES
+    # --------------------------------------------------------
+
+    def record_day(self, day: date, count: int, total: float, minimum: float,
+                   maximum: float, slot_totals) -> None:
+        """
+        Merges one day's aggregates into the file. Archiving the same
+        day twice adds the second batch on top of the first.
+        """
+        if count == 0:
+            return
+
+        index = self._ensure_day(day.toordinal())
+        offset = HEADER_SIZE + index * RECORD_SIZE
+        old = _unpack(day, RECORD.unpack_from(self._map, offset))
+
+        if old.count:
+            minimum = min(minimum, old.minimum)
+            maximum = max(maximum, old.maximum)
+            total += old.total
+            slot_totals = [a + b for a, b in zip(slot_totals, old.slot_totals)]
+            count += old.count
+
+        RECORD.pack_into(self._map, offset, count, 0, total, minimum, maximum, *slot_totals)
+
+    def flush(self) -> None:
+        self._map.flush()
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+    # --------------------------------------------------------
+    # QUERIES
+    # --------------------------------------------------------
+
+    def first_day(self) -> date | None:
+        return date.fromordinal(self.base_day) if self.day_count else None
+
+    def last_day(self) -> date | None:
+        return date.fromordinal(self.base_day + self.day_count - 1) if self.day_count else None
+
+    def get(self, day: date) -> DayTotals | None:
+        """Aggregates for one day, or None if nothing was logged."""
+        index = day.toordinal() - self.base_day
+        if not self.day_count or index < 0 or index >= self.day_count:
+            return None
+        totals = _unpack(day, RECORD.unpack_from(self._map, HEADER_SIZE + index * RECORD_SIZE))
+        return totals if totals.count else None
+
+    def raw_range(self, start: date, end: date) -> tuple[date, memoryview] | None:
+        """
+        The stored records for start..end (inclusive) as a memoryview
+        over the mapped file, plus the date of the first record.
+        Nothing is copied — only the touched pages are read.
+        """
+        if not self.day_count:
+            return None
+        first = max(start.toordinal(), self.base_day)
+        last = min(end.toordinal(), self.base_day + self.day_count - 1)
+        if first > last:
+            return None
+        lo = HEADER_SIZE + (first - self.base_day) * RECORD_SIZE
+        hi = HEADER_SIZE + (last - self.base_day + 1) * RECORD_SIZE
+        return date.fromordinal(first), memoryview(self._map)[lo:hi]
+
+    def range(self, start: date, end: date) -> list[DayTotals]:
+        """Every day in start..end (inclusive) that has entries."""
+        found = self.raw_range(start, end)
+        if found is None:
+            return []
+        first, view = found
+        ordinal = first.toordinal()
+        days = []
+        for i, fields in enumerate(RECORD.iter_unpack(view)):
+            if fields[0]:
+                days.append(_unpack(date.fromordinal(ordinal + i), fields))
+        view.release()
+        return days
+
+    def daily_totals(self, start: date, end: date) -> list[float]:
+        """One total per calendar day in start..end, 0.0 for empty days."""
+        totals = [0.0] * ((end - start).days + 1)
+        found = self.raw_range(start, end)
+        if found is None:
+            return totals
+        first, view = found
+        skip = (first - start).days
+        for i, fields in enumerate(RECORD.iter_unpack(view)):
+            totals[skip + i] = fields[2]
+        view.release()
+        return totals
+
+    def streak(self, threshold: float, until: date) -> int:
+        """
+        Consecutive days ending at `until` (inclusive) whose total met
+        threshold. Walks backwards, so it stops at the first miss.
+        """
+        streak = 0
+        index = until.toordinal() - self.base_day
+        if index >= self.day_count:
+            return 0
+        while index >= 0:
+            total = RECORD.unpack_from(self._map, HEADER_SIZE + index * RECORD_SIZE)[2]
+            if total < threshold:
+                break
+            streak += 1
+            index -= 1
+        return streak
+
+    def rolling_average(self, end: date, days: int) -> float:
+        """Mean daily total over the `days` days ending at `end`."""
+        start = end - timedelta(days=days - 1)
+        return sum(self.daily_totals(start, end)) / days
+
+
+# ------------------------------------------------------------
+# ALL HABITS
+# ------------------------------------------------------------
+
+def _file_name(habit_name: str) -> str:
+    """'Water Intake' -> 'water_intake.hist'"""
+    safe = "".join(ch if ch.isalnum() else "_" for ch in habit_name.lower())
+    return f"{safe}.hist"
+
+
+class HistoryStore:
+    """
+    Directory of HabitHistory files, one per habit.
+    Files are opened lazily the first time a habit is touched.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._open: dict[str, HabitHistory] = {}
+
+    def habit(self, habit_name: str) -> HabitHistory:
+        history = self._open.get(habit_name)
+        if history is None:
+            os.makedirs(self.directory, exist_ok=True)
+            history = HabitHistory(os.path.join(self.directory, _file_name(habit_name)))
+            self._open[habit_name] = history
+        return history
+
+    def archive(self, habits: dict[str, dict], day: date) -> int:
+        """
+        Freezes every habit's EntryStore aggregates into `day`'s record.
+        Reads only the running aggregates — O(habits), not O(entries).
+        Returns the number of entries archived.
+        """
+        archived = 0
+        for habit_name, config in habits.items():
+            store = config["entries"]
+            if not len(store):
+                continue
+            self.habit(habit_name).record_day(
+                day, len(store), store.total(), store.minimum(),
+                store.maximum(), store.slot_totals,
+            )
+            archived += len(store)
+        self.flush()
+        return archived
+
+    def flush(self) -> None:
+        for history in self._open.values():
+            history.flush()
+
+    def close(self) -> None:
+        for history in self._open.values():
+            history.close()
+        self._open.clear()
+
+
+# ------------------------------------------------------------
+# MANY USERS — batched day archives
+# ------------------------------------------------------------
+
+_ARCHIVE_ROW = struct.Struct("<HH")    # user id length, habit name length
+
+
+class DayArchive:
+    """
+    Append-only archive of many users' frozen days, for the
+    multi-user service where opening a HistoryStore per user at
+    midnight would mean hundreds of thousands of file opens.
+
+    One file per calendar day; every row is
+        [user len u16][habit len u16][user][habit][RECORD]
+    and a whole batch of users is appended with a single write.
+    read_day() turns a file back into (user, habit, DayTotals) rows,
+    e.g. to fold them into per-user HistoryStores later.
+    """
+
+    def __init__(self, directory: str, prefix: str = "archive") -> None:
+        self.directory = directory
+        self.prefix = prefix
+
+    def path(self, day: date) -> str:
+        return os.path.join(self.directory, f"{self.prefix}-{day:%Y%m%d}.bin")
+
+    @staticmethod
+    def encode(user: str, habits: dict[str, dict]) -> bytes:
+        """One user's current EntryStore aggregates as archive rows."""
+        parts = []
+        user_bytes = user.encode("utf-8")
+        for habit_name, config in habits.items():
+            store = config["entries"]
+            if not len(store):
+                continue
+            habit_bytes = habit_name.encode("utf-8")
+            parts.append(_ARCHIVE_ROW.pack(len(user_bytes), len(habit_bytes)))
+            parts.append(user_bytes)
+            parts.append(habit_bytes)
+            parts.append(RECORD.pack(len(store), 0, store.total(), store.minimum(),
+                                     store.maximum(), *store.slot_totals))
+        return b"".join(parts)
+
+    def append(self, day: date, rows: list[bytes]) -> None:
+        """Writes a batch of encode() results for `day` in one go."""
+        if not rows:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(day), "ab") as f:
+            f.write(b"".join(rows))
+
+    def fold_into(self, day: date, history_for) -> int:
+        """
+        Adds every row archived on `day` to its user's history:
+        history_for(user) returns that user's HistoryStore, or None to
+        skip them. Returns the number of rows folded in.
+        """
+        folded = 0
+        touched: dict[int, HistoryStore] = {}
+        for user, habit, totals in self.read_day(day):
+            history = history_for(user)
+            if history is None:
+                continue
+            history.habit(habit).record_day(day, totals.count, totals.total, totals.minimum,
+                                            totals.maximum, totals.slot_totals)
+            touched[id(history)] = history
+            folded += 1
+        for history in touched.values():
+            history.flush()
+        return folded
+
+    def read_day(self, day: date):
+        """Yields (user, habit, DayTotals) for every row archived on `day`."""
+        try:
+            with open(self.path(day), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        offset = 0
+        while offset < len(data):
+            user_len, habit_len = _ARCHIVE_ROW.unpack_from(data, offset)
+            offset += _ARCHIVE_ROW.size
+            user = data[offset:offset + user_len].decode("utf-8")
+            offset += user_len
+            habit = data[offset:offset + habit_len].decode("utf-8")
+            offset += habit_len
+            yield user, habit, _unpack(day, RECORD.unpack_from(data, offset))
+            offset += RECORD_SIZE
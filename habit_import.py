@@ -0,0 +1,286 @@
+# ============================================================
+# Habit Import — non-interactive bulk ingest for
+# healthyhabittracker (wearable / app exports)
+# Features: streaming CSV and JSONL readers, chunked validation
+# with the same rules as the interactive prompts, routing of
+# past days into history, and a rejected-rows report.
+# ============================================================
+#
+# Each record has four fields:
+#
+#   habit      — a key of HABITS, e.g. "Water Intake"
+#   value      — 0 <= value <= that habit's max_value
+#   time       — one of TIME_SLOTS (case-insensitive)
+#   timestamp  — ISO 8601 ("2026-10-17T08:15:00") or unix seconds
+#
+# CSV files need a header row with those column names; JSONL files
+# hold one {"habit": ..., "value": ..., ...} object per line.
+#
+# Rows are read and validated `chunk_size` at a time, so memory use
+# is flat no matter how large the file is. Rows for today go into the
+# live EntryStores (journaled); rows for earlier days are folded
+# straight into the day records of the history store.
+#
+# Usage:
+#     python habit_import.py export.csv more.jsonl
+#     python habit_import.py big.csv --chunk-size 100000 --rejects bad_rows.csv
+
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import islice
+from operator import itemgetter
+
+import healthyhabittracker as tracker
+
+FIELDS = ("habit", "value", "time", "timestamp")
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    accepted_today: int = 0
+    accepted_history: int = 0
+    rejected: int = 0
+    reasons: dict[str, int] = field(default_factory=dict)
+
+    def reject(self, reason: str) -> None:
+        self.rejected += 1
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+
+# ------------------------------------------------------------
+# READERS — yield (habit, value, time, timestamp) tuples
+# ------------------------------------------------------------
+
+def _read_csv(f):
+    reader = csv.reader(f)
+    header = [name.strip().lower() for name in next(reader, [])]
+    missing = [name for name in FIELDS if name not in header]
+    if missing:
+        raise ValueError(f"CSV header is missing column(s): {', '.join(missing)}")
+    columns = [header.index(name) for name in FIELDS]
+    pick = itemgetter(*columns)
+    width = max(columns) + 1
+    for row in reader:
+        # Short rows fall through to validation as an "unknown habit"
+        yield pick(row) if len(row) >= width else (None, None, None, None)
+
+
+# Stands in for a JSONL line that isn't a {...} object (or isn't JSON at
+# all); _validate_chunk() rejects it by identity
+_NOT_AN_OBJECT = (None, None, None, None)
+
+
+def _read_jsonl(f):
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            # JSONDecodeError, or an integer too long for int() to parse
+            yield _NOT_AN_OBJECT
+            continue
+        if not isinstance(row, dict):
+            yield _NOT_AN_OBJECT
+            continue
+        yield row.get("habit"), row.get("value"), row.get("time"), row.get("timestamp")
+
+
+# ------------------------------------------------------------
+# CHUNK PROCESSING
+# ------------------------------------------------------------
+
+def _validate_chunk(chunk, first_row: int, report: ImportReport, rejects,
+                    today: date, now: float):
+    """
+    Validates one chunk against the HABITS rules.
+
+    The rules and lookup tables are resolved once per chunk, so the
+    per-row work is a few dict lookups and comparisons.
+
+    Returns (live, past):
+        live — {habit: (values, slots, stamps)} for today's rows
+        past — {(habit, day): [count, total, min, max, slot totals]}
+    """
+    limits = {name: config["max_value"] for name, config in tracker.HABITS.items()}
+    slot_of = {name: i for i, name in enumerate(tracker.TIME_SLOTS)}
+    slot_of.update({name.capitalize(): i for name, i in list(slot_of.items())})
+    parse_iso = datetime.fromisoformat
+    from_stamp = date.fromtimestamp
+    live: dict[str, tuple[list, list, list]] = {}
+    past: dict[tuple[str, date], list] = {}
+    rejected: list[tuple[int, str]] = []
+
+    for row, fields in enumerate(chunk, start=first_row):
+        if fields is _NOT_AN_OBJECT:
+            rejected.append((row, "not a JSON object"))
+            continue
+        habit, raw_value, raw_time, raw_stamp = fields
+        max_value = limits.get(habit) if isinstance(habit, str) else None
+        if max_value is None:
+            rejected.append((row, "unknown habit"))
+            continue
+
+        slot = slot_of.get(raw_time) if isinstance(raw_time, str) else None
+        if slot is None:
+            slot = slot_of.get(str(raw_time).strip().lower())
+            if slot is None:
+                rejected.append((row, "invalid time of day"))
+                continue
+
+        try:
+            value = float(raw_value)
+            if isinstance(raw_stamp, str) and "-" in raw_stamp:
+                moment = parse_iso(raw_stamp)
+                if moment.tzinfo is not None:
+                    moment = moment.astimezone().replace(tzinfo=None)
+                stamp = moment.timestamp()
+                day = moment.date()
+            else:
+                stamp = float(raw_stamp)
+                day = from_stamp(stamp)
+        except (TypeError, ValueError, OverflowError, OSError):
+            rejected.append((row, "unparseable value or timestamp"))
+            continue
+
+        # Same bounds get_positive_float() enforces interactively
+        if not 0 <= value <= max_value:
+            rejected.append((row, "value out of range"))
+            continue
+        if stamp > now:
+            rejected.append((row, "timestamp in the future"))
+            continue
+
+        if day == today:
+            values, slots, stamps = live.setdefault(habit, ([], [], []))
+            values.append(value)
+            slots.append(slot)
+            stamps.append(stamp)
+        else:
+            totals = past.get((habit, day))
+            if totals is None:
+                totals = past[(habit, day)] = [0, 0.0, math.inf, -math.inf, [0.0] * len(tracker.TIME_SLOTS)]
+            totals[0] += 1
+            totals[1] += value
+            if value < totals[2]:
+                totals[2] = value
+            if value > totals[3]:
+                totals[3] = value
+            totals[4][slot] += value
+
+    for row, reason in rejected:
+        report.reject(reason)
+        if rejects is not None:
+            rejects.writerow([row, *chunk[row - first_row], reason])
+
+    return live, past
+
+
+def import_records(records, report: ImportReport, rejects=None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> ImportReport:
+    """
+    Streams (habit, value, time, timestamp) records into HABITS and
+    HISTORY, `chunk_size` rows at a time. Rejected rows are reported
+    by their 1-based record number within the file.
+    """
+    today = date.today()
+    now = time.time()
+    first_row = 1
+
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        report.rows += len(chunk)
+
+        live, past = _validate_chunk(chunk, first_row, report, rejects, today, now)
+
+        for habit, (values, slots, stamps) in live.items():
+            tracker.HABITS[habit]["entries"].extend(values, slots, stamps)
+            report.accepted_today += len(values)
+
+        for (habit, day), (count, total, low, high, slot_totals) in past.items():
+            tracker.HISTORY.habit(habit).record_day(day, count, total, low, high, slot_totals)
+            report.accepted_history += count
+
+        first_row += len(chunk)
+
+    return report
+
+
+def import_file(path: str, report: ImportReport, rejects=None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> ImportReport:
+    """Imports one .csv or .jsonl file (picked by extension)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        records = _read_jsonl(f) if path.endswith((".jsonl", ".ndjson")) else _read_csv(f)
+        return import_records(records, report, rejects, chunk_size)
+
+
+# ------------------------------------------------------------
+# COMMAND LINE
+# ------------------------------------------------------------
+
+def show_report(report: ImportReport, seconds: float) -> None:
+    print("\n" + "=" * 50)
+    print("           📥 Import Report")
+    print("=" * 50)
+    print(f"  Rows read:            {report.rows}")
+    print(f"  Added to today:       {report.accepted_today}")
+    print(f"  Added to history:     {report.accepted_history}")
+    print(f"  Rejected:             {report.rejected}")
+    for reason, count in sorted(report.reasons.items(), key=lambda item: -item[1]):
+        print(f"      {reason:<30} {count}")
+    rate = report.rows / seconds if seconds > 0 else 0.0
+    print(f"  Time: {seconds:.2f}s ({rate:,.0f} rows/s)")
+    print("=" * 50)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-import habit entries from CSV / JSONL files.")
+    parser.add_argument("files", nargs="+", help=".csv or .jsonl files to import")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"rows validated per batch (default {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--rejects", help="write rejected rows with a reason to this CSV file")
+    args = parser.parse_args(argv)
+
+    journal = tracker.open_journal()
+    # Entries left from an earlier day go to history first, so today's
+    # imported rows aren't added on top of them
+    archived = tracker.rollover_if_needed()
+    if archived:
+        print(f"  📅 New day — archived {archived} entries from your last session to history.")
+    report = ImportReport()
+    rejects_file = open(args.rejects, "w", newline="", encoding="utf-8") if args.rejects else None
+    started = time.perf_counter()
+
+    try:
+        rejects = None
+        if rejects_file is not None:
+            rejects = csv.writer(rejects_file)
+            rejects.writerow(["row", *FIELDS, "reason"])
+
+        for path in args.files:
+            try:
+                import_file(path, report, rejects, args.chunk_size)
+            except (OSError, ValueError) as error:
+                print(f"  ⚠  Skipping {path}: {error}", file=sys.stderr)
+    finally:
+        if rejects_file is not None:
+            rejects_file.close()
+        journal.close()
+        tracker.HISTORY.close()
+
+    show_report(report, time.perf_counter() - started)
+    return 1 if report.rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
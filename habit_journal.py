@@ -0,0 +1,352 @@
+# ============================================================
+# Habit Journal — crash-safe persistence for healthyhabittracker
+# Features: append-only binary log, batched fsync, compacted
+# snapshots and bounded replay on start-up.
+# ============================================================
+#
+# On disk the journal is a directory with two files:
+#
+#   journal.log   — append-only records, one per add / delete / reset
+#   snapshot.bin  — every habit's entry columns at some sequence number
+#
+# Every record carries a sequence number. Start-up loads the snapshot
+# and replays only the records after it, so cold-start cost depends on
+# how much happened since the last snapshot, not on the full history.
+#
+# Record layout (little-endian):
+#
+#   [body length u32][crc32 of body u32][body]
+#   body = [seq u64][op u8][name length u8][habit name][payload]
+#
+#   ADD          payload: value f64, time-slot u8, timestamp f64
+#   DELETE_ID    payload: entry id u64
+#   DELETE_SLOT  payload: time-slot u8
+#   DELETE_RANGE payload: first entry id u64, last entry id u64
+#   RESET        payload: (none)
+#
+# Adds don't record the entry id: ids are handed out in order, so
+# replaying the same adds on top of the snapshot (which stores each
+# store's next id) gives every entry the same id again. Older logs
+# may still hold DELETE records (by entry index); those replay too.
+#
+# A crash can leave a half-written record at the end of the log. The
+# length + CRC framing lets replay spot it, stop there and cut it off.
+
+import os
+import struct
+import time
+import zlib
+from array import array
+
+OP_ADD          = 1
+OP_DELETE       = 2     # by index — only replayed, no longer written
+OP_RESET        = 3
+OP_DELETE_ID    = 4
+OP_DELETE_SLOT  = 5
+OP_DELETE_RANGE = 6
+
+_FRAME        = struct.Struct("<II")     # body length, crc32
+_HEADER       = struct.Struct("<QBB")    # seq, op, name length
+_ADD          = struct.Struct("<dBd")    # value, slot, timestamp
+_DELETE       = struct.Struct("<I")      # index
+_DELETE_ID    = struct.Struct("<Q")      # entry id
+_DELETE_SLOT  = struct.Struct("<B")      # slot
+_DELETE_RANGE = struct.Struct("<QQ")     # first id, last id
+
+_SNAPSHOT_MAGIC    = b"HABSNAP2"
+_SNAPSHOT_MAGIC_V1 = b"HABSNAP1"         # no ids — still readable
+_SNAP_HEAD         = struct.Struct("<QH")    # seq, habit count
+_SNAP_HABIT        = struct.Struct("<BIQ")   # name length, entry count, next id
+_SNAP_HABIT_V1     = struct.Struct("<BI")    # name length, entry count
+
+LOG_NAME      = "journal.log"
+SNAPSHOT_NAME = "snapshot.bin"
+
+
+# ------------------------------------------------------------
+# SNAPSHOT FORMAT — also used by habit_cache to spill idle users
+# ------------------------------------------------------------
+#
+#   [magic "HABSNAP2"][seq u64][habit count u16]
+#   per habit: [name length u8][entry count u32][next id u64][name]
+#              [values f64 x n][slots u8 x n][stamps f64 x n][ids u64 x n]
+
+def encode_snapshot(habits: dict[str, dict], seq: int = 0) -> bytes:
+    """Every habit's columns as one blob, dead entries compacted away."""
+    parts = [_SNAPSHOT_MAGIC, _SNAP_HEAD.pack(seq, len(habits))]
+    for name, config in habits.items():
+        store = config["entries"]
+        store.compact()
+        encoded = name.encode("utf-8")
+        parts.append(_SNAP_HABIT.pack(len(encoded), len(store), store.next_id))
+        parts.append(encoded)
+        parts.append(store.values.tobytes())
+        parts.append(store.slots.tobytes())
+        parts.append(store.stamps.tobytes())
+        parts.append(store.ids.tobytes())
+    return b"".join(parts)
+
+
+def decode_snapshot(data, habits: dict[str, dict]) -> int:
+    """
+    Loads a snapshot blob into the matching EntryStores of `habits`
+    (habits it doesn't know are skipped). Returns the snapshot's
+    sequence number. Raises ValueError if `data` isn't a snapshot.
+    """
+    data = memoryview(data)
+    has_ids = data[:len(_SNAPSHOT_MAGIC)] == _SNAPSHOT_MAGIC
+    if not has_ids and data[:len(_SNAPSHOT_MAGIC_V1)] != _SNAPSHOT_MAGIC_V1:
+        raise ValueError("not a habit snapshot")
+
+    offset = len(_SNAPSHOT_MAGIC)
+    seq, habit_count = _SNAP_HEAD.unpack_from(data, offset)
+    offset += _SNAP_HEAD.size
+
+    for _ in range(habit_count):
+        ids = next_id = None
+        if has_ids:
+            name_len, count, next_id = _SNAP_HABIT.unpack_from(data, offset)
+            offset += _SNAP_HABIT.size
+        else:
+            name_len, count = _SNAP_HABIT_V1.unpack_from(data, offset)
+            offset += _SNAP_HABIT_V1.size
+        name = bytes(data[offset:offset + name_len]).decode("utf-8")
+        offset += name_len
+
+        values = array("d"); values.frombytes(data[offset:offset + 8 * count]); offset += 8 * count
+        slots  = array("B"); slots.frombytes(data[offset:offset + count]);      offset += count
+        stamps = array("d"); stamps.frombytes(data[offset:offset + 8 * count]); offset += 8 * count
+        if has_ids:
+            ids = array("Q"); ids.frombytes(data[offset:offset + 8 * count]);   offset += 8 * count
+
+        if name in habits:
+            habits[name]["entries"].load_columns(values, slots, stamps, ids, next_id)
+
+    return seq
+
+
+class HabitJournal:
+    """
+    Write-ahead log for the HABITS entry stores.
+
+    Usage:
+        journal = HabitJournal("habit_data")
+        journal.open(HABITS)      # restore + attach to every EntryStore
+        ...                       # stores now log every change
+        journal.close()
+
+    sync_every / sync_interval: fsync after this many records or this
+        many seconds, whichever comes first (batched durability).
+    snapshot_every: write a compacted snapshot and start a fresh log
+        after this many records, so replay stays bounded.
+    """
+
+    def __init__(self, directory: str, sync_every: int = 32,
+                 sync_interval: float = 1.0, snapshot_every: int = 10_000) -> None:
+        self.directory      = directory
+        self.sync_every     = sync_every
+        self.sync_interval  = sync_interval
+        self.snapshot_every = snapshot_every
+
+        self.habits: dict[str, dict] = {}
+        self.seq = 0
+        self._log = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._since_snapshot = 0
+
+    # --------------------------------------------------------
+    # START-UP
+    # --------------------------------------------------------
+
+    def open(self, habits: dict[str, dict]) -> int:
+        """
+        Restores habits from snapshot + log, then attaches the journal
+        to every habit's EntryStore so future changes are recorded.
+        Returns the number of log records replayed.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self.habits = habits
+
+        snapshot_seq = self._load_snapshot()
+        self.seq = snapshot_seq
+        replayed, good_length = self._replay(snapshot_seq)
+
+        log_path = os.path.join(self.directory, LOG_NAME)
+        self._log = open(log_path, "ab", buffering=0)
+        if self._log.tell() != good_length:
+            # Torn tail from a crash — drop it so new records follow valid ones
+            self._log.truncate(good_length)
+            self._log.seek(good_length)
+
+        for name, config in habits.items():
+            store = config["entries"]
+            store.name = name
+            store.journal = self
+
+        self._since_snapshot = replayed
+        return replayed
+
+    def _load_snapshot(self) -> int:
+        path = os.path.join(self.directory, SNAPSHOT_NAME)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return 0
+        try:
+            return decode_snapshot(data, self.habits)
+        except ValueError:
+            raise ValueError(f"{path} is not a habit snapshot") from None
+
+    def _replay(self, after_seq: int) -> tuple[int, int]:
+        """Applies log records newer than after_seq. Returns (replayed, valid byte length)."""
+        path = os.path.join(self.directory, LOG_NAME)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return 0, 0
+
+        replayed = 0
+        offset = 0
+        while offset + _FRAME.size <= len(data):
+            length, crc = _FRAME.unpack_from(data, offset)
+            body = data[offset + _FRAME.size:offset + _FRAME.size + length]
+            if len(body) != length or zlib.crc32(body) != crc:
+                break
+
+            seq, op, name_len = _HEADER.unpack_from(body)
+            offset += _FRAME.size + length
+            if seq <= after_seq:
+                # Already folded into the snapshot
+                continue
+
+            name = body[_HEADER.size:_HEADER.size + name_len].decode("utf-8")
+            payload = _HEADER.size + name_len
+            self.seq = seq
+            replayed += 1
+
+            config = self.habits.get(name)
+            if config is None:
+                # Habit was removed from the config since this was written
+                continue
+            store = config["entries"]
+
+            if op == OP_ADD:
+                value, slot, stamp = _ADD.unpack_from(body, payload)
+                store.add_slot(value, slot, stamp)
+            elif op == OP_DELETE_ID:
+                (entry_id,) = _DELETE_ID.unpack_from(body, payload)
+                if entry_id in store:
+                    store.delete_id(entry_id)
+            elif op == OP_DELETE_SLOT:
+                (slot,) = _DELETE_SLOT.unpack_from(body, payload)
+                store.delete_slot(slot)
+            elif op == OP_DELETE_RANGE:
+                store.delete_id_range(*_DELETE_RANGE.unpack_from(body, payload))
+            elif op == OP_DELETE:
+                (index,) = _DELETE.unpack_from(body, payload)
+                if index < len(store):
+                    store.pop(index)
+            elif op == OP_RESET:
+                store.clear()
+
+        return replayed, offset
+
+    # --------------------------------------------------------
+    # WRITING
+    # --------------------------------------------------------
+
+    def _encode(self, op: int, name: str, payload: bytes = b"") -> bytes:
+        self.seq += 1
+        encoded = name.encode("utf-8")
+        body = _HEADER.pack(self.seq, op, len(encoded)) + encoded + payload
+        return _FRAME.pack(len(body), zlib.crc32(body)) + body
+
+    def _write(self, blob: bytes, records: int) -> None:
+        self._log.write(blob)
+
+        self._unsynced += records
+        self._since_snapshot += records
+        if (self._unsynced >= self.sync_every
+                or time.monotonic() - self._last_sync >= self.sync_interval):
+            self.sync()
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def _append(self, op: int, name: str, payload: bytes = b"") -> None:
+        if self._log is None:
+            return
+        self._write(self._encode(op, name, payload), 1)
+
+    def log_add(self, name: str, value: float, slot: int, timestamp: float) -> None:
+        self._append(OP_ADD, name, _ADD.pack(value, slot, timestamp))
+
+    def log_add_many(self, name: str, values, slots, timestamps) -> None:
+        """Journals a batch of adds with a single write (bulk imports)."""
+        if self._log is None:
+            return
+        pack = _ADD.pack
+        blob = b"".join(
+            self._encode(OP_ADD, name, pack(value, slot, stamp))
+            for value, slot, stamp in zip(values, slots, timestamps)
+        )
+        self._write(blob, len(values))
+
+    def log_delete(self, name: str, entry_id: int) -> None:
+        self._append(OP_DELETE_ID, name, _DELETE_ID.pack(entry_id))
+
+    def log_delete_slot(self, name: str, slot: int) -> None:
+        self._append(OP_DELETE_SLOT, name, _DELETE_SLOT.pack(slot))
+
+    def log_delete_range(self, name: str, first_id: int, last_id: int) -> None:
+        self._append(OP_DELETE_RANGE, name, _DELETE_RANGE.pack(first_id, last_id))
+
+    def log_reset(self, name: str) -> None:
+        self._append(OP_RESET, name)
+
+    def sync(self) -> None:
+        """Forces every written record to stable storage."""
+        if self._log is not None and self._unsynced:
+            os.fsync(self._log.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    # --------------------------------------------------------
+    # COMPACTION
+    # --------------------------------------------------------
+
+    def snapshot(self) -> None:
+        """
+        Writes every habit's columns (dead entries compacted away) to
+        snapshot.bin and starts an empty log. The snapshot is written to a temp file and renamed
+        into place, so a crash leaves either the old or the new one.
+        """
+        self.sync()
+
+        path = os.path.join(self.directory, SNAPSHOT_NAME)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(encode_snapshot(self.habits, self.seq))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        # Everything in the log is now covered by the snapshot. If we
+        # crash before the truncate, replay skips those seqs anyway.
+        if self._log is not None:
+            self._log.truncate(0)
+            self._log.seek(0)
+            os.fsync(self._log.fileno())
+        self._since_snapshot = 0
+
+    def close(self) -> None:
+        """Compacts, syncs and detaches from the stores."""
+        if self._log is None:
+            return
+        self.snapshot()
+        self._log.close()
+        self._log = None
+        for config in self.habits.values():
+            config["entries"].journal = None
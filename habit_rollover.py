@@ -0,0 +1,179 @@
+# ============================================================
+# Habit Rollover — automatic end-of-day for many users
+# Features: per-user local midnight (IANA time zones), users
+# bucketed by due minute, batched archive + reset passes that
+# can be interleaved with live requests.
+# ============================================================
+#
+# Instead of checking every user every tick, each user is put in a
+# bucket keyed by the minute their local midnight falls on:
+#
+#   _buckets = {29345040: ["alice", "bob", ...], 29345100: [...]}
+#   _heap    = [29345040, 29345100, ...]      # bucket keys, soonest first
+#
+# run() pops the buckets that are due, then archives and resets at most
+# `limit` users per call — so a worker can do a slice of a 100k-user
+# midnight, serve a few requests, and come back for the next slice.
+# All rows for one batch go to the DayArchive in a single write, and
+# those users' entries are reset only after it succeeds.
+#
+# A user whose HabitState carries a HistoryStore has the day folded
+# straight into it, where [H] and the analytics read it. The service's
+# users don't (a HistoryStore per user would mean a file open per user
+# at midnight), so their days land in the DayArchive; fold them into
+# HistoryStores later with DayArchive.fold_into().
+
+import heapq
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+from datetime import time as day_start
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from habit_history import DayArchive
+from healthyhabittracker import HabitState, reset_entries
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: str) -> ZoneInfo:
+    """ZoneInfo for an IANA name like 'Asia/Kolkata'. Raises ValueError if unknown."""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"unknown time zone {name!r}") from None
+
+
+# timezone -> (start of that local day, next midnight, local date), all
+# users in one zone share it until the day changes
+_day_cache: dict[str | None, tuple[float, float, date]] = {}
+
+
+def next_local_midnight(timezone: str | None, now: float) -> tuple[float, date]:
+    """
+    Returns (unix time of the user's next local midnight, the local date
+    that midnight closes). timezone=None means the machine's local time.
+    """
+    cached = _day_cache.get(timezone)
+    if cached is not None and cached[0] <= now < cached[1]:
+        return cached[1], cached[2]
+
+    zone = None if timezone is None else get_zone(timezone)
+    local = datetime.fromtimestamp(now, zone)
+    start = datetime.combine(local.date(), day_start(), tzinfo=zone)
+    midnight = datetime.combine(local.date() + timedelta(days=1), day_start(), tzinfo=zone)
+
+    _day_cache[timezone] = (start.timestamp(), midnight.timestamp(), local.date())
+    return midnight.timestamp(), local.date()
+
+
+class RolloverScheduler:
+    """
+    Tracks when each user's day ends and rolls them over in batches.
+
+        scheduler.schedule("alice", state)        # on first sight of a user
+        scheduler.run(states, limit=5000)         # call often; cheap when idle
+    """
+
+    def __init__(self, archive: DayArchive) -> None:
+        self.archive = archive
+        self._buckets: dict[int, list[str]] = {}
+        self._heap: list[int] = []
+        self._due: dict[str, tuple[int, date]] = {}    # user -> (minute, day it closes)
+        self._ready: deque[str] = deque()
+        self.rolled_over = 0
+
+    def schedule(self, user: str, state: HabitState, now: float | None = None) -> None:
+        """(Re)schedules a user's next rollover. Replaces any earlier schedule."""
+        midnight, day = next_local_midnight(state.timezone, time.time() if now is None else now)
+        minute = int(midnight // 60)
+        self._due[user] = (minute, day)
+
+        bucket = self._buckets.get(minute)
+        if bucket is None:
+            bucket = self._buckets[minute] = []
+            heapq.heappush(self._heap, minute)
+        bucket.append(user)
+
+    def forget(self, user: str) -> None:
+        """Stops rolling a user over (their bucket entry is skipped later)."""
+        self._due.pop(user, None)
+
+    def _collect_due(self, now: float) -> None:
+        current = int(now // 60)
+        while self._heap and self._heap[0] <= current:
+            minute = heapq.heappop(self._heap)
+            for user in self._buckets.pop(minute):
+                due = self._due.get(user)
+                # Skip users that were rescheduled or forgotten since
+                if due is not None and due[0] == minute:
+                    self._ready.append(user)
+
+    def pending(self, now: float | None = None) -> int:
+        """How many users are due right now and not yet processed."""
+        self._collect_due(time.time() if now is None else now)
+        return len(self._ready)
+
+    def run(self, states: dict[str, HabitState], now: float | None = None,
+            limit: int | None = None) -> int:
+        """
+        Archives and resets up to `limit` due users (all of them if None).
+        `states` is a dict or a HabitCache. Returns how many were rolled
+        over in this call.
+        """
+        now = time.time() if now is None else now
+        self._collect_due(now)
+        if not self._ready:
+            return 0
+
+        current = int(now // 60)
+        # A HabitCache's peek() keeps these lookups out of its hit / miss stats
+        lookup = getattr(states, "peek", states.get)
+        # day -> (encoded rows, their users); users are reset only once
+        # their rows are on disk
+        batches: dict[date, tuple[list[bytes], list[str]]] = {}
+        done = 0
+        try:
+            while self._ready and (limit is None or done < limit):
+                user = self._ready.popleft()
+                due = self._due.pop(user, None)
+                if due is None:
+                    continue
+                if due[0] > current:
+                    # Rescheduled (e.g. a new time zone) after the bucket was
+                    # collected — their new midnight hasn't come yet
+                    self._due[user] = due
+                    continue
+                state = lookup(user)
+                if state is None:
+                    continue
+                # Next midnight first, so a user whose day fails to archive
+                # keeps their entries and is tried again then
+                self.schedule(user, state, now)
+
+                if state.history is not None:
+                    # A user with their own HistoryStore: fold the day straight in
+                    if state.history.archive(state.habits, due[1]):
+                        reset_entries(state)
+                else:
+                    rows = DayArchive.encode(user, state.habits)
+                    if rows:
+                        batch = batches.get(due[1])
+                        if batch is None:
+                            batch = batches[due[1]] = ([], [])
+                        batch[0].append(rows)
+                        batch[1].append(user)
+                done += 1
+        finally:
+            # Even if a user above raised, the ones before them are written
+            # out — and a failed write resets nobody in that batch
+            for day, (rows, users) in batches.items():
+                self.archive.append(day, rows)
+                for user in users:
+                    # Looked up again: a HabitCache may have spilled the
+                    # state since it was encoded
+                    state = lookup(user)
+                    if state is not None:
+                        reset_entries(state)
+            self.rolled_over += done
+        return done
@@ -0,0 +1,423 @@
+# ============================================================
+# Habit Service — healthyhabittracker for many users at once
+# Features: per-user HabitState, users sharded across worker
+# processes by user id, asyncio TCP front end that serves
+# many connections concurrently.
+# ============================================================
+#
+#   clients ──TCP──▶ asyncio front end ──pipe──▶ shard worker 0  {user: HabitState}
+#                          │            ──pipe──▶ shard worker 1  {user: HabitState}
+#                          │            ──pipe──▶ ...
+#
+# A user always lands on the same shard (crc32 of the user id), so
+# their state lives in exactly one process and needs no locking.
+#
+# Protocol: one JSON object per line, one JSON reply per line.
+#
+#   {"cmd": "add",     "user": "alice", "habit": "Sleep", "value": 7.5, "time": "evening"}
+#   {"cmd": "delete",  "user": "alice", "habit": "Sleep", "index": 1}
+#   {"cmd": "delete",  "user": "alice", "habit": "Sleep", "entry_id": 42}
+#   {"cmd": "delete",  "user": "alice", "habit": "Sleep", "time": "morning"}
+#   {"cmd": "delete",  "user": "alice", "habit": "Sleep", "from": 2, "to": 5}
+#   {"cmd": "summary", "user": "alice"}
+#   {"cmd": "reset",   "user": "alice"}
+#   {"cmd": "timezone", "user": "alice", "tz": "Asia/Kolkata"}
+#
+#   reply: {"ok": true, "result": ...}  or  {"ok": false, "error": "..."}
+#   "add" replies with the new entry's id. Deleting one entry (by
+#   "index" or "entry_id") replies with that entry; deleting by "time"
+#   or by a "from".."to" range (1-based, inclusive) replies with the
+#   count. An "id" field in the request is the client's own request id:
+#   it is echoed back in the reply and never read as an entry id.
+#
+# Each shard also runs a RolloverScheduler: at every user's local
+# midnight their day is archived (habit_data/service/archive/) and
+# their entries reset, a batch at a time between live requests.
+#
+# With --cache-mb, each shard keeps its users in a HabitCache instead
+# of a plain dict: at most that many MB of states stay in memory and
+# the least recently used are spilled to habit_data/service/spill/,
+# so memory stays flat however many users there are. Users with no
+# entries are dropped from the rollover schedule while spilled (there
+# is nothing to archive) and put back when they return.
+#
+#   {"cmd": "cache"}    ->  {"ok": true, "result": [per-shard hit / miss / eviction stats]}
+#
+# Usage:
+#     python habit_service.py --port 8765 --workers 4 --data-dir habit_data/service
+#     python habit_service.py --workers 4 --cache-mb 256
+#     echo '{"cmd":"summary","user":"alice"}' | nc localhost 8765
+
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import zlib
+
+import healthyhabittracker as tracker
+from habit_cache import HabitCache
+from habit_history import DayArchive
+from habit_rollover import RolloverScheduler, get_zone
+
+# How long a worker waits for a request before checking for due
+# rollovers, and how many users it rolls over before serving again
+ROLLOVER_TICK  = 0.5
+ROLLOVER_BATCH = 2_000
+
+# Longest user id, in UTF-8 bytes — well inside the u16 length fields
+# of the day archive and the cache's spill files
+MAX_USER_BYTES = 255
+
+
+# ------------------------------------------------------------
+# COMMANDS — run inside a shard worker
+# ------------------------------------------------------------
+
+def check_user(user) -> None:
+    """Raises ValueError unless `user` is an id the shards can store."""
+    if not isinstance(user, str) or not user:
+        raise ValueError("missing 'user'")
+    try:
+        size = len(user.encode("utf-8"))
+    except UnicodeEncodeError:      # a lone surrogate, e.g. "\ud800" in the JSON
+        raise ValueError("'user' must be valid Unicode text") from None
+    if size > MAX_USER_BYTES:
+        raise ValueError(f"'user' must be at most {MAX_USER_BYTES} bytes of UTF-8")
+
+
+def _habit(state: tracker.HabitState, request: dict) -> dict:
+    name = request.get("habit")
+    config = state.habits.get(name) if isinstance(name, str) else None
+    if config is None:
+        raise ValueError(f"unknown habit {request.get('habit')!r}")
+    return config
+
+
+def _delete(entries: tracker.EntryStore, request: dict):
+    """The four ways to delete: by index, entry id, time of day or index range."""
+    if "entry_id" in request:
+        entry_id = request["entry_id"]
+        if not isinstance(entry_id, int) or entry_id not in entries:
+            raise ValueError(f"no entry with id {entry_id!r}")
+        return entries.delete_id(entry_id)
+
+    if "time" in request:
+        time_of_day = str(request["time"]).lower()
+        if time_of_day not in tracker.TIME_SLOTS:
+            raise ValueError(f"'time' must be one of: {', '.join(tracker.TIME_SLOTS)}")
+        return entries.delete_time(time_of_day)
+
+    # 1-based, same as the numbers show_entries() prints
+    if "from" in request or "to" in request:
+        first, last = request.get("from", 1), request.get("to", len(entries))
+        if not (isinstance(first, int) and isinstance(last, int) and 1 <= first <= last):
+            raise ValueError("'from' and 'to' must be entry numbers with from <= to")
+        return entries.delete_range(first - 1, last)
+
+    index = request.get("index")
+    if not isinstance(index, int) or not 1 <= index <= len(entries):
+        raise ValueError(f"'index' must be between 1 and {len(entries)}")
+    return entries.pop(index - 1)
+
+
+def handle_command(states: dict[str, tracker.HabitState], request: dict,
+                   scheduler: RolloverScheduler | None = None):
+    """
+    Applies one request to the requesting user's HabitState, creating
+    it (and scheduling its rollover) on first use. Raises ValueError for
+    bad requests — the same rules the interactive prompts enforce.
+    """
+    cmd = request.get("cmd")
+    user = request.get("user")
+    check_user(user)
+
+    state = states.get(user)
+    if state is None:
+        state = states[user] = tracker.HabitState()
+        if scheduler is not None:
+            scheduler.schedule(user, state)
+
+    if cmd == "add":
+        config = _habit(state, request)
+        try:
+            value = float(request.get("value"))
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError("'value' must be a number") from None
+        if not 0 <= value <= config["max_value"]:
+            raise ValueError(f"'value' must be between 0 and {config['max_value']}")
+        time_of_day = str(request.get("time", "")).lower()
+        if time_of_day not in tracker.TIME_SLOTS:
+            raise ValueError(f"'time' must be one of: {', '.join(tracker.TIME_SLOTS)}")
+        return config["entries"].add(value, time_of_day)
+
+    if cmd == "delete":
+        return _delete(_habit(state, request)["entries"], request)
+
+    if cmd == "summary":
+        return tracker.summary_data(state)
+
+    if cmd == "reset":
+        tracker.reset_entries(state)
+        return True
+
+    if cmd == "timezone":
+        zone_name = request.get("tz")
+        get_zone(str(zone_name))      # raises ValueError if unknown
+        state.timezone = zone_name
+        if scheduler is not None:
+            scheduler.schedule(user, state)
+        return zone_name
+
+    raise ValueError(f"unknown command {cmd!r}")
+
+
+def shard_id(user: str, shards: int) -> int:
+    """Stable user -> shard mapping (unlike hash(), the same in every process)."""
+    return zlib.crc32(user.encode("utf-8")) % shards
+
+
+def _has_entries(state: tracker.HabitState) -> bool:
+    return any(len(config["entries"]) for config in state.habits.values())
+
+
+def _shard_worker(conn, shard: int, data_dir: str, memory_budget: int | None = None) -> None:
+    """
+    Worker process loop: owns the HabitStates of every user in its
+    shard. Between requests it rolls over whoever has reached local
+    midnight, ROLLOVER_BATCH users at a time, so a big midnight never
+    holds up a live request for long.
+
+    With a memory_budget (bytes) the states live in a HabitCache.
+    """
+    archive = DayArchive(os.path.join(data_dir, "archive"), prefix=f"shard{shard}")
+    scheduler = RolloverScheduler(archive)
+
+    cache = None
+    states: dict[str, tracker.HabitState] | HabitCache = {}
+    if memory_budget is not None:
+        def on_evict(user, state):
+            if not _has_entries(state):
+                scheduler.forget(user)
+
+        def on_load(user, state):
+            if not _has_entries(state):
+                scheduler.schedule(user, state)
+
+        cache = states = HabitCache(os.path.join(data_dir, "spill", f"shard{shard}"),
+                                    memory_budget, on_evict, on_load)
+
+    while True:
+        if conn.poll(ROLLOVER_TICK):
+            message = conn.recv()
+            if message is None:
+                break
+            request_id, request = message
+            if request.get("cmd") == "cache":
+                conn.send((request_id, True, cache and {"shard": shard, **cache.stats()}))
+                continue
+            try:
+                conn.send((request_id, True, handle_command(states, request, scheduler)))
+            except ValueError as error:
+                conn.send((request_id, False, str(error)))
+            except Exception as error:
+                # A bug or an input nobody thought of — answer this
+                # request and keep the shard (and its other users) alive
+                conn.send((request_id, False, f"internal error: {type(error).__name__}: {error}"))
+            if cache is not None:
+                user = request.get("user")
+                try:
+                    cache.settle(user if isinstance(user, str) else None)
+                except Exception as error:
+                    _log_failure(shard, "spilling users", error)
+
+        try:
+            scheduler.run(states, limit=ROLLOVER_BATCH)
+        except Exception as error:
+            # The users it didn't get to keep their entries and stay
+            # scheduled; the shard carries on serving
+            _log_failure(shard, "rollover", error)
+
+
+def _log_failure(shard: int, what: str, error: Exception) -> None:
+    print(f"  ⚠  shard {shard}: {what} failed: {type(error).__name__}: {error}",
+          file=sys.stderr, flush=True)
+
+
+# ------------------------------------------------------------
+# FRONT END — asyncio side
+# ------------------------------------------------------------
+
+class ShardPool:
+    """
+    Starts one worker process per shard and routes requests to them.
+
+    submit() is awaited from the event loop; a small reader thread per
+    shard waits on the pipe and hands replies back to the loop, so the
+    loop itself never blocks on a worker.
+    """
+
+    def __init__(self, workers: int, data_dir: str, memory_budget: int | None = None) -> None:
+        self.workers = workers
+        self.data_dir = data_dir
+        self.memory_budget = memory_budget
+        self._conns = []
+        self._processes = []
+        self._threads = []
+        self._pending: dict[int, tuple[int, asyncio.Future]] = {}    # request id -> (shard, future)
+        self._down: set[int] = set()                                  # shards whose worker has exited
+        self._stopping = False
+        self._ids = itertools.count()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        for shard in range(self.workers):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_shard_worker,
+                                              args=(child, shard, self.data_dir, self.memory_budget),
+                                              daemon=True)
+            process.start()
+            child.close()
+            thread = threading.Thread(target=self._read_replies, args=(shard, parent), daemon=True)
+            thread.start()
+            self._conns.append(parent)
+            self._processes.append(process)
+            self._threads.append(thread)
+
+    def _read_replies(self, shard: int, conn) -> None:
+        while True:
+            try:
+                request_id, ok, payload = conn.recv()
+            except (EOFError, OSError):
+                break
+            self._loop.call_soon_threadsafe(self._resolve, request_id, ok, payload)
+        # The pipe closed: the worker exited (or we are shutting down)
+        try:
+            self._loop.call_soon_threadsafe(self._shard_down, shard)
+        except RuntimeError:
+            pass    # the loop is already closed
+
+    def _resolve(self, request_id: int, ok: bool, payload) -> None:
+        shard, future = self._pending.pop(request_id, (None, None))
+        if future is not None and not future.done():
+            future.set_result((ok, payload))
+
+    def _shard_down(self, shard: int) -> None:
+        """Fails every request still waiting on a shard whose worker has exited."""
+        self._down.add(shard)
+        if not self._stopping:
+            print(f"  ⚠  shard {shard} worker stopped; its users are unavailable", file=sys.stderr)
+        for request_id in [key for key, (owner, _) in self._pending.items() if owner == shard]:
+            self._resolve(request_id, False, f"shard {shard} is unavailable")
+
+    async def submit(self, request: dict):
+        """Sends a request to the user's shard and waits for (ok, payload)."""
+        user = request.get("user")
+        try:
+            check_user(user)
+        except ValueError as error:
+            return False, str(error)
+
+        return await self._send(shard_id(user, self.workers), request)
+
+    async def broadcast(self, request: dict) -> list:
+        """Sends a request to every shard and returns their payloads, in shard order."""
+        replies = await asyncio.gather(*(self._send(shard, request) for shard in range(self.workers)))
+        return [payload for ok, payload in replies]
+
+    async def _send(self, shard: int, request: dict):
+        if shard in self._down:
+            return False, f"shard {shard} is unavailable"
+        request_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = (shard, future)
+        try:
+            self._conns[shard].send((request_id, request))
+        except OSError:
+            self._shard_down(shard)
+        return await future
+
+    def stop(self) -> None:
+        self._stopping = True
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+        for conn in self._conns:
+            conn.close()
+
+
+async def _serve_client(pool: ShardPool, reader: asyncio.StreamReader,
+                        writer: asyncio.StreamWriter) -> None:
+    try:
+        while line := await reader.readline():
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError
+            except ValueError:
+                reply = {"ok": False, "error": "request must be a JSON object"}
+            else:
+                if request.get("cmd") == "cache":
+                    ok, payload = True, await pool.broadcast(request)
+                else:
+                    ok, payload = await pool.submit(request)
+                reply = {"ok": ok, "result" if ok else "error": payload}
+                if "id" in request:
+                    reply["id"] = request["id"]
+            writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int, workers: int, data_dir: str,
+                memory_budget: int | None = None) -> None:
+    pool = ShardPool(workers, data_dir, memory_budget)
+    pool.start()
+    server = await asyncio.start_server(lambda r, w: _serve_client(pool, r, w), host, port)
+    print(f"  🌿 Habit service on {host}:{port} with {workers} shard workers")
+    if memory_budget is not None:
+        print(f"     caching up to {memory_budget / 2 ** 20:g} MB of users per shard")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        pool.stop()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Multi-user habit tracking service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of shard worker processes")
+    parser.add_argument("--data-dir", default=os.path.join(tracker.DATA_DIR, "service"),
+                        help="where end-of-day archives are written")
+    parser.add_argument("--cache-mb", type=float, metavar="MB",
+                        help="keep at most this many MB of user state in memory per shard;"
+                             " spill the rest to disk (default: keep everyone in memory)")
+    args = parser.parse_args(argv)
+    if args.cache_mb is not None and args.cache_mb <= 0:
+        parser.error("--cache-mb must be more than 0")
+    memory_budget = None if args.cache_mb is None else int(args.cache_mb * 2 ** 20)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.data_dir, memory_budget))
+    except KeyboardInterrupt:
+        print("\n  Service stopped.")
+
+
+if __name__ == "__main__":
+    main()
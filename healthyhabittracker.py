@@ -4,30 +4,545 @@
 # validation, inline entry deletion, and end-of-day reset.
 # ============================================================
 
+import argparse
+import math
+import os
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import compress
+
+from console import CONSOLE, ConsoleIO, Screen, screen, write_json
+from habit_analytics import analyze_all, show_analytics
+from habit_history import HistoryStore
+from habit_journal import HabitJournal
+from metrics import METRICS
+
 # --- Valid time-of-day options ---
 TIME_SLOTS: tuple[str, ...] = ("morning", "afternoon", "evening")
 
+
+# ------------------------------------------------------------
+# ENTRY STORAGE
+# ------------------------------------------------------------
+
+class EntryStore:
+    """
+    Compact, column-oriented storage for one habit's entries.
+
+    Instead of one {"value": ..., "time": ...} dict per entry, the
+    data lives in four typed arrays that grow side by side:
+
+        values  — array('d'): the logged amount (float64)
+        slots   — array('B'): index into TIME_SLOTS (uint8)
+        stamps  — array('d'): unix timestamp the entry was logged
+        ids     — array('Q'): stable entry id (1, 2, 3, ... never reused)
+
+    That is 25 bytes per entry instead of a few hundred for a dict,
+    and totals are computed over one contiguous buffer.
+
+    The store still behaves like the old list of dicts — len(),
+    indexing, iteration, append() and pop() all work and hand back
+    {"value", "time", "timestamp", "id"} dicts built on the fly, so
+    show_entries() and delete_entry() don't need to care.
+
+    Deleting doesn't shift the arrays. The entry is only marked dead
+    in `live`, and a Fenwick tree (binary indexed tree) over those
+    flags turns the 1-based number show_entries() prints into an array
+    position in O(log n). Ids only ever grow, so `ids` stays sorted and
+    an id is found with bisect, also O(log n). Once more than half the
+    entries are dead, compact() squeezes them out in one pass.
+
+        delete_id(7)                  # by stable id
+        delete_time("morning")        # every morning entry
+        delete_range(0, 3)            # the first three shown, like a slice
+
+    Running aggregates (sum, min, max and per-time-slot subtotals)
+    are updated on every add / delete / clear, so summaries never have
+    to walk the entries again.  Min and max are the one exception:
+    deleting the current extreme marks them stale and they are
+    rescanned the next time someone asks — amortised O(1).
+
+    When a HabitJournal is attached (see habit_journal.py) every
+    add / delete / clear is also written to the on-disk log.
+    """
+
+    __slots__ = ("values", "slots", "stamps", "ids", "live", "next_id",
+                 "slot_ids", "_dead", "_tree",
+                 "running_sum", "slot_totals", "slot_counts",
+                 "_min", "_max", "_extremes_stale",
+                 "name", "journal")
+
+    def __init__(self, name: str = "") -> None:
+        self.values = array("d")
+        self.slots  = array("B")
+        self.stamps = array("d")
+        self.ids    = array("Q")
+        self.next_id = 1
+        self.name = name
+        self.journal = None
+        self._reset_index()
+        self._reset_aggregates()
+
+    def _reset_index(self) -> None:
+        self.live = bytearray(b"\x01") * len(self.values)
+        # Ids of each time slot, in order (dead ones are skipped lazily)
+        self.slot_ids = [array("Q") for _ in TIME_SLOTS]
+        for slot, entry_id in zip(self.slots, self.ids):
+            self.slot_ids[slot].append(entry_id)
+        self._dead = 0
+        self._tree = None
+
+    def _reset_aggregates(self) -> None:
+        self.running_sum = 0.0
+        self.slot_totals = array("d", [0.0] * len(TIME_SLOTS))
+        self.slot_counts = array("L", [0] * len(TIME_SLOTS))
+        self._min = math.inf
+        self._max = -math.inf
+        self._extremes_stale = False
+
+    # --------------------------------------------------------
+    # POSITIONS — display index / id -> array position
+    # --------------------------------------------------------
+
+    def _build_tree(self) -> None:
+        """Builds the Fenwick tree over the live flags in O(n)."""
+        size = len(self.live)
+        tree = array("l", [0])
+        tree.extend(self.live)
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _position(self, index: int) -> int:
+        """Array position of the entry shown at 0-based `index` (negative counts from the end)."""
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("entry index out of range")
+        if not self._dead:
+            return index
+
+        if self._tree is None:
+            self._build_tree()
+        tree = self._tree
+        size = len(tree) - 1
+        # Walk down the tree looking for the (index + 1)-th live flag
+        position = 0
+        remaining = index + 1
+        step = 1 << (size.bit_length() - 1)
+        while step:
+            probe = position + step
+            if probe <= size and tree[probe] < remaining:
+                position = probe
+                remaining -= tree[probe]
+            step >>= 1
+        return position
+
+    def _position_of_id(self, entry_id: int) -> int:
+        position = bisect_left(self.ids, entry_id)
+        if position == len(self.ids) or self.ids[position] != entry_id or not self.live[position]:
+            raise KeyError(f"no entry with id {entry_id}")
+        return position
+
+    def __contains__(self, entry_id: int) -> bool:
+        """`entry_id in store` — is there a live entry with this id?"""
+        try:
+            self._position_of_id(entry_id)
+        except KeyError:
+            return False
+        return True
+
+    # --------------------------------------------------------
+    # LIST-STYLE ACCESS
+    # --------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.values) - self._dead
+
+    def _entry(self, position: int) -> dict:
+        return {
+            "value":     self.values[position],
+            "time":      TIME_SLOTS[self.slots[position]],
+            "timestamp": self.stamps[position],
+            "id":        self.ids[position],
+        }
+
+    def __getitem__(self, index: int) -> dict:
+        return self._entry(self._position(index))
+
+    def get(self, entry_id: int) -> dict:
+        """The entry with this id. Raises KeyError if there is none."""
+        return self._entry(self._position_of_id(entry_id))
+
+    def __iter__(self):
+        rows = zip(self.values, self.slots, self.stamps, self.ids)
+        if self._dead:
+            rows = compress(rows, self.live)
+        for value, slot, stamp, entry_id in rows:
+            yield {"value": value, "time": TIME_SLOTS[slot], "timestamp": stamp, "id": entry_id}
+
+    def __repr__(self) -> str:
+        return f"EntryStore({list(self)!r})"
+
+    # --------------------------------------------------------
+    # ADDING
+    # --------------------------------------------------------
+
+    def add(self, value: float, time_of_day: str, timestamp: float | None = None) -> int:
+        """Appends one entry and returns its id. time_of_day must be one of TIME_SLOTS."""
+        return self.add_slot(value, TIME_SLOTS.index(time_of_day), timestamp)
+
+    def add_slot(self, value: float, slot: int, timestamp: float | None = None) -> int:
+        """Same as add(), but takes the TIME_SLOTS index directly."""
+        value = float(value)
+        stamp = time.time() if timestamp is None else timestamp
+        entry_id = self.next_id
+        self.next_id += 1
+        self.values.append(value)
+        self.slots.append(slot)
+        self.stamps.append(stamp)
+        self.ids.append(entry_id)
+        self.live.append(1)
+        self.slot_ids[slot].append(entry_id)
+
+        tree = self._tree
+        if tree is not None:
+            # New Fenwick node = itself + the nodes it covers — O(log n)
+            node = len(tree)
+            covered = 1
+            child = node - 1
+            stop = node - (node & -node)
+            while child > stop:
+                covered += tree[child]
+                child -= child & -child
+            tree.append(covered)
+
+        # Keep the running aggregates in step — O(1)
+        self.running_sum += value
+        self.slot_totals[slot] += value
+        self.slot_counts[slot] += 1
+        if not self._extremes_stale:
+            self._min = min(self._min, value)
+            self._max = max(self._max, value)
+
+        if self.journal is not None:
+            self.journal.log_add(self.name, value, slot, stamp)
+        return entry_id
+
+    def extend(self, values, slots, stamps) -> None:
+        """
+        Bulk version of add_slot() for imports: one extend per column,
+        one pass to update the aggregates and one journal write.
+        """
+        if not values:
+            return
+        first_id = self.next_id
+        self.next_id += len(values)
+        self.values.extend(values)
+        self.slots.extend(slots)
+        self.stamps.extend(stamps)
+        self.ids.extend(range(first_id, self.next_id))
+        self.live.extend(b"\x01" * len(values))
+        # Rebuilt on the next indexed lookup, if it is needed at all
+        self._tree = None
+
+        self.running_sum += math.fsum(values)
+        slot_ids = self.slot_ids
+        for entry_id, value, slot in zip(range(first_id, self.next_id), values, slots):
+            self.slot_totals[slot] += value
+            self.slot_counts[slot] += 1
+            slot_ids[slot].append(entry_id)
+        if not self._extremes_stale:
+            self._min = min(self._min, min(values))
+            self._max = max(self._max, max(values))
+
+        if self.journal is not None:
+            self.journal.log_add_many(self.name, values, slots, stamps)
+
+    def append(self, entry: dict) -> None:
+        """List-style append of a {"value", "time"} dict."""
+        self.add(entry["value"], entry["time"], entry.get("timestamp"))
+
+    # --------------------------------------------------------
+    # DELETING
+    # --------------------------------------------------------
+
+    def _kill(self, position: int) -> None:
+        """Marks one live entry dead and takes it out of the aggregates — O(log n)."""
+        self.live[position] = 0
+        self._dead += 1
+
+        value = self.values[position]
+        slot = self.slots[position]
+        self.running_sum -= value
+        self.slot_totals[slot] -= value
+        self.slot_counts[slot] -= 1
+        if value <= self._min or value >= self._max:
+            self._extremes_stale = True
+
+        tree = self._tree
+        if tree is not None:
+            node = position + 1
+            size = len(tree) - 1
+            while node <= size:
+                tree[node] -= 1
+                node += node & -node
+
+    def _drop_tree_for(self, deletes: int) -> None:
+        """
+        Before a bulk delete: when it touches a good share of the store,
+        rebuilding the tree later in O(n) beats updating it per entry.
+        """
+        if deletes * 8 > len(self.live):
+            self._tree = None
+
+    def _settle(self) -> None:
+        """After deletes: start clean when empty, compact when mostly dead."""
+        if not len(self):
+            # Last entry gone — start from a clean slate so float
+            # rounding from repeated subtraction can't linger
+            self._drop_all()
+        elif self._dead > len(self):
+            self.compact()
+
+    def pop(self, index: int = -1) -> dict:
+        """Removes and returns the entry shown at index (list semantics) — O(log n)."""
+        position = self._position(index)
+        removed = self._entry(position)
+        self._kill(position)
+
+        if self.journal is not None:
+            self.journal.log_delete(self.name, removed["id"])
+        self._settle()
+        return removed
+
+    def delete_id(self, entry_id: int) -> dict:
+        """Removes and returns the entry with this id. Raises KeyError if there is none."""
+        position = self._position_of_id(entry_id)
+        removed = self._entry(position)
+        self._kill(position)
+
+        if self.journal is not None:
+            self.journal.log_delete(self.name, entry_id)
+        self._settle()
+        return removed
+
+    def delete_time(self, time_of_day: str) -> int:
+        """Removes every entry logged at this time of day. Returns how many."""
+        return self.delete_slot(TIME_SLOTS.index(time_of_day))
+
+    def delete_slot(self, slot: int) -> int:
+        """Same as delete_time(), but takes the TIME_SLOTS index directly."""
+        removed = 0
+        ids, live = self.ids, self.live
+        self._drop_tree_for(len(self.slot_ids[slot]))
+        for entry_id in self.slot_ids[slot]:
+            position = bisect_left(ids, entry_id)
+            if position < len(ids) and ids[position] == entry_id and live[position]:
+                self._kill(position)
+                removed += 1
+        self.slot_ids[slot] = array("Q")
+
+        if removed and self.journal is not None:
+            self.journal.log_delete_slot(self.name, slot)
+        self._settle()
+        return removed
+
+    def delete_range(self, start: int, stop: int) -> int:
+        """
+        Removes the entries shown at 0-based positions start..stop-1,
+        clamped like a list slice. Returns how many were removed.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return 0
+        return self.delete_id_range(self.ids[self._position(start)], self.ids[self._position(stop - 1)])
+
+    def delete_id_range(self, first_id: int, last_id: int) -> int:
+        """Removes every entry whose id is between first_id and last_id (inclusive)."""
+        live = self.live
+        removed = 0
+        positions = range(bisect_left(self.ids, first_id), bisect_right(self.ids, last_id))
+        self._drop_tree_for(len(positions))
+        for position in positions:
+            if live[position]:
+                self._kill(position)
+                removed += 1
+
+        if removed and self.journal is not None:
+            self.journal.log_delete_range(self.name, first_id, last_id)
+        self._settle()
+        return removed
+
+    def compact(self) -> None:
+        """Squeezes dead entries out of the columns in one pass — ids are kept."""
+        if not self._dead:
+            return
+        live = self.live
+        self.values = array("d", compress(self.values, live))
+        self.slots  = array("B", compress(self.slots, live))
+        self.stamps = array("d", compress(self.stamps, live))
+        self.ids    = array("Q", compress(self.ids, live))
+        self._reset_index()
+
+    def _drop_all(self) -> None:
+        del self.values[:]
+        del self.slots[:]
+        del self.stamps[:]
+        del self.ids[:]
+        self._reset_index()
+        self._reset_aggregates()
+
+    def clear(self) -> None:
+        """Drops every entry but keeps the store object (and its id counter)."""
+        self._drop_all()
+
+        if self.journal is not None:
+            self.journal.log_reset(self.name)
+
+    def load_columns(self, values: array, slots: array, stamps: array,
+                     ids: array | None = None, next_id: int | None = None) -> None:
+        """
+        Replaces the store's contents with ready-made columns (used when
+        restoring a snapshot) and rebuilds the aggregates in one pass.
+        Not journaled — the data came from disk in the first place.
+        Without `ids` (older snapshots) the entries are numbered 1..n.
+        """
+        if ids is None:
+            ids = array("Q", range(1, len(values) + 1))
+        self.values, self.slots, self.stamps, self.ids = values, slots, stamps, ids
+        self.next_id = max(next_id or 1, ids[-1] + 1 if ids else 1)
+        self._reset_index()
+        self._reset_aggregates()
+        self.running_sum = math.fsum(values)
+        for value, slot in zip(values, slots):
+            self.slot_totals[slot] += value
+            self.slot_counts[slot] += 1
+        self._extremes_stale = True
+
+    # --------------------------------------------------------
+    # AGGREGATES
+    # --------------------------------------------------------
+
+    def total(self) -> float:
+        """Sum of all entry values, maintained incrementally."""
+        return self.running_sum
+
+    def _refresh_extremes(self) -> None:
+        if self._extremes_stale:
+            values = array("d", compress(self.values, self.live)) if self._dead else self.values
+            self._min = min(values, default=math.inf)
+            self._max = max(values, default=-math.inf)
+            self._extremes_stale = False
+
+    def minimum(self) -> float:
+        """Smallest logged value, or 0.0 when there are no entries."""
+        self._refresh_extremes()
+        return self._min if len(self) else 0.0
+
+    def maximum(self) -> float:
+        """Largest logged value, or 0.0 when there are no entries."""
+        self._refresh_extremes()
+        return self._max if len(self) else 0.0
+
+    def oldest_timestamp(self) -> float | None:
+        """
+        When the earliest live entry was logged, or None if there are
+        none. Not simply the first entry's: rows can arrive out of order.
+        """
+        stamps = compress(self.stamps, self.live) if self._dead else self.stamps
+        return min(stamps, default=None)
+
+
 # --- Habit configuration — single source of truth ---
 # max_value: upper bound per single entry (e.g. can't sleep > 24 hrs)
-# entries:   populated at runtime, starts empty each session
-HABITS: dict[str, dict] = {
-    "Water Intake": {"unit": "cups",    "threshold": 8,  "max_value": 20,  "entries": []},
-    "Exercise":     {"unit": "minutes", "threshold": 30, "max_value": 300, "entries": []},
-    "Sleep":        {"unit": "hours",   "threshold": 7,  "max_value": 24,  "entries": []},
+HABIT_CONFIG: dict[str, dict] = {
+    "Water Intake": {"unit": "cups",    "threshold": 8,  "max_value": 20},
+    "Exercise":     {"unit": "minutes", "threshold": 30, "max_value": 300},
+    "Sleep":        {"unit": "hours",   "threshold": 7,  "max_value": 24},
 }
 
 
+def new_habits() -> dict[str, dict]:
+    """
+    A fresh copy of HABIT_CONFIG where every habit also gets its own
+    empty EntryStore under 'entries' (populated at runtime).
+    """
+    return {name: {**config, "entries": EntryStore(name)} for name, config in HABIT_CONFIG.items()}
+
+
+# --- Where data lives — override with HABIT_DATA_DIR=/some/path ---
+DATA_DIR: str = os.environ.get("HABIT_DATA_DIR", "habit_data")
+
+# --- Machine-readable output — summaries as JSON (set by --json) ---
+JSON_OUTPUT: bool = False
+
+# --- Instrumentation (off unless --metrics is given; see metrics.py) ---
+METRICS.describe("tracker_command_seconds",
+                 "Main-menu command handling time, excluding waits for input", "command")
+METRICS.describe("tracker_entry_action_seconds",
+                 "Add / delete / view / done handling time, excluding waits for input", "action")
+METRICS.describe("tracker_summary_seconds", "Daily summary rendering time (sampled)")
+
+_MAIN_MENU_KEYS  = frozenset("tshar")
+_HABIT_MENU_KEYS = frozenset("adv")
+
+
+# ------------------------------------------------------------
+# PER-USER STATE
+# ------------------------------------------------------------
+
+@dataclass
+class HabitState:
+    """
+    Everything that belongs to one person using the tracker.
+
+        habits   — habit config + EntryStore per habit (see new_habits)
+        history  — their archived days (HistoryStore), if kept
+        journal  — their on-disk log (HabitJournal), if attached
+        timezone — IANA name for their local midnight; None = this machine
+
+    The functions below take an optional `state`; leaving it out means
+    the single-user STATE this script runs with, so the interactive app
+    works exactly as before while a server can hold one per user.
+    """
+    habits: dict[str, dict] = field(default_factory=new_habits)
+    history: HistoryStore | None = None
+    journal: HabitJournal | None = None
+    timezone: str | None = None
+
+
+# The interactive app's own user
+STATE = HabitState(history=HistoryStore(os.path.join(DATA_DIR, "history")))
+
+# Short aliases for the single-user state — HABITS is the same dict
+# earlier versions of this script defined here
+HABITS: dict[str, dict] = STATE.habits
+HISTORY: HistoryStore = STATE.history
+
+
 # ------------------------------------------------------------
 # INPUT HELPERS
 # ------------------------------------------------------------
 
-def get_positive_float(prompt: str, max_value: float) -> float | None:
+def get_positive_float(prompt: str, max_value: float, io: ConsoleIO | None = None) -> float | None:
     """
     Prompts for a numeric value between 0 and max_value (inclusive).
     Returns float if valid, None if user types 'done' or presses Enter.
+
+    Like every prompt below, it talks to `io` (the terminal by
+    default), so a ScriptedIO can answer instead of a person.
     """
+    io = io or CONSOLE
     while True:
-        raw = input(prompt).strip()
+        raw = io.input(prompt).strip()
 
         if raw.lower() in ("done", "d", ""):
             return None
@@ -36,161 +551,233 @@ def get_positive_float(prompt: str, max_value: float) -> float | None:
             value = float(raw)
 
             if value < 0:
-                print("  ⚠  Value must be 0 or greater. Try again.")
+                io.print("  ⚠  Value must be 0 or greater. Try again.")
                 continue
 
             if value > max_value:
-                print(f"  ⚠  Value cannot exceed {max_value}. Try again.")
+                io.print(f"  ⚠  Value cannot exceed {max_value}. Try again.")
                 continue
 
             return value
 
         except ValueError:
-            print("  ⚠  Invalid input. Please enter a number (or 'done' to finish).")
+            io.print("  ⚠  Invalid input. Please enter a number (or 'done' to finish).")
 
 
-def get_time_of_day() -> str:
+def get_time_of_day(io: ConsoleIO | None = None) -> str:
     """
     Prompts for morning / afternoon / evening.
     Loops until a valid option is entered.
     """
+    io = io or CONSOLE
     options_str = " / ".join(TIME_SLOTS)
 
     while True:
-        raw = input(f"  Time of day ({options_str}): ").strip().lower()
+        raw = io.input(f"  Time of day ({options_str}): ").strip().lower()
 
         if raw in TIME_SLOTS:
             return raw
 
-        print(f"  ⚠  Please enter one of: {options_str}")
+        io.print(f"  ⚠  Please enter one of: {options_str}")
 
 
 # ------------------------------------------------------------
 # DISPLAY HELPER
 # ------------------------------------------------------------
 
-def show_entries(entries: list[dict], unit: str) -> None:
+def show_entries(entries: EntryStore, unit: str, out: Screen | None = None) -> None:
     """
     Prints all current entries with a 1-based index number.
+    Pass `out` to draw into a caller's Screen instead of writing now.
 
     Example output:
         Current entries:
           [1] Morning    — 2.5 cups
           [2] Afternoon  — 1.0 cups
     """
-    if not entries:
-        print("  (no entries yet)")
-        return
+    with screen(out) as out:
+        if not entries:
+            out.line("  (no entries yet)")
+            return
 
-    print("  Current entries:")
-    for i, entry in enumerate(entries, start=1):
-        print(f"    [{i}] {entry['time'].capitalize():<12} — {entry['value']:.1f} {unit}")
+        out.line("  Current entries:")
+        for i, entry in enumerate(entries, start=1):
+            out.line(f"    [{i}] {entry['time'].capitalize():<12} — {entry['value']:.1f} {unit}")
 
 
 # ------------------------------------------------------------
 # DELETION HELPER
 # ------------------------------------------------------------
 
-def delete_entry(entries: list[dict], unit: str) -> None:
+def delete_entry(entries: EntryStore, unit: str, io: ConsoleIO | None = None) -> None:
     """
     Shows current entries and asks the user which index to delete.
-    Mutates the entries list in place — no return value needed.
+    Mutates the entry store in place — no return value needed.
     """
+    io = io or CONSOLE
     if not entries:
-        print("  ⚠  No entries to delete.")
+        io.print("  ⚠  No entries to delete.")
         return
 
-    show_entries(entries, unit)
+    with screen(stream=io) as out:
+        show_entries(entries, unit, out)
 
     while True:
-        raw = input(f"  Enter entry number to delete (1-{len(entries)}): ").strip()
+        raw = io.input(f"  Enter entry number to delete (1-{len(entries)}): ").strip()
 
         try:
             index = int(raw)
 
             if index < 1 or index > len(entries):
-                print(f"  ⚠  Please enter a number between 1 and {len(entries)}.")
+                io.print(f"  ⚠  Please enter a number between 1 and {len(entries)}.")
                 continue
 
-            # pop(index - 1): convert 1-based user input to 0-based list index
+            # pop(index - 1): convert 1-based user input to 0-based store index
             removed = entries.pop(index - 1)
-            print(f"  ✅ Deleted: {removed['time'].capitalize()} — {removed['value']:.1f} {unit}")
+            io.print(f"  ✅ Deleted: {removed['time'].capitalize()} — {removed['value']:.1f} {unit}")
             break
 
         except ValueError:
-            print("  ⚠  Invalid input. Please enter a number.")
+            io.print("  ⚠  Invalid input. Please enter a number.")
 
 
 # ------------------------------------------------------------
 # RESET HELPER
 # ------------------------------------------------------------
 
-def clear_all_entries() -> None:
+def reset_entries(state: HabitState | None = None) -> None:
     """
-    Resets all habit entries to empty lists.
-    Mutates the HABITS dict in place — iterates every habit and
-    reassigns its 'entries' key to a fresh empty list.
-
-    Called at end-of-day so the user starts clean the next day.
+    Resets all of a user's habit entries to empty stores, silently.
     Does NOT reset thresholds or config — only the tracked data.
     """
-    for config in HABITS.values():
-        # Reassign to a new empty list — cleanly wipes all entries
-        # HABITS.values() gives us the inner config dicts directly,
+    state = state or STATE
+    for config in state.habits.values():
+        # clear() empties the arrays behind the store in one go
+        # .values() gives us the inner config dicts directly,
         # so we can modify them without needing the habit name key
         config["entries"].clear()
 
-    print("\n  ✅ All entries cleared. Ready for a new day!")
-    print(f"  Habits reset: {', '.join(HABITS.keys())}")
+
+def clear_all_entries(state: HabitState | None = None, io: ConsoleIO | None = None) -> None:
+    """
+    Resets all habit entries to empty stores and confirms it.
+    Mutates the state's habits dict in place via reset_entries().
+
+    Called at end-of-day so the user starts clean the next day.
+    """
+    state = state or STATE
+    io = io or CONSOLE
+    reset_entries(state)
+
+    io.print("\n  ✅ All entries cleared. Ready for a new day!")
+    io.print(f"  Habits reset: {', '.join(state.habits.keys())}")
+
+
+def archive_day(day: date | None = None, state: HabitState | None = None) -> int:
+    """
+    Freezes the current entries' aggregates into the history store
+    under `day` (today by default). Call before clear_all_entries()
+    so the day is kept instead of wiped.
+    Returns the number of entries archived.
+    """
+    state = state or STATE
+    if state.history is None:
+        return 0
+    return state.history.archive(state.habits, day or date.today())
+
+
+def rollover_if_needed(state: HabitState | None = None) -> int:
+    """
+    If the live entries were started on an earlier day (the app was
+    closed over midnight), archives them under that day and resets.
+    The oldest live entry decides, so a late row added ahead of an
+    earlier one can't hide a stale day. Returns the number of entries
+    archived (0 if nothing to do).
+    """
+    state = state or STATE
+    oldest = min((config["entries"].oldest_timestamp() for config in state.habits.values()
+                  if len(config["entries"])), default=None)
+    if oldest is None:
+        return 0
+
+    logged_on = date.fromtimestamp(oldest)
+    if logged_on >= date.today():
+        return 0
+
+    archived = archive_day(logged_on, state)
+    reset_entries(state)
+    return archived
 
 
 # ------------------------------------------------------------
 # COLLECTION
 # ------------------------------------------------------------
 
-def collect_entries(habit_name: str, unit: str, max_value: float) -> list[dict]:
+@lru_cache(maxsize=None)
+def _habit_menu_text() -> str:
+    """The per-habit action menu never changes, so it is built once."""
+    return (
+        "\n  What would you like to do?\n"
+        "    [A] Add entry\n"
+        "    [D] Delete entry\n"
+        "    [V] View entries\n"
+        "    [Q] Done with this habit\n"
+    )
+
+
+def collect_entries(habit_name: str, unit: str, max_value: float,
+                    state: HabitState | None = None, io: ConsoleIO | None = None) -> EntryStore:
     """
     Collects entries for a single habit with an inline action menu.
 
         [A]dd  [D]elete  [V]iew  [Q]uit
 
-    Returns the final list[dict] of entries when user quits.
+    Adds to the habit's existing EntryStore in the user's habits (so
+    entries logged earlier today — or restored from the journal — are
+    kept) and returns it when the user quits.
     """
-    entries: list[dict] = []
+    entries = (state or STATE).habits[habit_name]["entries"]
+    io = io or CONSOLE
 
-    print(f"\n--- {habit_name} Tracker ({unit}) ---")
-    print(f"  Valid range per entry: 0 - {max_value} {unit}")
+    with screen(stream=io) as out:
+        out.line(f"\n--- {habit_name} Tracker ({unit}) ---")
+        out.line(f"  Valid range per entry: 0 - {max_value} {unit}")
 
     while True:
-        print("\n  What would you like to do?")
-        print("    [A] Add entry")
-        print("    [D] Delete entry")
-        print("    [V] View entries")
-        print("    [Q] Done with this habit")
+        with screen(stream=io) as out:
+            out.write(_habit_menu_text())
 
-        choice = input("  Choice: ").strip().lower()
+        choice = io.input("  Choice: ").strip().lower()
+        started = METRICS.start()
 
         if choice == "a":
-            value = get_positive_float(f"  Value ({unit}): ", max_value)
+            value = get_positive_float(f"  Value ({unit}): ", max_value, io)
             if value is None:
+                METRICS.stop("tracker_entry_action_seconds", started, "a")
                 continue
-            time_of_day = get_time_of_day()
-            entries.append({"value": value, "time": time_of_day})
-            print(f"  ✅ Added: {time_of_day.capitalize()} — {value:.1f} {unit}")
+            time_of_day = get_time_of_day(io)
+            entries.add(value, time_of_day)
+            io.print(f"  ✅ Added: {time_of_day.capitalize()} — {value:.1f} {unit}")
 
         elif choice == "d":
-            delete_entry(entries, unit)
+            delete_entry(entries, unit, io)
 
         elif choice == "v":
-            show_entries(entries, unit)
+            with screen(stream=io) as out:
+                show_entries(entries, unit, out)
 
         elif choice == "q":
-            print(f"\n  Final entries for {habit_name}:")
-            show_entries(entries, unit)
+            with screen(stream=io) as out:
+                out.line(f"\n  Final entries for {habit_name}:")
+                show_entries(entries, unit, out)
+            METRICS.stop("tracker_entry_action_seconds", started, "q")
             break
 
         else:
-            print("  ⚠  Please enter A, D, V, or Q.")
+            io.print("  ⚠  Please enter A, D, V, or Q.")
+
+        METRICS.stop("tracker_entry_action_seconds", started,
+                     choice if choice in _HABIT_MENU_KEYS else "invalid")
 
     return entries
 
@@ -199,37 +786,78 @@ def collect_entries(habit_name: str, unit: str, max_value: float) -> list[dict]:
 # EVALUATION
 # ------------------------------------------------------------
 
-def evaluate_habit(habit_name: str, entries: list[dict], threshold: float, unit: str) -> float:
+def evaluate_habit(habit_name: str, entries: EntryStore, threshold: float, unit: str,
+                   out: Screen | None = None) -> float:
     """
-    Sums entries, compares against threshold, prints result with breakdown.
+    Compares the habit's running total against threshold and prints the
+    result with a per-time-of-day breakdown.
     Returns the total so the caller can use it for cross-habit aggregation.
+
+    Uses the aggregates the EntryStore keeps up to date, so the cost
+    is the same whether the habit has 3 entries or 30,000.
     """
-    total = sum(entry["value"] for entry in entries)
+    total = entries.total()
 
-    if total >= threshold:
-        print(f"  ✅ {habit_name}: {total:.1f} {unit} — Goal met! (Target: {threshold} {unit})")
-    else:
-        shortfall = threshold - total
-        print(f"  ❌ {habit_name}: {total:.1f} {unit} — {shortfall:.1f} {unit} below target (Target: {threshold} {unit})")
+    with screen(out) as out:
+        if total >= threshold:
+            out.line(f"  ✅ {habit_name}: {total:.1f} {unit} — Goal met! (Target: {threshold} {unit})")
+        else:
+            shortfall = threshold - total
+            out.line(f"  ❌ {habit_name}: {total:.1f} {unit} — {shortfall:.1f} {unit} below target (Target: {threshold} {unit})")
 
-    if entries:
-        for entry in entries:
-            print(f"      {entry['time'].capitalize():<12} — {entry['value']:.1f} {unit}")
+        for slot, time_of_day in enumerate(TIME_SLOTS):
+            count = entries.slot_counts[slot]
+            if count:
+                label = "entry" if count == 1 else "entries"
+                out.line(f"      {time_of_day.capitalize():<12} — {entries.slot_totals[slot]:.1f} {unit} ({count} {label})")
 
     return total
 
 
+def habit_summary(config: dict) -> dict:
+    """
+    The numbers evaluate_habit() prints, as a plain dict instead —
+    for callers that aren't a terminal (e.g. habit_service.py).
+    """
+    entries   = config["entries"]
+    total     = entries.total()
+    count     = len(entries)
+    threshold = config["threshold"]
+
+    return {
+        "unit":      config["unit"],
+        "threshold": threshold,
+        "total":     total,
+        "count":     count,
+        "average":   total / count if count > 0 else 0.0,
+        "minimum":   entries.minimum(),
+        "maximum":   entries.maximum(),
+        "goal_met":  total >= threshold,
+        "shortfall": max(0.0, threshold - total),
+        "by_time":   {slot: entries.slot_totals[i] for i, slot in enumerate(TIME_SLOTS)},
+    }
+
+
+def summary_data(state: HabitState | None = None) -> dict:
+    """habit_summary() for every habit of one user, plus the entry count."""
+    state = state or STATE
+    return {
+        "habits":        {name: habit_summary(config) for name, config in state.habits.items()},
+        "total_entries": sum(len(config["entries"]) for config in state.habits.values()),
+    }
+
 
 # ------------------------------------------------------------
 # TOTALS AND AVERAGES
 # ------------------------------------------------------------
 
-def show_totals_and_averages(totals: dict[str, float]) -> None:
+def show_totals_and_averages(totals: dict[str, float], state: HabitState | None = None,
+                             out: Screen | None = None) -> None:
     """
     Prints a footer table showing total and average per-entry for each habit.
 
     totals: dict of {habit_name: total_value} — passed in from show_summary()
-            so this function stays pure (no direct HABITS access needed).
+            so this function doesn't have to re-evaluate anything.
 
     Average is calculated as:
         total / number_of_entries  — if entries exist
@@ -242,94 +870,236 @@ def show_totals_and_averages(totals: dict[str, float]) -> None:
         Exercise         35.0 min    17.5 min
         Sleep            7.0 hrs     7.0 hrs
     """
-    print("-" * 50)
-    print(f"  {'Habit':<16} {'Total':<14} {'Avg/Entry'}")
-    print(f"  {'-'*16} {'-'*13} {'-'*12}")
+    habits = (state or STATE).habits
 
-    for habit_name, config in HABITS.items():
-        total     = totals[habit_name]
-        unit      = config["unit"]
-        entries   = config["entries"]
-        count     = len(entries)
+    with screen(out) as out:
+        out.line("-" * 50)
+        out.line(f"  {'Habit':<16} {'Total':<14} {'Avg/Entry'}")
+        out.line(f"  {'-'*16} {'-'*13} {'-'*12}")
 
-        # Ternary expression: value_if_true if condition else value_if_false
-        # Avoids ZeroDivisionError when no entries were logged
-        average = total / count if count > 0 else 0.0
+        for habit_name, config in habits.items():
+            total     = totals[habit_name]
+            unit      = config["unit"]
+            entries   = config["entries"]
+            count     = len(entries)
 
-        print(f"  {habit_name:<16} {total:<6.1f} {unit:<8} {average:.1f} {unit}")
+            # Ternary expression: value_if_true if condition else value_if_false
+            # Avoids ZeroDivisionError when no entries were logged
+            average = total / count if count > 0 else 0.0
 
-    print("-" * 50)
-    print(f"  Total entries logged today: {sum(len(c['entries']) for c in HABITS.values())}")
+            out.line(f"  {habit_name:<16} {total:<6.1f} {unit:<8} {average:.1f} {unit}")
+
+        out.line("-" * 50)
+        # len() on an EntryStore is O(1), so this is O(habits), not O(entries)
+        out.line(f"  Total entries logged today: {sum(len(c['entries']) for c in habits.values())}")
 
 
 # ------------------------------------------------------------
 # DAILY SUMMARY
 # ------------------------------------------------------------
 
-def show_summary() -> None:
+@METRICS.sampled("tracker_summary_seconds")
+def show_summary(state: HabitState | None = None, out: Screen | None = None,
+                 stream=None) -> None:
     """
     Evaluates all habits and prints the daily summary.
     Collects the total returned by evaluate_habit() for each habit,
     then passes them to show_totals_and_averages() for the footer.
+
+    The whole summary is drawn into one Screen and written in one go
+    (or left in the caller's `out`, e.g. when rendering many users) —
+    to `stream` if given, stdout otherwise.
+    In JSON mode the same numbers come from summary_data() instead.
     """
-    print("\n" + "=" * 50)
-    print("           📊 Daily Summary")
-    print("=" * 50)
+    state = state or STATE
 
-    # Collect each habit's total as evaluate_habit() runs
-    # totals is built as a dict: {"Water Intake": 5.0, "Exercise": 35.0, ...}
-    totals: dict[str, float] = {}
+    if JSON_OUTPUT and out is None:
+        write_json(summary_data(state), stream)
+        return
 
-    for habit_name, config in HABITS.items():
-        totals[habit_name] = evaluate_habit(
-            habit_name,
-            config["entries"],
-            config["threshold"],
-            config["unit"]
-        )
-        print()
+    with screen(out, stream) as out:
+        out.line("\n" + "=" * 50)
+        out.line("           📊 Daily Summary")
+        out.line("=" * 50)
+
+        # Collect each habit's total as evaluate_habit() runs
+        # totals is built as a dict: {"Water Intake": 5.0, "Exercise": 35.0, ...}
+        totals: dict[str, float] = {}
+
+        for habit_name, config in state.habits.items():
+            totals[habit_name] = evaluate_habit(
+                habit_name,
+                config["entries"],
+                config["threshold"],
+                config["unit"],
+                out
+            )
+            out.line()
+
+        # Print totals and averages footer using collected totals
+        show_totals_and_averages(totals, state, out)
+        out.line("=" * 50)
+
+
+# ------------------------------------------------------------
+# HISTORY VIEW
+# ------------------------------------------------------------
+
+def history_data(days: int = 7, state: HabitState | None = None) -> dict:
+    """The numbers show_history() prints, as a plain dict (for JSON mode)."""
+    state = state or STATE
+    today = date.today()
+    start = today - timedelta(days=days - 1)
+    result = {}
+
+    for habit_name, config in state.habits.items():
+        history    = state.history.habit(habit_name)
+        streak_end = today if history.get(today) else today - timedelta(days=1)
+        result[habit_name] = {
+            "streak":  history.streak(config["threshold"], streak_end),
+            "mean_7":  history.rolling_average(today, 7),
+            "mean_30": history.rolling_average(today, 30),
+            "days":    [day_totals._asdict() for day_totals in history.range(start, today)],
+        }
+    return result
+
+
+def show_history(days: int = 7, state: HabitState | None = None, stream=None) -> None:
+    """
+    Prints the last `days` archived days for every habit, plus the
+    current streak and 7 / 30-day rolling averages.
+
+    Only the records for the requested days are read from the
+    memory-mapped history files — older days are never touched.
+
+    Example output:
+        Water Intake  — streak: 3 days | 7-day avg: 6.9 | 30-day avg: 5.2 cups
+          Mon 13 Oct   ✅ 8.0 cups
+          Tue 14 Oct   ❌ 5.5 cups
+    """
+    state = state or STATE
+
+    if JSON_OUTPUT:
+        write_json(history_data(days, state), stream)
+        return
 
-    # Print totals and averages footer using collected totals
-    show_totals_and_averages(totals)
-    print("=" * 50)
+    today = date.today()
+    start = today - timedelta(days=days - 1)
+
+    with screen(stream=stream) as out:
+        out.line("\n" + "=" * 50)
+        out.line(f"           📅 History (last {days} days)")
+        out.line("=" * 50)
+
+        for habit_name, config in state.habits.items():
+            history   = state.history.habit(habit_name)
+            unit      = config["unit"]
+            threshold = config["threshold"]
+
+            # A streak can still be alive if today just hasn't been archived yet
+            streak_end = today if history.get(today) else today - timedelta(days=1)
+            streak     = history.streak(threshold, streak_end)
+
+            out.line(f"\n  {habit_name:<13} — streak: {streak} days"
+                     f" | 7-day avg: {history.rolling_average(today, 7):.1f}"
+                     f" | 30-day avg: {history.rolling_average(today, 30):.1f} {unit}")
+
+            logged = history.range(start, today)
+            if not logged:
+                out.line("    (nothing archived yet)")
+            for day_totals in logged:
+                mark = "✅" if day_totals.total >= threshold else "❌"
+                out.line(f"    {day_totals.day:%a %d %b}   {mark} {day_totals.total:.1f} {unit}")
+
+        out.line("\n" + "=" * 50)
+
+
+# ------------------------------------------------------------
+# PERSISTENCE
+# ------------------------------------------------------------
+
+def open_journal(directory: str = DATA_DIR, state: HabitState | None = None,
+                 io: ConsoleIO | None = None) -> HabitJournal:
+    """
+    Restores a user's habits from the on-disk journal and attaches it,
+    so every add / delete / reset from here on is written to the log.
+    """
+    state = state or STATE
+    io = io or CONSOLE
+    journal = HabitJournal(directory)
+    replayed = journal.open(state.habits)
+    state.journal = journal
+    restored = sum(len(c["entries"]) for c in state.habits.values())
+
+    if restored and not JSON_OUTPUT:
+        io.print(f"  📂 Restored {restored} entries ({replayed} log records replayed).")
+
+    return journal
 
 
 # ------------------------------------------------------------
 # ORCHESTRATION
 # ------------------------------------------------------------
 
-def run_tracker() -> None:
+def run_tracker(state: HabitState | None = None, io: ConsoleIO | None = None) -> None:
     """
     Runs one tracking session — collects entries for all habits
     then shows the daily summary.
     """
-    print("\n" + "=" * 50)
-    print("       🌿 Healthy Habits Tracker 🌿")
-    print("=" * 50)
+    state = state or STATE
+    io = io or CONSOLE
+    habits = state.habits
+
+    with screen(stream=io) as out:
+        out.line("\n" + "=" * 50)
+        out.line("       🌿 Healthy Habits Tracker 🌿")
+        out.line("=" * 50)
 
-    # --- DEBUG: Confirm config loaded ---
-    print(f"[DEBUG] Habits: {list(HABITS.keys())}")
-    print(f"[DEBUG] Max values: { {k: v['max_value'] for k, v in HABITS.items()} }")
+        # --- DEBUG: Confirm config loaded ---
+        out.line(f"[DEBUG] Habits: {list(habits.keys())}")
+        out.line(f"[DEBUG] Max values: { {k: v['max_value'] for k, v in habits.items()} }")
 
     # Collect entries for each habit
-    for habit_name, config in HABITS.items():
+    for habit_name, config in habits.items():
         config["entries"] = collect_entries(
             habit_name,
             config["unit"],
-            config["max_value"]
+            config["max_value"],
+            state,
+            io
         )
 
-    # --- DEBUG: Confirm final structured data ---
-    for name, cfg in HABITS.items():
-        print(f"[DEBUG] {name}: {cfg['entries']}")
-
-    # Show summary after all habits are tracked
-    show_summary()
-    print("  Keep it up! Small habits compound over time. 💪")
-    print("=" * 50)
-
+    with screen(stream=io) as out:
+        # --- DEBUG: Confirm final structured data ---
+        for name, cfg in habits.items():
+            out.line(f"[DEBUG] {name}: {cfg['entries']}")
 
-def main() -> None:
+        # Show summary after all habits are tracked
+        if JSON_OUTPUT:
+            out.flush(io)
+            show_summary(state, stream=io)
+        else:
+            show_summary(state, out)
+            out.line("  Keep it up! Small habits compound over time. 💪")
+            out.line("=" * 50)
+
+
+@lru_cache(maxsize=None)
+def _main_menu_text() -> str:
+    """The main menu is static text, so it is built once and reused."""
+    return (
+        "\n  MAIN MENU\n"
+        "  ---------\n"
+        "    [T] Track today's habits\n"
+        "    [S] View today's summary\n"
+        "    [H] View history\n"
+        "    [A] Analytics (all history)\n"
+        "    [R] Archive today & reset (new day)\n"
+        "    [Q] Quit\n"
+    )
+
+
+def main(argv: list[str] | None = None, io: ConsoleIO | None = None) -> None:
     """
     Outer application loop — the main menu.
 
@@ -337,54 +1107,128 @@ def main() -> None:
     The user can:
         [T] Track habits for today
         [S] View current summary
-        [R] Reset / clear all entries (end of day)
+        [H] View archived history (streaks, rolling averages)
+        [A] Analytics over the whole archived history
+        [R] Archive today's entries, then clear them (end of day)
         [Q] Quit the application
 
     This separation means run_tracker() stays focused on one session,
     while main() handles the application lifecycle — same pattern as
     a controller calling a service in Spring.
+
+    Command-line options:
+        --json              print summaries / history as JSON
+        --summary           print today's summary once and exit
+        --history           print the last 7 days once and exit
+        --metrics FILE      time each command and write FILE on exit
+                            (.json snapshot, otherwise Prometheus text)
+
+    `io` replaces the terminal for the menus and prompts (see console.py).
     """
-    print("=" * 50)
-    print("   🌿 Welcome to Healthy Habits Tracker 🌿")
-    print("=" * 50)
+    global JSON_OUTPUT
+
+    parser = argparse.ArgumentParser(description="Healthy Habits Tracker")
+    parser.add_argument("--json", action="store_true", help="machine-readable JSON summaries")
+    parser.add_argument("--summary", action="store_true", help="print today's summary and exit")
+    parser.add_argument("--history", action="store_true", help="print recent history and exit")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="record timings / counters and write them to FILE (.json or Prometheus text)")
+    parser.add_argument("--metrics-sample", type=int, default=10, metavar="N",
+                        help="time one in every N summaries (default 10)")
+    args = parser.parse_args(argv)
+    JSON_OUTPUT = args.json
+    one_shot = args.summary or args.history
+
+    if args.metrics:
+        METRICS.enable(args.metrics_sample)
+    io = METRICS.wrap_io(io or CONSOLE)
+
+    if not one_shot:
+        with screen(stream=io) as out:
+            out.line("=" * 50)
+            out.line("   🌿 Welcome to Healthy Habits Tracker 🌿")
+            out.line("=" * 50)
+
+    journal = open_journal(io=io)
+    archived = rollover_if_needed()
+    if archived and not one_shot:
+        io.print(f"  📅 New day — archived {archived} entries from your last session to history.")
+
+    try:
+        if args.summary:
+            show_summary(stream=io)
+        if args.history:
+            show_history(stream=io)
+        if not one_shot:
+            run_main_menu(io=io)
+    finally:
+        # Compact + fsync so the next start-up is a snapshot load
+        journal.close()
+        HISTORY.close()
+        if args.metrics:
+            METRICS.write(args.metrics)
+
+
+def run_main_menu(state: HabitState | None = None, io: ConsoleIO | None = None) -> None:
+    """
+    The [T] / [S] / [H] / [A] / [R] / [Q] loop, split out so main() can wrap it.
+    A state without a history store (e.g. a replayed session) still
+    runs; [H] and [A] just say there is nothing archived.
+    """
+    state = state or STATE
+    io = METRICS.wrap_io(io or CONSOLE)
 
     while True:
-        print("\n  MAIN MENU")
-        print("  ---------")
-        print("    [T] Track today's habits")
-        print("    [S] View today's summary")
-        print("    [R] Reset all entries (new day)")
-        print("    [Q] Quit")
+        with screen(stream=io) as out:
+            out.write(_main_menu_text())
 
-        choice = input("\n  Choice: ").strip().lower()
+        choice = io.input("\n  Choice: ").strip().lower()
+        started = METRICS.start()
 
         if choice == "t":
             # --- TRACK ---
-            run_tracker()
+            run_tracker(state, io)
 
         elif choice == "s":
             # --- SUMMARY ---
             # Lets user review progress without going through full tracking flow
-            show_summary()
+            show_summary(state, stream=io)
+
+        elif choice in ("h", "a") and state.history is None:
+            io.print("  ⚠  No history is kept in this session.")
+
+        elif choice == "h":
+            # --- HISTORY ---
+            show_history(state=state, stream=io)
+
+        elif choice == "a":
+            # --- ANALYTICS ---
+            show_analytics(analyze_all(state.history, state.habits, TIME_SLOTS), state.habits, io)
 
         elif choice == "r":
             # --- RESET ---
             # Ask for confirmation before wiping — destructive action
-            print("\n  ⚠  This will clear ALL entries for all habits.")
-            confirm = input("  Are you sure? (yes / no): ").strip().lower()
+            io.print("\n  ⚠  This will archive today's entries to history and clear them.")
+            confirm = io.input("  Are you sure? (yes / no): ").strip().lower()
 
             if confirm in ("yes", "y"):
-                clear_all_entries()
+                archived = archive_day(state=state)
+                io.print(f"\n  📅 Archived {archived} entries to history.")
+                clear_all_entries(state, io)
             else:
-                print("  Reset cancelled.")
+                io.print("  Reset cancelled.")
 
         elif choice == "q":
             # --- QUIT ---
-            print("\n  Goodbye! Stay healthy. 👋")
+            io.print("\n  Goodbye! Stay healthy. 👋")
+            METRICS.stop("tracker_command_seconds", started, "q")
             break
 
         else:
-            print("  ⚠  Please enter T, S, R, or Q.")
+            io.print("  ⚠  Please enter T, S, H, A, R, or Q.")
+
+        METRICS.stop("tracker_command_seconds", started,
+                     choice if choice in _MAIN_MENU_KEYS else "invalid")
 
 
 # --- Entry point ---
@@ -0,0 +1,270 @@
+# ============================================================
+# Metrics — opt-in timing and counters for the tracker and game
+# Features: per-command timers that leave out the time spent
+# waiting for the user, counters, sampled timing of expensive
+# reports, and export as Prometheus text or a JSON snapshot.
+# ============================================================
+#
+# Everything goes through the one METRICS object. It starts
+# disabled, and while it is, every call returns at the first line —
+# an attribute check — so the instrumented code runs at the same
+# speed as before. `--metrics FILE` on the apps turns it on and
+# writes FILE on exit.
+#
+# Each module describes its metrics once, at import:
+#
+#     METRICS.describe("tracker_command_seconds", "Main-menu command handling time", "command")
+#
+# and at a dispatch site:
+#
+#     started = METRICS.start()
+#     ...handle the command...
+#     METRICS.stop("tracker_command_seconds", started, "s")
+#
+# A command such as [T]rack asks more questions while it runs. The
+# IO returned by METRICS.wrap_io() adds up the time spent inside
+# input(), and stop() subtracts whatever of it fell within the
+# command, so a timer shows the program's own time, not the user's.
+#
+# Expensive reports are timed on a sample of calls only:
+#
+#     @METRICS.sampled("tracker_summary_seconds")
+#     def show_summary(...): ...
+#
+# Export:
+#     METRICS.write("metrics.prom")     # Prometheus text format
+#     METRICS.write("metrics.json")     # JSON snapshot
+
+import json
+import os
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from console import ConsoleIO
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005,
+           0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+DEFAULT_SAMPLE_EVERY = 10
+
+
+class _Timer:
+    """count / sum / max plus a histogram over BUCKETS (last slot = +Inf)."""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count   = 0
+        self.total   = 0.0
+        self.max     = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+
+class MeteredIO(ConsoleIO):
+    """Passes everything through to `io`, adding up the time spent waiting in input()."""
+
+    def __init__(self, io: ConsoleIO, metrics: "Metrics") -> None:
+        self.io = io
+        self.metrics = metrics
+
+    def input(self, prompt: str = "") -> str:
+        started = time.perf_counter()
+        try:
+            return self.io.input(prompt)
+        finally:
+            self.metrics.waited += time.perf_counter() - started
+            self.metrics.inputs += 1
+
+    def write(self, text: str) -> None:
+        self.io.write(text)
+
+    def flush(self) -> None:
+        self.io.flush()
+
+    def __getattr__(self, name):
+        # e.g. ScriptedIO.transcript() still works through the wrapper
+        return getattr(self.io, name)
+
+
+class Metrics:
+    """Counters and timers, keyed by (metric name, label). Off until enable() is called."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.sample_every = DEFAULT_SAMPLE_EVERY
+        self.descriptions: dict[str, tuple[str, str]] = {}
+        self.reset()
+
+    def describe(self, name: str, help_text: str, label_key: str = "label") -> None:
+        """Help text for the export, and the name of the label the metric is broken down by."""
+        self.descriptions[name] = (help_text, label_key)
+
+    def reset(self) -> None:
+        self.counters: dict[tuple[str, str], int] = {}
+        self.timers: dict[tuple[str, str], _Timer] = {}
+        self._calls: dict[str, int] = {}
+        self.waited = 0.0       # seconds spent inside input() on a MeteredIO
+        self.inputs = 0
+        self.started_at = time.time()
+
+    def enable(self, sample_every: int = DEFAULT_SAMPLE_EVERY) -> None:
+        self.enabled = True
+        self.sample_every = max(1, sample_every)
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    # --------------------------------------------------------
+    # RECORDING
+    # --------------------------------------------------------
+
+    def count(self, name: str, label: str = "", amount: int = 1) -> None:
+        if not self.enabled:
+            return
+        key = (name, label)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def start(self) -> tuple[float, float] | None:
+        """A token for stop(), or None while disabled."""
+        if not self.enabled:
+            return None
+        return time.perf_counter(), self.waited
+
+    def stop(self, name: str, started: tuple[float, float] | None, label: str = "") -> None:
+        """Records the time since start(), minus any time spent waiting for input."""
+        if started is None:
+            return
+        began, waited = started
+        seconds = time.perf_counter() - began - (self.waited - waited)
+        timer = self.timers.get((name, label))
+        if timer is None:
+            timer = self.timers[(name, label)] = _Timer()
+        timer.observe(max(seconds, 0.0))
+
+    def sampled(self, name: str):
+        """
+        Decorator: times one in every `sample_every` calls of the
+        function under `name` (the first call is always timed). The
+        `name` + "_calls_total" counter counts every call.
+        """
+        calls_name = name.removesuffix("_seconds") + "_calls_total"
+        if name in self.descriptions and calls_name not in self.descriptions:
+            self.describe(calls_name, f"Calls, timed or not, behind {name}")
+
+        def decorate(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                calls = self._calls[name] = self._calls.get(name, 0) + 1
+                self.count(calls_name)
+                if (calls - 1) % self.sample_every:
+                    return function(*args, **kwargs)
+                started = self.start()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.stop(name, started)
+            return wrapper
+        return decorate
+
+    def wrap_io(self, io: ConsoleIO) -> ConsoleIO:
+        """`io`, wrapped so input() waits are left out of timers (unchanged while disabled)."""
+        if not self.enabled or isinstance(io, MeteredIO):
+            return io
+        return MeteredIO(io, self)
+
+    # --------------------------------------------------------
+    # EXPORT
+    # --------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        """Every counter and timer as a plain dict."""
+        counters: dict[str, dict[str, int]] = {}
+        for (name, label), value in sorted(self.counters.items()):
+            counters.setdefault(name, {})[label] = value
+        timers: dict[str, dict[str, dict]] = {}
+        for (name, label), timer in sorted(self.timers.items()):
+            timers.setdefault(name, {})[label] = {
+                "count": timer.count,
+                "sum": timer.total,
+                "mean": timer.total / timer.count,
+                "max": timer.max,
+            }
+        return {
+            "started_at": self.started_at,
+            "uptime_seconds": time.time() - self.started_at,
+            "sample_every": self.sample_every,
+            "input_wait_seconds": self.waited,
+            "inputs": self.inputs,
+            "counters": counters,
+            "timers": timers,
+        }
+
+    def prometheus_text(self) -> str:
+        """The Prometheus text exposition format (counters + histograms)."""
+        lines = [
+            "# TYPE io_input_wait_seconds_total counter",
+            f"io_input_wait_seconds_total {self.waited!r}",
+            "# TYPE io_inputs_total counter",
+            f"io_inputs_total {self.inputs}",
+        ]
+
+        typed = set()
+
+        def header(name: str, kind: str) -> None:
+            if name in typed:
+                return
+            typed.add(name)
+            help_text = self.descriptions.get(name, ("", ""))[0]
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for (name, label), value in sorted(self.counters.items()):
+            header(name, "counter")
+            lines.append(f"{name}{self._labels(name, label)} {value}")
+
+        for (name, label), timer in sorted(self.timers.items()):
+            header(name, "histogram")
+            running = 0
+            for bound, hits in zip((*BUCKETS, "+Inf"), timer.buckets):
+                running += hits
+                lines.append(f"{name}_bucket{self._labels(name, label, bound)} {running}")
+            lines.append(f"{name}_sum{self._labels(name, label)} {timer.total!r}")
+            lines.append(f"{name}_count{self._labels(name, label)} {timer.count}")
+        return "\n".join(lines) + "\n"
+
+    def _labels(self, name: str, label: str, le=None) -> str:
+        """'{command="s",le="0.001"}' — or "" for an unlabelled, unbucketed line."""
+        parts = []
+        if label:
+            key = self.descriptions.get(name, ("", "label"))[1]
+            escaped = label.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            parts.append(f'{key}="{escaped}"')
+        if le is not None:
+            parts.append(f'le="{le}"')
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def write(self, path: str) -> None:
+        """Writes a .json snapshot or (any other name) Prometheus text, atomically."""
+        if path.endswith(".json"):
+            text = json.dumps(self.snapshot(), indent=2) + "\n"
+        else:
+            text = self.prometheus_text()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+METRICS = Metrics()
@@ -1,44 +1,828 @@
+# ============================================================
 # Personal Budget Tracker
-print("Welcome to your friendly Personal Budget Tracker !!")
+# Features: today's income / expenses / rent against a daily
+# saving goal, and a streaming ledger that evaluates the goal
+# across years of transactions in one pass.
+# ============================================================
+#
+# Every amount is a transaction with four fields:
+#
+#   date      — ISO day, e.g. "2026-10-17"
+#   category  — "income" adds to the day; everything else ("rent",
+#               "expenses", "food", ...) is money spent
+#   amount    — rupees, 0 or more, at most 2 decimal places
+#               ("1,250.50" and "₹99" are fine too)
+#   note      — free text (optional)
+#
+# CSV files need a header row with those column names; JSONL files
+# hold one {"date": ..., "category": ..., ...} object per line.
+#
+# Money is never a float here. Amounts are parsed with Decimal into
+# whole paise (₹1.50 -> 150) and kept as ints — in array("q") columns
+# in a TransactionStore — so every total is exact and the goal check
+# compares integers. rupees() turns paise back into "1.50" for display
+# (and JSON) only.
+#
+# The Ledger only keeps running totals: the day being read, the month
+# being read and the whole history so far. When the date moves on,
+# the finished day is checked against daily_saving_goal and folded
+# into its month — so memory use is the same for one day or ten
+# years. Files must be in date order (as bank / app exports are);
+# a row dated before the day being read is rejected.
+#
+# Usage:
+#     python personalbudgettracker.py                          # today, interactively
+#     python personalbudgettracker.py ledger.csv --goal 500    # monthly report
+#     python personalbudgettracker.py 2025.csv 2026.jsonl --goal 500 --days
+#     python personalbudgettracker.py ledger.csv --category rent --from 2026-04-01 --to 2026-06-30
+#     python personalbudgettracker.py ledger.csv --goal 500 --from 2026-01-01 --outcome missed
 
-# Step 1: Ask user for daily income
-income = float(input("Enter your total income for today: ₹"))
+import argparse
+import csv
+import json
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+from typing import NamedTuple
 
-# Step 2: Ask user for daily expenses
-expenses = float(input("Enter your total expenses for today: ₹"))
+from console import CONSOLE, ConsoleIO, Screen, screen, write_json
 
-# Step 3: Ask user for rent expense
-rent_expense = float(input("What is your expense for rent today: ₹"))
+FIELDS = ("date", "category", "amount", "note")
 
-# Optional note
-optional_note = input("Anything that you would like to tell as an optional note: ")
+INCOME   = "income"
+RENT     = "rent"
+EXPENSES = "expenses"
 
-# Saving goal
-daily_saving_goal = float(input("Enter your daily saving goal: ₹"))
+# Largest amount an array("q") column can hold, in paise
+MAX_PAISE = 2 ** 63 - 1
+_CENT = Decimal("0.01")
 
-# Step 4: Calculate net savings
-net_savings = income - expenses - rent_expense
+# How a day did against the saving goal
+MISSED, MET, EXCEEDED = range(3)
+OUTCOME_NAMES = ("missed", "met", "exceeded")
 
-# Step 5: Print results
-print("\n----- Daily Budget Summary -----")
 
-print(f"Total Income: ₹{income:.2f}")
-print(f"Total Expenses: ₹{expenses:.2f}")
-print(f"Rent Expense: ₹{rent_expense:.2f}")
-print(f"Net Savings: ₹{net_savings:.2f}")
+class Transaction(NamedTuple):
+    day: date
+    category: str
+    amount: int         # paise
+    note: str = ""
 
-print(f"\nToday you earned ₹{income:.2f} and spent ₹{expenses:.2f} "
-      f"plus rent of ₹{rent_expense:.2f}.")
-print(f"Your note: {optional_note}")
 
-print(f"\nYour daily saving goal was: ₹{daily_saving_goal:.2f}")
+# Every amount in the summaries below is in paise
+class DaySummary(NamedTuple):
+    day: date
+    income: int
+    expenses: int       # everything that isn't income or rent
+    rent: int
+    net: int
+    outcome: int        # MISSED / MET / EXCEEDED
 
-# Intelligent Goal Analysis
-if net_savings > daily_saving_goal:
-    print(f"🎉 Excellent! You exceeded your goal by ₹{net_savings - daily_saving_goal:.2f}")
 
-elif net_savings == daily_saving_goal:
-    print("✅ Perfect! You achieved your saving goal exactly!")
+class MonthSummary(NamedTuple):
+    month: str          # "2026-10"
+    days: int           # days with at least one transaction
+    income: int
+    expenses: int
+    rent: int
+    net: int
+    outcomes: tuple[int, int, int]      # days missed / met / exceeded
 
-else:
-    print(f"⚠️ You missed your goal by ₹{daily_saving_goal - net_savings:.2f}")
+
+# ------------------------------------------------------------
+# MONEY — integer paise in, "₹x.xx" out
+# ------------------------------------------------------------
+
+def parse_paise(raw) -> int:
+    """
+    "1,250.50" -> 125050. Parsed as a Decimal, so "0.1" is exactly 10
+    paise. Raises ValueError for anything that isn't a whole number of
+    paise between 0 and MAX_PAISE.
+    """
+    text = str(raw).strip()
+    whole, dot, fraction = text.partition(".")
+    if whole.isdecimal() and len(fraction) <= 2 and (fraction.isdecimal() or not fraction) \
+            and len(whole) < 17:
+        # Plain "1250" / "1250.5" / "1250.50" — the usual export format —
+        # is read as two ints: same exact result as Decimal, ~4x faster
+        return int(whole) * 100 + int(fraction.ljust(2, "0"))
+
+    text = text.lstrip("₹").replace(",", "").strip()
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        raise ValueError("invalid amount") from None
+    if not amount.is_finite():
+        raise ValueError("invalid amount")
+    # Both checks before any arithmetic: "1e999999999" would overflow
+    # Decimal's context and "1.0000...0001" would round to 28 digits
+    if amount.adjusted() > 17:
+        raise ValueError("amount must be 0 or more" if amount < 0 else "amount too large")
+    if amount != amount.quantize(_CENT):
+        raise ValueError("amount has more than 2 decimal places")
+    paise = amount * 100
+    if not 0 <= paise <= MAX_PAISE:
+        raise ValueError("amount must be 0 or more" if paise < 0 else "amount too large")
+    return int(paise)
+
+
+def rupees(paise: int) -> str:
+    """125050 -> "1250.50", -5 -> "-0.05". The ₹ is left to the caller's f-string."""
+    sign = "-" if paise < 0 else ""
+    whole, fraction = divmod(abs(paise), 100)
+    return f"{sign}{whole}.{fraction:02d}"
+
+
+def goal_outcome(net_savings: int, daily_saving_goal: int) -> int:
+    """MISSED, MET or EXCEEDED — the same three cases the daily summary prints."""
+    if net_savings > daily_saving_goal:
+        return EXCEEDED
+    if net_savings == daily_saving_goal:     # ints, so "exactly" really means exactly
+        return MET
+    return MISSED
+
+
+_MONEY_FIELDS = ("income", "expenses", "rent", "net")
+
+
+def _json_ready(summary: DaySummary | MonthSummary) -> dict:
+    """A summary as a dict with its amounts written as exact "1250.50" strings."""
+    data = summary._asdict()
+    for name in _MONEY_FIELDS:
+        data[name] = rupees(data[name])
+    return data
+
+
+# ------------------------------------------------------------
+# READERS — yield Transactions, one row at a time
+# ------------------------------------------------------------
+
+@dataclass
+class ReadReport:
+    rows: int = 0
+    rejected: int = 0
+    reasons: dict[str, int] = field(default_factory=dict)
+
+    def reject(self, reason: str) -> None:
+        self.rejected += 1
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+
+@lru_cache(maxsize=4096)
+def _parse_day(text: str) -> date:
+    # A file repeats each date for every transaction that day
+    return date.fromisoformat(text.strip())
+
+
+def parse_transaction(raw_date, raw_category, raw_amount, raw_note=None) -> Transaction:
+    """Builds a Transaction from raw field values. Raises ValueError if one is unusable."""
+    try:
+        day = _parse_day(str(raw_date))
+    except ValueError:
+        raise ValueError("invalid date") from None
+    category = str(raw_category or "").strip().lower()
+    if not category:
+        raise ValueError("missing category")
+    return Transaction(day, category, parse_paise(raw_amount), "" if raw_note is None else str(raw_note))
+
+
+def _read_csv(f):
+    reader = csv.reader(f)
+    header = [name.strip().lower() for name in next(reader, [])]
+    missing = [name for name in FIELDS[:3] if name not in header]
+    if missing:
+        raise ValueError(f"CSV header is missing column(s): {', '.join(missing)}")
+    columns = [header.index(name) for name in FIELDS if name in header]
+    pick = itemgetter(*columns)
+    width = max(columns) + 1
+    for row in reader:
+        yield pick(row) if len(row) >= width else (None, None, None)
+
+
+# Stands in for a JSONL line that isn't a {...} object (or isn't JSON at
+# all); read_transactions() rejects it by identity
+_NOT_AN_OBJECT = (None, None, None)
+
+
+def _read_jsonl(f):
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            # parse_float=Decimal: 12.10 stays 12.10, never 12.0999999...
+            row = json.loads(line, parse_float=Decimal)
+        except ValueError:
+            # JSONDecodeError, or an integer too long for int() to parse
+            yield _NOT_AN_OBJECT
+            continue
+        if not isinstance(row, dict):
+            yield _NOT_AN_OBJECT
+            continue
+        yield row.get("date"), row.get("category"), row.get("amount"), row.get("note")
+
+
+def read_transactions(path: str, report: ReadReport | None = None):
+    """
+    Yields the Transactions in one .csv or .jsonl file (picked by
+    extension). Unusable rows are counted in `report` and skipped;
+    without a report they raise ValueError.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = _read_jsonl(f) if path.endswith((".jsonl", ".ndjson")) else _read_csv(f)
+        for number, row in enumerate(rows, start=1):
+            if report is not None:
+                report.rows += 1
+            try:
+                if row is _NOT_AN_OBJECT:
+                    raise ValueError("not a JSON object")
+                yield parse_transaction(*row)
+            except ValueError as error:
+                if report is None:
+                    raise ValueError(f"{path}:{number}: {error}") from None
+                report.reject(str(error))
+
+
+# ------------------------------------------------------------
+# THE LEDGER — running balances, constant memory
+# ------------------------------------------------------------
+
+class Ledger:
+    """
+    Folds a date-ordered stream of Transactions into per-day,
+    per-month and whole-history totals.
+
+        ledger = Ledger(daily_saving_goal=500, on_month=print)
+        ledger.feed(read_transactions("2026.csv"))
+        ledger.close()                  # finishes the last day / month
+        ledger.outcomes                 # [days missed, met, exceeded]
+
+    on_day / on_month are called with each DaySummary / MonthSummary
+    as soon as it is complete, so a caller can stream a report out
+    while the file is still being read. on_transaction is called with
+    each transaction the ledger accepts (never an out-of-order one).
+    """
+
+    def __init__(self, daily_saving_goal: int = 0, on_day=None, on_month=None,
+                 on_transaction=None) -> None:
+        self.goal     = daily_saving_goal
+        self.on_day   = on_day
+        self.on_month = on_month
+        self.on_transaction = on_transaction
+
+        # The day being read: [income, expenses, rent] in paise
+        self._day: date | None = None
+        self._day_totals = [0, 0, 0]
+
+        # The month being read: [income, expenses, rent, net] + day counts
+        self._month: tuple[int, int] | None = None
+        self._month_totals = [0, 0, 0, 0]
+        self._month_outcomes = [0, 0, 0]
+
+        # The whole history so far
+        self.transactions = 0
+        self.days         = 0
+        self.income       = 0
+        self.expenses     = 0
+        self.rent         = 0
+        self.balance      = 0           # sum of every day's net savings
+        self.outcomes     = [0, 0, 0]   # days missed / met / exceeded
+        self.shortfall    = 0           # total by which missed days fell short
+        self.streak       = 0           # days in a row the goal was reached (met or exceeded)
+        self.longest_streak = 0
+        self.best:  DaySummary | None = None
+        self.worst: DaySummary | None = None
+
+    def add(self, transaction: Transaction) -> None:
+        """Adds one transaction. Raises ValueError if it is dated before the current day."""
+        day = transaction.day
+        if day != self._day:
+            if self._day is not None and day < self._day:
+                raise ValueError("transaction out of date order")
+            self._close_day()
+            self._day = day
+
+        totals = self._day_totals
+        if transaction.category == INCOME:
+            totals[0] += transaction.amount
+        elif transaction.category == RENT:
+            totals[2] += transaction.amount
+        else:
+            totals[1] += transaction.amount
+        self.transactions += 1
+        if self.on_transaction is not None:
+            self.on_transaction(transaction)
+
+    def feed(self, transactions, report: ReadReport | None = None) -> "Ledger":
+        """Adds every transaction; out-of-order ones are counted in `report` (or raise)."""
+        add = self.add
+        for transaction in transactions:
+            try:
+                add(transaction)
+            except ValueError:
+                if report is None:
+                    raise
+                report.reject("out of date order")
+        return self
+
+    def close(self) -> None:
+        """Finishes the day and month being read (call once the stream ends)."""
+        self._close_day()
+        self._close_month()
+
+    def _close_day(self) -> None:
+        if self._day is None:
+            return
+        income, expenses, rent = self._day_totals
+        net = income - expenses - rent
+        outcome = goal_outcome(net, self.goal)
+        summary = DaySummary(self._day, income, expenses, rent, net, outcome)
+
+        key = (self._day.year, self._day.month)
+        if key != self._month:
+            self._close_month()
+            self._month = key
+        month = self._month_totals
+        month[0] += income
+        month[1] += expenses
+        month[2] += rent
+        month[3] += net
+        self._month_outcomes[outcome] += 1
+
+        self.days     += 1
+        self.income   += income
+        self.expenses += expenses
+        self.rent     += rent
+        self.balance  += net
+        self.outcomes[outcome] += 1
+        if outcome == MISSED:
+            self.shortfall += self.goal - net
+            self.streak = 0
+        else:
+            self.streak += 1
+            self.longest_streak = max(self.longest_streak, self.streak)
+        if self.best is None or net > self.best.net:
+            self.best = summary
+        if self.worst is None or net < self.worst.net:
+            self.worst = summary
+
+        self._day = None
+        self._day_totals = [0, 0, 0]
+        if self.on_day is not None:
+            self.on_day(summary)
+
+    def _close_month(self) -> None:
+        if self._month is None:
+            return
+        year, month = self._month
+        income, expenses, rent, net = self._month_totals
+        summary = MonthSummary(f"{year:04d}-{month:02d}", sum(self._month_outcomes),
+                               income, expenses, rent, net, tuple(self._month_outcomes))
+
+        self._month = None
+        self._month_totals = [0, 0, 0, 0]
+        self._month_outcomes = [0, 0, 0]
+        if self.on_month is not None:
+            self.on_month(summary)
+
+    def summary_data(self) -> dict:
+        """The whole-history numbers, as a plain dict (for JSON mode; amounts as "x.xx" strings)."""
+        return {
+            "transactions": self.transactions,
+            "days": self.days,
+            "income": rupees(self.income),
+            "expenses": rupees(self.expenses),
+            "rent": rupees(self.rent),
+            "net_savings": rupees(self.balance),
+            "daily_saving_goal": rupees(self.goal),
+            **{f"days_{name}": count for name, count in zip(OUTCOME_NAMES, self.outcomes)},
+            "shortfall": rupees(self.shortfall),
+            "current_streak": self.streak,
+            "longest_streak": self.longest_streak,
+            "best_day": self.best and _json_ready(self.best),
+            "worst_day": self.worst and _json_ready(self.worst),
+        }
+
+
+# ------------------------------------------------------------
+# THE STORE — every transaction, column by column
+# ------------------------------------------------------------
+
+class _DayIndex:
+    """
+    Row numbers kept sorted by day: `keys` holds the day ordinals,
+    `rows` the matching row numbers. Rows that arrive in date order are
+    appended; an older one is slotted in with bisect + array.insert.
+    """
+
+    __slots__ = ("keys", "rows")
+
+    def __init__(self) -> None:
+        self.keys = array("l")
+        self.rows = array("Q")
+
+    def insert(self, key: int, row: int) -> None:
+        keys = self.keys
+        if not keys or key >= keys[-1]:
+            keys.append(key)
+            self.rows.append(row)
+        else:
+            at = bisect_right(keys, key)
+            keys.insert(at, key)
+            self.rows.insert(at, row)
+
+    def span(self, start: int, stop: int) -> tuple[int, int]:
+        """Positions [low, high) of the keys within start..stop (inclusive)."""
+        return bisect_left(self.keys, start), bisect_right(self.keys, stop)
+
+
+class TransactionStore:
+    """
+    Keeps transactions in memory as parallel typed columns, for when
+    the whole history is needed at once rather than streamed:
+
+        days        array("l")  date.toordinal()
+        categories  array("H")  index into category_names
+        amounts     array("q")  paise — 8 bytes each, no float anywhere
+        notes       list[str]
+
+    Totals are sum() over the amounts column: one C loop over int64s
+    that yields an exact Python int, however many rows there are.
+
+    Secondary indexes are updated by every append(), so queries never
+    scan the whole store:
+
+        by date      all rows, sorted by day             (_DayIndex)
+        by category  each category's rows, sorted by day (_DayIndex each)
+        by outcome   each day's net savings, and the days that missed /
+                     met / exceeded daily_saving_goal, sorted
+
+    "Rent in Q2" is two binary searches in the rent index plus a sum
+    over the k rows between them — O(log n + k) — and "days missed this
+    year" is the same in the missed-days list.
+    """
+
+    def __init__(self, transactions=(), daily_saving_goal: int = 0) -> None:
+        self.days       = array("l")
+        self.categories = array("H")
+        self.amounts    = array("q")
+        self.notes: list[str] = []
+        self.category_names: list[str] = []
+        self._category_codes: dict[str, int] = {}
+        self.goal = daily_saving_goal
+
+        self._by_date = _DayIndex()
+        self._by_category: list[_DayIndex] = []
+        self._day_net: dict[int, int] = {}
+        self._by_outcome = (array("l"), array("l"), array("l"))    # MISSED, MET, EXCEEDED
+        self.extend(transactions)
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def _code(self, category: str) -> int:
+        code = self._category_codes.get(category)
+        if code is None:
+            code = self._category_codes[category] = len(self.category_names)
+            self.category_names.append(category)
+            self._by_category.append(_DayIndex())
+        return code
+
+    def append(self, transaction: Transaction) -> int:
+        """Adds one transaction (any date order) and returns its row number."""
+        row = len(self.amounts)
+        day = transaction.day.toordinal()
+        code = self._code(transaction.category)
+        self.days.append(day)
+        self.categories.append(code)
+        self.amounts.append(transaction.amount)
+        self.notes.append(transaction.note)
+
+        self._by_date.insert(day, row)
+        self._by_category[code].insert(day, row)
+
+        change = transaction.amount if transaction.category == INCOME else -transaction.amount
+        before = self._day_net.get(day)
+        after = self._day_net[day] = (before or 0) + change
+        self._move_day(day, None if before is None else goal_outcome(before, self.goal),
+                       goal_outcome(after, self.goal))
+        return row
+
+    def _move_day(self, day: int, old: int | None, new: int) -> None:
+        """Moves a day from one outcome list to another (old=None: a new day)."""
+        if old == new:
+            return
+        if old is not None:
+            days = self._by_outcome[old]
+            del days[bisect_left(days, day)]
+        days = self._by_outcome[new]
+        if not days or day > days[-1]:
+            days.append(day)
+        else:
+            days.insert(bisect_left(days, day), day)
+
+    def extend(self, transactions) -> int:
+        """Adds every transaction (a stream is fine). Returns how many were added."""
+        before = len(self.amounts)
+        for transaction in transactions:
+            self.append(transaction)
+        return len(self.amounts) - before
+
+    def set_goal(self, daily_saving_goal: int) -> None:
+        """Changes the goal and re-sorts every day into the outcome lists (O(days))."""
+        self.goal = daily_saving_goal
+        outcomes = ([], [], [])
+        for day in sorted(self._day_net):
+            outcomes[goal_outcome(self._day_net[day], daily_saving_goal)].append(day)
+        self._by_outcome = tuple(array("l", days) for days in outcomes)
+
+    def __getitem__(self, row: int) -> Transaction:
+        return Transaction(date.fromordinal(self.days[row]),
+                           self.category_names[self.categories[row]],
+                           self.amounts[row], self.notes[row])
+
+    def __iter__(self):
+        """Every transaction in date order (same-day ones in the order added)."""
+        for row in self._by_date.rows:
+            yield self[row]
+
+    # --------------------------------------------------------
+    # QUERIES — start / stop are inclusive dates; None = open-ended
+    # --------------------------------------------------------
+
+    def rows(self, category: str | None = None, start: date | None = None,
+             stop: date | None = None) -> array:
+        """Row numbers (in date order) of one category's — or all — transactions in the range."""
+        if category is None:
+            index = self._by_date
+        else:
+            code = self._category_codes.get(category)
+            if code is None:
+                return array("Q")
+            index = self._by_category[code]
+        low, high = index.span(start.toordinal() if start else -2 ** 31,
+                               stop.toordinal() if stop else 2 ** 31 - 1)
+        return index.rows[low:high]
+
+    def total(self, category: str | None = None, start: date | None = None,
+              stop: date | None = None) -> int:
+        """Sum in paise — exact — of one category's (or every) amount in the range."""
+        if category is None and start is None and stop is None:
+            return sum(self.amounts)
+        amounts = self.amounts
+        return sum([amounts[row] for row in self.rows(category, start, stop)])
+
+    def days_with(self, outcome: int, start: date | None = None,
+                  stop: date | None = None) -> list[date]:
+        """The days in the range whose net savings MISSED / MET / EXCEEDED the goal."""
+        days = self._by_outcome[outcome]
+        low = bisect_left(days, start.toordinal()) if start else 0
+        high = bisect_right(days, stop.toordinal()) if stop else len(days)
+        return [date.fromordinal(day) for day in days[low:high]]
+
+    def day_net(self, day: date) -> int | None:
+        """Net savings (paise) on `day`, or None if nothing was recorded then."""
+        return self._day_net.get(day.toordinal())
+
+    def totals_by_category(self) -> dict[str, int]:
+        """{category: total paise} in one pass over the columns."""
+        totals = [0] * len(self.category_names)
+        for code, amount in zip(self.categories, self.amounts):
+            totals[code] += amount
+        return dict(zip(self.category_names, totals))
+
+
+# ------------------------------------------------------------
+# TODAY — the interactive flow
+# ------------------------------------------------------------
+
+def ask_amount(prompt: str, io: ConsoleIO | None = None) -> int:
+    """Prompts until the user enters an amount of 0 or more. Returns it in paise."""
+    io = io or CONSOLE
+    while True:
+        try:
+            return parse_paise(io.input(prompt))
+        except ValueError as error:
+            io.print(f"  ⚠  {str(error).capitalize()} — enter rupees, e.g. 250 or 99.50.")
+
+
+def show_daily_summary(day: DaySummary, goal: int, note: str, io: ConsoleIO | None = None) -> None:
+    """The daily report: totals, note, and how the day did against the goal."""
+    with screen(stream=io or CONSOLE) as out:
+        out.line("\n----- Daily Budget Summary -----")
+
+        out.line(f"Total Income: ₹{rupees(day.income)}")
+        out.line(f"Total Expenses: ₹{rupees(day.expenses)}")
+        out.line(f"Rent Expense: ₹{rupees(day.rent)}")
+        out.line(f"Net Savings: ₹{rupees(day.net)}")
+
+        out.line(f"\nToday you earned ₹{rupees(day.income)} and spent ₹{rupees(day.expenses)} "
+                 f"plus rent of ₹{rupees(day.rent)}.")
+        out.line(f"Your note: {note}")
+
+        out.line(f"\nYour daily saving goal was: ₹{rupees(goal)}")
+
+        # Intelligent Goal Analysis
+        if day.outcome == EXCEEDED:
+            out.line(f"🎉 Excellent! You exceeded your goal by ₹{rupees(day.net - goal)}")
+        elif day.outcome == MET:
+            out.line("✅ Perfect! You achieved your saving goal exactly!")
+        else:
+            out.line(f"⚠️ You missed your goal by ₹{rupees(goal - day.net)}")
+
+
+def run_daily(io: ConsoleIO | None = None) -> DaySummary:
+    """
+    Asks for today's income, expenses, rent, a note and the saving
+    goal, runs them through a Ledger and prints the daily summary.
+    """
+    io = io or CONSOLE
+    io.print("Welcome to your friendly Personal Budget Tracker !!")
+
+    today = date.today()
+    income        = ask_amount("Enter your total income for today: ₹", io)
+    expenses      = ask_amount("Enter your total expenses for today: ₹", io)
+    rent_expense  = ask_amount("What is your expense for rent today: ₹", io)
+    optional_note = io.input("Anything that you would like to tell as an optional note: ")
+    daily_saving_goal = ask_amount("Enter your daily saving goal: ₹", io)
+
+    days: list[DaySummary] = []
+    ledger = Ledger(daily_saving_goal, on_day=days.append)
+    ledger.feed([
+        Transaction(today, INCOME, income, optional_note),
+        Transaction(today, EXPENSES, expenses),
+        Transaction(today, RENT, rent_expense),
+    ])
+    ledger.close()
+
+    show_daily_summary(days[0], daily_saving_goal, optional_note, io)
+    return days[0]
+
+
+# ------------------------------------------------------------
+# HISTORY REPORT
+# ------------------------------------------------------------
+
+def show_month(month: MonthSummary, out: Screen | None = None) -> None:
+    missed, met, exceeded = month.outcomes
+    with screen(out) as out:
+        out.line(f"  {month.month}  {month.days:>2} days  in ₹{rupees(month.income):>12}"
+                 f"  out ₹{rupees(month.expenses + month.rent):>12}  net ₹{rupees(month.net):>12}"
+                 f"  goal ✅ {met + exceeded:>2} ❌ {missed:>2}")
+
+
+def show_day(day: DaySummary, out: Screen | None = None) -> None:
+    mark = "❌" if day.outcome == MISSED else "✅"
+    with screen(out) as out:
+        out.line(f"    {day.day:%a %d %b %Y}  {mark} net ₹{rupees(day.net)}")
+
+
+def show_ledger(ledger: Ledger, report: ReadReport, out: Screen | None = None) -> None:
+    """The footer after every month has been printed: the whole history against the goal."""
+    missed, met, exceeded = ledger.outcomes
+    with screen(out) as out:
+        out.line("=" * 50)
+        out.line(f"  Days: {ledger.days}   Transactions: {ledger.transactions}"
+                 f"   Rows skipped: {report.rejected}")
+        out.line(f"  Income: ₹{rupees(ledger.income)}   Expenses: ₹{rupees(ledger.expenses)}"
+                 f"   Rent: ₹{rupees(ledger.rent)}")
+        out.line(f"  Net Savings: ₹{rupees(ledger.balance)}")
+        out.line(f"\n  Daily saving goal: ₹{rupees(ledger.goal)}")
+        out.line(f"    🎉 exceeded {exceeded}   ✅ met {met}   ⚠️ missed {missed}"
+                 f" (short by ₹{rupees(ledger.shortfall)} in total)")
+        out.line(f"    Streak: {ledger.streak} days now, {ledger.longest_streak} at best")
+        if ledger.best is not None:
+            out.line(f"    Best day:  {ledger.best.day}  ₹{rupees(ledger.best.net)}")
+            out.line(f"    Worst day: {ledger.worst.day}  ₹{rupees(ledger.worst.net)}")
+        for reason, count in sorted(report.reasons.items(), key=lambda item: -item[1]):
+            out.line(f"    skipped — {reason}: {count}")
+        out.line("=" * 50)
+
+
+def run_ledger(paths: list[str], goal: int, show_days: bool = False,
+               as_json: bool = False, stream=None) -> Ledger:
+    """
+    Streams every file through one Ledger, printing each month (and
+    with show_days, each day) as soon as it is complete.
+    """
+    report = ReadReport()
+    if as_json:
+        on_month = lambda month: write_json({"month": _json_ready(month)}, stream)
+        on_day = lambda day: write_json({"day": _json_ready(day)}, stream)
+    else:
+        on_month = lambda month: _flush(show_month, month, stream)
+        on_day = lambda day: _flush(show_day, day, stream)
+
+    ledger = Ledger(goal, on_day=on_day if show_days else None, on_month=on_month)
+    if not as_json:
+        with screen(stream=stream) as out:
+            out.line("\n" + "=" * 50)
+            out.line("           📒 Budget Ledger")
+            out.line("=" * 50)
+
+    ledger.feed(chain.from_iterable(read_transactions(path, report) for path in paths), report)
+    ledger.close()
+
+    if as_json:
+        write_json({"summary": ledger.summary_data(), "rows": report.rows,
+                    "rejected": report.rejected, "reasons": report.reasons}, stream)
+    else:
+        with screen(stream=stream) as out:
+            show_ledger(ledger, report, out)
+    return ledger
+
+
+def run_query(paths: list[str], goal: int, category: str | None = None,
+              start: date | None = None, stop: date | None = None,
+              outcome: int | None = None, as_json: bool = False, stream=None,
+              limit: int = 31) -> TransactionStore:
+    """
+    Loads every file into an indexed TransactionStore (any date order)
+    and answers "how much did <category> cost between <start> and
+    <stop>" — plus, with `outcome`, which days in that range missed /
+    met / exceeded the goal.
+    """
+    report = ReadReport()
+    store = TransactionStore(chain.from_iterable(read_transactions(path, report) for path in paths), goal)
+    count = len(store.rows(category, start, stop))
+    total = store.total(category, start, stop)
+    days = store.days_with(outcome, start, stop) if outcome is not None else None
+
+    if as_json:
+        data = {"category": category, "from": start, "to": stop,
+                "total": rupees(total), "transactions": count, "rejected": report.rejected}
+        if days is not None:
+            data[f"days_{OUTCOME_NAMES[outcome]}"] = days
+        write_json(data, stream)
+        return store
+
+    with screen(stream=stream) as out:
+        span = f"{start or 'the start'} to {stop or 'the end'}"
+        out.line(f"\n  {category or 'All categories'}, {span}:"
+                 f" ₹{rupees(total)} in {count} transactions")
+        if days is not None:
+            out.line(f"  Days the ₹{rupees(goal)} goal was {OUTCOME_NAMES[outcome]}: {len(days)}")
+            for day in days[:limit]:
+                out.line(f"    {day:%a %d %b %Y}  net ₹{rupees(store.day_net(day))}")
+            if len(days) > limit:
+                out.line(f"    ... {len(days) - limit} more")
+    return store
+
+
+def _flush(show, item, stream) -> None:
+    """Draws one report line into its own Screen and writes it straight away."""
+    out = Screen()
+    show(item, out)
+    out.flush(stream)
+
+
+# ------------------------------------------------------------
+# COMMAND LINE
+# ------------------------------------------------------------
+
+def main(argv: list[str] | None = None, io: ConsoleIO | None = None) -> int:
+    """
+    With no files, asks about today (the original tracker). With
+    files, streams them through the ledger and prints a monthly report.
+    """
+    parser = argparse.ArgumentParser(description="Personal Budget Tracker")
+    parser.add_argument("files", nargs="*", help=".csv or .jsonl transaction files, in date order")
+    parser.add_argument("--goal", type=parse_paise, default=0, metavar="RUPEES",
+                        help="daily saving goal in ₹, e.g. 500 or 499.50 (default 0)")
+    parser.add_argument("--days", action="store_true", help="also print every day")
+    parser.add_argument("--json", action="store_true", help="JSON lines instead of a report")
+    query = parser.add_argument_group("queries (load the files into an indexed store)")
+    query.add_argument("--category", help="total for this category only, e.g. rent")
+    query.add_argument("--from", dest="start", type=date.fromisoformat, metavar="DATE",
+                       help="first day of the range, e.g. 2026-04-01")
+    query.add_argument("--to", dest="stop", type=date.fromisoformat, metavar="DATE",
+                       help="last day of the range, e.g. 2026-06-30")
+    query.add_argument("--outcome", choices=OUTCOME_NAMES,
+                       help="also list the days in the range that missed / met / exceeded the goal")
+    args = parser.parse_args(argv)
+
+    if not args.files:
+        run_daily(io)
+        return 0
+
+    try:
+        if args.category or args.start or args.stop or args.outcome:
+            outcome = OUTCOME_NAMES.index(args.outcome) if args.outcome else None
+            run_query(args.files, args.goal, args.category, args.start, args.stop,
+                      outcome, args.json, io)
+        else:
+            run_ledger(args.files, args.goal, args.days, args.json, io)
+    except (OSError, ValueError) as error:
+        print(f"  ⚠  {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+# --- Entry point ---
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+# ============================================================
+# Replay — run recorded sessions through the real apps, headless
+# Features: record a terminal session's inputs, replay thousands
+# of sessions per second in-process, optional process pool.
+# ============================================================
+#
+# A recording is a JSONL file, one session per line:
+#
+#   {"app": "escape", "inputs": ["2", "a", "n", "1", "a", "n", "3", "a"]}
+#   {"app": "habits", "inputs": ["t", "a", "2", "morning", "q", "q", "q", "q"]}
+#
+# Each session is played through escape_room.main() or the tracker's
+# run_main_menu() with a console.ScriptedIO in place of the terminal,
+# so it runs the same code a player does — no subprocess, no patched
+# builtins. Tracker sessions get a fresh in-memory HabitState (no
+# journal, no history files), so replays never touch habit_data/.
+#
+# A session "finishes" if the app reached its own end (quit / escape)
+# before the inputs ran out.
+#
+# Usage:
+#     python replay.py record escape sessions.jsonl     # play, and append your inputs
+#     python replay.py run sessions.jsonl               # replay every session
+#     python replay.py run sessions.jsonl --repeat 10000 --workers 4
+#     python replay.py run sessions.jsonl --show 3      # print session 3's transcript
+#     python replay.py run sessions.jsonl --repeat 1000 --metrics replay.prom
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import escape_room
+import healthyhabittracker as tracker
+from console import ConsoleIO, ScriptedIO
+from metrics import METRICS
+
+APPS = ("escape", "habits")
+
+# Sessions handed to a worker process at a time — big enough that the
+# pickling round-trip is small next to the work
+CHUNK = 500
+
+
+class Result(NamedTuple):
+    finished: bool      # the app ended on its own before the inputs ran out
+    escaped: bool       # escape sessions: the player got out
+    entries: int        # habits sessions: entries logged at the end
+
+
+# ------------------------------------------------------------
+# PLAYING ONE SESSION
+# ------------------------------------------------------------
+
+def play(app: str, inputs: list[str], world: escape_room.CompiledWorld = escape_room.GAME,
+         io: ScriptedIO | None = None) -> Result:
+    """Runs one recorded session. Pass `io` to keep its transcript."""
+    io = io or ScriptedIO(inputs, record=False)
+    escaped, entries = False, 0
+    finished = True
+
+    if app == "escape":
+        state = escape_room.PlayerState()
+        try:
+            state = escape_room.main(world, io)
+        except EOFError:
+            finished = False
+        escaped = state.escaped
+    elif app == "habits":
+        state = tracker.HabitState()
+        try:
+            tracker.run_main_menu(state, io)
+        except EOFError:
+            finished = False
+        entries = sum(len(config["entries"]) for config in state.habits.values())
+    else:
+        raise ValueError(f"unknown app {app!r} (expected one of {', '.join(APPS)})")
+
+    return Result(finished, escaped, entries)
+
+
+# ------------------------------------------------------------
+# RUNNING MANY
+# ------------------------------------------------------------
+
+class Totals(NamedTuple):
+    sessions: int
+    finished: int
+    escaped: int
+    entries: int
+
+
+def _add(a: Totals, b: Totals) -> Totals:
+    return Totals(*(x + y for x, y in zip(a, b)))
+
+
+def play_many(sessions: list[tuple[str, list[str]]],
+              world: escape_room.CompiledWorld = escape_room.GAME) -> Totals:
+    """Plays every (app, inputs) session in this process and adds up the results."""
+    finished = escaped = entries = 0
+    for app, inputs in sessions:
+        result = play(app, inputs, world)
+        finished += result.finished
+        escaped  += result.escaped
+        entries  += result.entries
+    return Totals(len(sessions), finished, escaped, entries)
+
+
+# Worker processes load the world once, not once per chunk
+_WORKER_WORLD = escape_room.GAME
+
+
+def _init_worker(world_path: str | None) -> None:
+    global _WORKER_WORLD
+    if world_path:
+        from escape_world import load_world
+        _WORKER_WORLD = load_world(world_path)
+
+
+def _play_chunk(sessions: list[tuple[str, list[str]]]) -> Totals:
+    return play_many(sessions, _WORKER_WORLD)
+
+
+def play_parallel(sessions: list[tuple[str, list[str]]], workers: int,
+                  world_path: str | None = None) -> Totals:
+    """Spreads the sessions over `workers` processes in chunks of CHUNK."""
+    chunks = [sessions[i:i + CHUNK] for i in range(0, len(sessions), CHUNK)]
+    totals = Totals(0, 0, 0, 0)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(world_path,)) as pool:
+        for part in pool.map(_play_chunk, chunks):
+            totals = _add(totals, part)
+    return totals
+
+
+# ------------------------------------------------------------
+# RECORDINGS
+# ------------------------------------------------------------
+
+def read_sessions(path: str) -> list[tuple[str, list[str]]]:
+    """Reads a JSONL recording into (app, inputs) pairs."""
+    sessions = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            app, inputs = record.get("app"), record.get("inputs")
+            if app not in APPS or not isinstance(inputs, list):
+                raise ValueError(f"{path}:{number}: expected {{\"app\": ..., \"inputs\": [...]}}")
+            sessions.append((app, [str(answer) for answer in inputs]))
+    return sessions
+
+
+class RecordingIO(ConsoleIO):
+    """The terminal, plus a list of every answer typed."""
+
+    def __init__(self) -> None:
+        self.inputs: list[str] = []
+
+    def input(self, prompt: str = "") -> str:
+        answer = super().input(prompt)
+        self.inputs.append(answer)
+        return answer
+
+
+def record(app: str, path: str, world: escape_room.CompiledWorld = escape_room.GAME) -> int:
+    """Plays `app` in the terminal and appends the session to `path`. Returns the input count."""
+    io = RecordingIO()
+    try:
+        if app == "escape":
+            escape_room.main(world, io)
+        else:
+            tracker.run_main_menu(tracker.HabitState(), io)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"app": app, "inputs": io.inputs}, ensure_ascii=False) + "\n")
+    return len(io.inputs)
+
+
+# ------------------------------------------------------------
+# COMMAND LINE
+# ------------------------------------------------------------
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Record and replay escape room / habit tracker sessions.")
+    parser.add_argument("--world", help="escape room .json / .toml world file (default: the mansion)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rec = commands.add_parser("record", help="play in the terminal and append the session to FILE")
+    rec.add_argument("app", choices=APPS)
+    rec.add_argument("path", metavar="FILE")
+
+    run = commands.add_parser("run", help="replay every session in FILE")
+    run.add_argument("path", metavar="FILE")
+    run.add_argument("--repeat", type=int, default=1, help="play the recording this many times")
+    run.add_argument("--workers", type=int, default=0,
+                     help="worker processes (0 = play in this process)")
+    run.add_argument("--show", type=int, metavar="N", help="print the transcript of session N (1-based) and exit")
+    run.add_argument("--metrics", metavar="FILE",
+                     help="time every command and write FILE (.json or Prometheus text); in-process only")
+    args = parser.parse_args(argv)
+    if args.command == "run" and args.metrics and args.workers > 0:
+        parser.error("--metrics needs an in-process run (no --workers)")
+
+    world = escape_room.GAME
+    if args.world:
+        from escape_world import load_world
+        world = load_world(args.world)
+
+    if args.command == "record":
+        count = record(args.app, args.path, world)
+        print(f"  Recorded {count} inputs to {args.path}.", file=sys.stderr)
+        return 0
+
+    try:
+        sessions = read_sessions(args.path)
+    except (OSError, ValueError) as error:
+        print(f"  ⚠  {error}", file=sys.stderr)
+        return 1
+
+    if args.show is not None:
+        if not 0 < args.show <= len(sessions):
+            print(f"  ⚠  {args.path} has {len(sessions)} sessions.", file=sys.stderr)
+            return 1
+        app, inputs = sessions[args.show - 1]
+        io = ScriptedIO(inputs)
+        play(app, inputs, world, io)
+        sys.stdout.write(io.transcript())
+        return 0
+
+    sessions = sessions * args.repeat
+    if args.metrics:
+        METRICS.enable()
+    start = time.perf_counter()
+    if args.workers > 0:
+        totals = play_parallel(sessions, args.workers, args.world)
+    else:
+        totals = play_many(sessions, world)
+    seconds = time.perf_counter() - start
+
+    workers = f"{args.workers} workers" if args.workers > 0 else "in-process"
+    print(f"  Replayed {totals.sessions:,} sessions in {seconds:.2f}s "
+          f"({totals.sessions / seconds:,.0f}/s, {workers})")
+    print(f"  Finished: {totals.finished:,}   Ran out of input: {totals.sessions - totals.finished:,}")
+    print(f"  Escaped: {totals.escaped:,}   Habit entries logged: {totals.entries:,}")
+    if args.metrics:
+        METRICS.write(args.metrics)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())